@@ -1,18 +1,111 @@
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Float, JSON
+from sqlalchemy import create_engine, event, Index, Column, String, Text, DateTime, Float, Integer, JSON
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from datetime import datetime
 import os
+import time
+from typing import AsyncIterator, Dict
 from config import settings
+from app.utils.metrics import metrics
 
 # Database URL
 DATABASE_URL = f"sqlite:///{settings.UPLOAD_DIR}/meetings.db"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{settings.UPLOAD_DIR}/meetings.db"
 
-# Create engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Applied to every new connection. WAL lets readers run while a write transaction is
+# open (and commits append to the log instead of rewriting pages); synchronous=NORMAL
+# only fsyncs at checkpoints, which is still crash-safe in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,  # Wait for a lock instead of failing with "database is locked"
+    "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # Negative = KiB per connection
+    "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+    "temp_store": "MEMORY"
+}
+
+class TimedCheckout:
+    """Pool mixin that records how long each checkout waited for a free connection"""
+    metric_prefix = "db.pool"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe(f"{self.metric_prefix}.checkout_wait.seconds", time.perf_counter() - start)
+
+class TimedQueuePool(TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedCheckout, AsyncAdaptedQueuePool):
+    metric_prefix = "db.async_pool"
+
+def _pool_options() -> Dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True
+    }
+
+def _apply_pragmas_on_connect(sqlite_engine):
+    @event.listens_for(sqlite_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def create_sqlite_engine(url: str):
+    """Engine with a bounded, pre-pinged pool whose connections all get SQLITE_PRAGMAS"""
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        poolclass=TimedQueuePool,
+        **_pool_options()
+    )
+    _apply_pragmas_on_connect(sqlite_engine)
+    return sqlite_engine
+
+def create_async_sqlite_engine(url: str):
+    """aiosqlite engine set up like create_sqlite_engine. Statements run on aiosqlite's
+    connection threads, so awaiting them never blocks the event loop."""
+    async_sqlite_engine = create_async_engine(
+        url,
+        connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        poolclass=TimedAsyncQueuePool,
+        **_pool_options()
+    )
+    _apply_pragmas_on_connect(async_sqlite_engine.sync_engine)
+    return async_sqlite_engine
+
+# Create engines: sync for scripts, worker processes and threads; async for request handlers
+engine = create_sqlite_engine(DATABASE_URL)
+async_engine = create_async_sqlite_engine(ASYNC_DATABASE_URL)
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Current usage of both pools; also published as db.pool.* and db.async_pool.* gauges"""
+    stats = {}
+    for prefix, pool in (("db.pool", engine.pool), ("db.async_pool", async_engine.pool)):
+        stats[prefix] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow())
+        }
+        for name, value in stats[prefix].items():
+            metrics.set_gauge(f"{prefix}.{name}", value)
+    return stats
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit: attributes can't be lazily refreshed without awaiting
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -33,6 +126,27 @@ class Meeting(Base):
     language = Column(String, nullable=True)
     file_name = Column(String, nullable=True)
     status = Column(String, default="draft", nullable=False)  # draft, recording, processing, completed
+    
+    # Keyset pagination of the meeting list, newest first, with and without a status filter
+    __table_args__ = (
+        Index("ix_meetings_created_at_id", "created_at", "id"),
+        Index("ix_meetings_status_created_at_id", "status", "created_at", "id"),
+    )
+
+class TranscriptSegment(Base):
+    __tablename__ = "transcript_segments"
+    
+    meeting_id = Column(String, primary_key=True)
+    idx = Column(Integer, primary_key=True)  # Position in the transcript
+    start = Column(Float, nullable=False)  # Audio offset in seconds
+    end = Column(Float, nullable=False)
+    text = Column(Text, nullable=False)
+    avg_logprob = Column(Float, nullable=True)
+    no_speech_prob = Column(Float, nullable=True)
+    words = Column(JSON, nullable=True)  # [{"word", "start", "end", "probability"}]
+    
+    # Time-window reads of one meeting
+    __table_args__ = (Index("ix_transcript_segments_meeting_start", "meeting_id", "start"),)
 
 class PronunciationCorrection(Base):
     __tablename__ = "pronunciation_corrections"
@@ -43,9 +157,42 @@ class PronunciationCorrection(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     usage_count = Column(Float, default=0, nullable=False)
 
-# Create tables
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # process_meeting_audio
+    meeting_id = Column(String, nullable=True, index=True)
+    payload = Column(JSON, nullable=True)
+    status = Column(String, default="queued", nullable=False, index=True)  # queued, running, completed, failed
+    stage = Column(String, nullable=True)  # Human readable step, e.g. transcribing, summarizing
+    progress = Column(Float, default=0, nullable=False)  # 0.0 - 1.0
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+
+class VectorChunk(Base):
+    __tablename__ = "vector_chunks"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)  # FAISS id
+    meeting_id = Column(String, nullable=False, index=True)
+    meeting_title = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=True, index=True)  # Meeting creation time
+    chunk_index = Column(Integer, nullable=False)
+    kind = Column(String, nullable=True, index=True)  # transcript, summary, key_point, action_item
+    start = Column(Float, nullable=True)  # Audio offsets (seconds) of transcript chunks built from segments
+    end = Column(Float, nullable=True)
+    text = Column(Text, nullable=False)
+
+# Full-text index over meeting content (external content table, kept in sync by triggers;
+# created by the migrations in app.migrations, like the rest of the schema)
+FTS_TABLE = "meetings_fts"
+FTS_COLUMNS = ("title", "transcript", "summary", "key_points", "action_items")
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
 
 # Dependency to get database session
 def get_db():
@@ -54,3 +201,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session (for handlers on the hot path)
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
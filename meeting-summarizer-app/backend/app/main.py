@@ -1,6 +1,7 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import os
 import sys
 import aiofiles
@@ -16,10 +17,16 @@ warnings.filterwarnings("ignore", message="The current process just got forked")
 # Add the parent directory to Python path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.routers import audio, meetings, real_time, pronunciation, chat, tts
-from app.services.whisper_client import WhisperClient
+from app.routers import audio, meetings, real_time, pronunciation, chat, tts, models, jobs
+from app.services.job_queue import job_queue
+from app.services.inference_executor import inference_executor
+from app.services.model_registry import model_registry
+from app.services.whisper_client import whisper_client
 from app.services.ollama_client import OllamaClient
 from app.services.summarizer import MeetingSummarizer
+from app.utils.metrics import metrics
+from app.utils.event_loop_monitor import event_loop_monitor
+from app.database import async_engine, pool_stats
 from config import settings
 
 # Create upload directory
@@ -34,10 +41,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Job-Id"],  # Meeting list pagination, queued processing jobs
 )
 
-# Initialize services
-whisper_client = WhisperClient()
+# Initialize services (the Whisper model itself is loaded lazily by the registry)
 ollama_client = OllamaClient()
 summarizer = MeetingSummarizer(whisper_client, ollama_client)
 
@@ -48,28 +55,54 @@ app.include_router(real_time.router, prefix="/api/real-time", tags=["real-time"]
 app.include_router(pronunciation.router, prefix="/api", tags=["pronunciation"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
 app.include_router(tts.router, prefix="/api/tts", tags=["tts"])
+app.include_router(models.router, prefix="/api/models", tags=["models"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
+    event_loop_monitor.start()
+    
+    if settings.DB_AUTO_MIGRATE:
+        # Bring the schema up to date before anything queries it (off the event loop;
+        # large backfills are better run beforehand with `python migrate.py`)
+        from app.migrations import migrator
+        await asyncio.to_thread(migrator.upgrade)
+    
     try:
         from app.services.vector_store import vector_store
         from app.services.pronunciation_corrector import pronunciation_corrector
-        from app.database import get_db
+        from app.database import SessionLocal
         
-        # Get database session
-        db = next(get_db())
-        
-        # Rebuild index if it's empty
-        if len(vector_store.chunks) == 0:
-            vector_store.rebuild_index(db)
-        
-        # Load pronunciation corrections
-        pronunciation_corrector.load_corrections_from_db(db)
+        # Get database session (returned to the pool afterwards)
+        db = SessionLocal()
+        try:
+            # Rebuild index if it's empty
+            if vector_store.count() == 0:
+                vector_store.rebuild_index(db)
+            
+            # Load pronunciation corrections
+            pronunciation_corrector.load_corrections_from_db(db)
+        finally:
+            db.close()
         
         print("Vector store and pronunciation corrector initialized successfully")
     except Exception as e:
         print(f"Warning: Could not initialize services: {e}")
+    
+    # Resume interrupted jobs and start processing the queue
+    await job_queue.start()
+    
+    # Whisper inference runs in its own processes so decoding never blocks the event loop
+    await inference_executor.start(model_registry.active_key)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    await job_queue.stop()
+    await inference_executor.stop()
+    await event_loop_monitor.stop()
+    await async_engine.dispose()
 
 @app.get("/")
 async def root():
@@ -77,7 +110,17 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "whisper": "ready", "ollama": "ready"}
+    return {
+        "status": "healthy",
+        "whisper": "ready" if whisper_client.is_ready() else "not loaded",
+        "ollama": "ready"
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters, gauges and timing histograms"""
+    pool_stats()  # Refresh the db.pool.* gauges
+    return metrics.snapshot()
 
 if __name__ == "__main__":
     import uvicorn
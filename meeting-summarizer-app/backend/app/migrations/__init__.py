@@ -0,0 +1,6 @@
+from app.database import engine
+from app.migrations.runner import Migration, Migrator
+from app.migrations.versions import MIGRATIONS
+
+# Global instance
+migrator = Migrator(engine, MIGRATIONS)
@@ -0,0 +1,194 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from config import settings
+from app.migrations.steps import FIRST_KEY, PROGRESS_TABLE, BatchedStep, FtsIndex, Step
+from app.utils.metrics import metrics
+
+VERSIONS_TABLE = "schema_migrations"
+
+class Migration:
+    def __init__(self, version: int, name: str, steps: Sequence[Step]):
+        self.version = version
+        self.name = name
+        self.steps = list(steps)
+
+class Migrator:
+    """Applies versioned migrations in order and records them in schema_migrations.
+
+    Each step is committed separately; batched steps commit every batch together with a
+    checkpoint in migration_progress, so an interrupted run continues where it stopped and
+    the app keeps serving (each batch holds the write lock only briefly).
+    """
+
+    def __init__(self, engine: Engine, migrations: Sequence[Migration],
+                 batch_size: int = settings.MIGRATION_BATCH_SIZE,
+                 batch_pause: float = settings.MIGRATION_BATCH_PAUSE_MS / 1000):
+        versions = [migration.version for migration in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError(f"Migration versions must be unique and increasing, got {versions}")
+        self.engine = engine
+        self.migrations = list(migrations)
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Connection]:
+        """A write transaction that also covers DDL. pysqlite only opens transactions before
+        DML statements, so BEGIN IMMEDIATE is issued explicitly (taking the write lock up front)."""
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            yield conn
+
+    # Bookkeeping
+
+    def _create_bookkeeping(self, conn: Connection):
+        conn.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL, seconds FLOAT)"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+            "version INTEGER NOT NULL, step INTEGER NOT NULL, last_key INTEGER, rows_done INTEGER NOT NULL DEFAULT 0, "
+            "done BOOLEAN NOT NULL DEFAULT 0, updated_at DATETIME NOT NULL, PRIMARY KEY (version, step))"
+        )
+
+    def applied_versions(self, conn: Connection) -> Dict[int, Tuple[str, str]]:
+        """Applied versions -> (name, applied_at)"""
+        if not inspect(conn).has_table(VERSIONS_TABLE):
+            return {}
+        return {version: (name, applied_at) for version, name, applied_at in
+                conn.exec_driver_sql(f"SELECT version, name, applied_at FROM {VERSIONS_TABLE}")}
+
+    def pending(self, conn: Connection, target: Optional[int] = None) -> List[Migration]:
+        applied = self.applied_versions(conn)
+        return [migration for migration in self.migrations
+                if migration.version not in applied and (target is None or migration.version <= target)]
+
+    def _progress(self, conn: Connection, version: int, step: int) -> Tuple[Optional[int], int, bool]:
+        """(last_key, rows_done, done) of a step; last_key is None until a batched step is prepared"""
+        if not inspect(conn).has_table(PROGRESS_TABLE):
+            return None, 0, False
+        row = conn.exec_driver_sql(
+            f"SELECT last_key, rows_done, done FROM {PROGRESS_TABLE} WHERE version = ? AND step = ?", (version, step)
+        ).first()
+        return (row[0], row[1], bool(row[2])) if row else (None, 0, False)
+
+    def _save_progress(self, conn: Connection, version: int, step: int, last_key: Optional[int],
+                       rows_done: int, done: bool = False):
+        conn.exec_driver_sql(
+            f"INSERT INTO {PROGRESS_TABLE} (version, step, last_key, rows_done, done, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (version, step) DO UPDATE SET "
+            "last_key = excluded.last_key, rows_done = excluded.rows_done, done = excluded.done, updated_at = excluded.updated_at",
+            (version, step, last_key, rows_done, done, datetime.utcnow())
+        )
+
+    # Applying
+
+    def upgrade(self, target: Optional[int] = None) -> int:
+        """Apply pending migrations (up to target); returns how many were applied"""
+        with self._transaction() as conn:
+            self._create_bookkeeping(conn)
+            pending = self.pending(conn, target)
+        for migration in pending:
+            print(f"[MIGRATE] Applying {migration.version} {migration.name}")
+            started = time.perf_counter()
+            for index, step in enumerate(migration.steps):
+                self._apply_step(migration, index, step)
+            seconds = time.perf_counter() - started
+            with self._transaction() as conn:
+                conn.exec_driver_sql(f"INSERT INTO {VERSIONS_TABLE} (version, name, applied_at, seconds) VALUES (?, ?, ?, ?)",
+                                     (migration.version, migration.name, datetime.utcnow(), seconds))
+                conn.exec_driver_sql(f"DELETE FROM {PROGRESS_TABLE} WHERE version = ?", (migration.version,))
+            print(f"[MIGRATE] Applied {migration.version} {migration.name} in {seconds:.1f}s")
+        return len(pending)
+
+    def _apply_step(self, migration: Migration, index: int, step: Step):
+        if isinstance(step, FtsIndex):
+            step.version, step.step = migration.version, index
+        with self.engine.connect() as conn:
+            last_key, rows_done, done = self._progress(conn, migration.version, index)
+        if done:
+            return
+        if last_key is None:
+            with self._transaction() as conn:
+                if not step.applies(conn):
+                    self._save_progress(conn, migration.version, index, None, 0, done=True)
+                    return
+                if not isinstance(step, BatchedStep):
+                    step.run(conn)
+                    self._save_progress(conn, migration.version, index, None, 0, done=True)
+                    print(f"[MIGRATE]   {step.name}")
+                    return
+                step.prepare(conn)
+                last_key = FIRST_KEY
+                self._save_progress(conn, migration.version, index, last_key, 0)
+        elif last_key > FIRST_KEY:
+            print(f"[MIGRATE]   {step.name}: resuming after rowid {last_key} ({rows_done} rows done)")
+
+        while True:
+            started = time.perf_counter()
+            with self._transaction() as conn:
+                rows, last = step.batch(conn, last_key, self.batch_size)
+                if last is None:
+                    step.finish(conn)
+                    self._save_progress(conn, migration.version, index, last_key, rows_done, done=True)
+                    break
+                last_key, rows_done = last, rows_done + rows
+                self._save_progress(conn, migration.version, index, last_key, rows_done)
+            metrics.observe("db.migration.batch.seconds", time.perf_counter() - started)
+            # Let the app's writers in between batches
+            time.sleep(self.batch_pause)
+        print(f"[MIGRATE]   {step.name}: {rows_done} rows")
+
+    # Reporting
+
+    def dry_run(self, target: Optional[int] = None, sample_rows: Optional[int] = None) -> List[Dict]:
+        """Estimate the rows each pending step touches and how long it takes, without changing anything.
+
+        Pending steps are sampled in one transaction that is rolled back: schema changes are
+        applied (so later steps see them) and one batch of each batched step is timed and
+        extrapolated to the rows it would touch. The transaction holds the write lock while
+        the samples run.
+        """
+        sample_rows = sample_rows or self.batch_size
+        report = []
+        with self.engine.connect() as conn:
+            transaction = conn.begin()
+            conn.exec_driver_sql("BEGIN IMMEDIATE")  # See _transaction
+            try:
+                self._create_bookkeeping(conn)
+                for migration in self.pending(conn, target):
+                    for index, step in enumerate(migration.steps):
+                        if isinstance(step, FtsIndex):
+                            step.version, step.step = migration.version, index
+                        last_key, rows_done, done = self._progress(conn, migration.version, index)
+                        entry = {"version": migration.version, "migration": migration.name, "step": step.name,
+                                 "rows": 0, "seconds": 0.0,
+                                 "resume_after": last_key if last_key not in (None, FIRST_KEY) else None}
+                        report.append(entry)
+                        if done or not step.applies(conn):
+                            entry["step"] += " (nothing to do)"
+                            continue
+                        entry["rows"] = max(0, step.count(conn) - rows_done)
+                        started = time.perf_counter()
+                        sampled = step.sample(conn, sample_rows)
+                        elapsed = time.perf_counter() - started
+                        if sampled:
+                            batches = -(-entry["rows"] // self.batch_size) if isinstance(step, BatchedStep) else 0
+                            entry["seconds"] = elapsed / sampled * entry["rows"] + batches * self.batch_pause
+                        else:
+                            entry["seconds"] = elapsed
+            finally:
+                transaction.rollback()
+        return report
+
+    def status(self) -> List[Dict]:
+        with self.engine.connect() as conn:
+            applied = self.applied_versions(conn)
+        return [{"version": migration.version, "migration": migration.name,
+                 "applied_at": applied.get(migration.version, (None, None))[1]}
+                for migration in self.migrations]
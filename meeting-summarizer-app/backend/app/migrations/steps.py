@@ -0,0 +1,318 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import MetaData, Table, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+# Checkpoints of batched steps (written by the runner, read by the FTS step's triggers)
+PROGRESS_TABLE = "migration_progress"
+# Batched steps start after this key; SQLite rowids can be zero or negative
+FIRST_KEY = -2 ** 63
+
+def table_rows(conn: Connection, table: str) -> int:
+    if not inspect(conn).has_table(table):
+        return 0
+    return conn.exec_driver_sql(f'SELECT count(*) FROM "{table}"').scalar()
+
+def table_columns(conn: Connection, table: str) -> List[str]:
+    return [column["name"] for column in inspect(conn).get_columns(table)]
+
+class Step:
+    """One unit of work of a migration, applied in a single transaction.
+
+    Steps must be idempotent: the baseline migration creates the current schema, so on a
+    new database later steps find their work already done and must skip it.
+    """
+    name = "step"
+
+    def applies(self, conn: Connection) -> bool:
+        """Whether there is anything to do"""
+        return True
+
+    def count(self, conn: Connection) -> int:
+        """Rows the step touches (0 for metadata-only changes)"""
+        return 0
+
+    def run(self, conn: Connection):
+        raise NotImplementedError
+
+    def sample(self, conn: Connection, rows: int) -> int:
+        """Do a representative part of the work, for timing in a rolled-back transaction; returns the rows done"""
+        self.run(conn)
+        return self.count(conn)
+
+class BatchedStep(Step):
+    """A step over many rows, done in rowid order one batch per transaction.
+
+    The runner commits each batch together with its checkpoint (the last rowid done),
+    pauses between batches so the app's writers get the lock, and resumes from the
+    checkpoint after an interruption.
+    """
+
+    def prepare(self, conn: Connection):
+        """Set up before the first batch (runs once, in its own transaction)"""
+
+    def batch(self, conn: Connection, after: int, size: int) -> Tuple[int, Optional[int]]:
+        """Process up to size rows with rowid > after; returns (rows done, last rowid) or (0, None) when done"""
+        raise NotImplementedError
+
+    def finish(self, conn: Connection):
+        """Complete the step (in the transaction of the final, empty batch)"""
+
+    def sample(self, conn: Connection, rows: int) -> int:
+        self.prepare(conn)
+        return self.batch(conn, FIRST_KEY, rows)[0]
+
+    def _next_rowid(self, conn: Connection, table: str, after: int, size: int, where: str = "1") -> Optional[int]:
+        """Rowid of the last of the next size rows, or None when none are left"""
+        return conn.exec_driver_sql(
+            f'SELECT max(rowid) FROM (SELECT rowid FROM "{table}" WHERE rowid > ? AND ({where}) ORDER BY rowid LIMIT ?)',
+            (after, size)
+        ).scalar()
+
+class Run(Step):
+    """Call a function with the connection, e.g. to create missing tables"""
+
+    def __init__(self, name: str, function: Callable[[Connection], None]):
+        self.name = name
+        self.function = function
+
+    def run(self, conn: Connection):
+        self.function(conn)
+
+class AddColumns(Step):
+    """ALTER TABLE ... ADD COLUMN for the columns a table lacks (metadata only, no rows rewritten)"""
+
+    def __init__(self, table: str, columns: Dict[str, str]):
+        self.name = f"add columns to {table}"
+        self.table = table
+        self.columns = columns  # Column name -> SQL type and constraints
+
+    def _missing(self, conn: Connection) -> List[str]:
+        if not inspect(conn).has_table(self.table):
+            return []
+        existing = set(table_columns(conn, self.table))
+        return [name for name in self.columns if name not in existing]
+
+    def applies(self, conn: Connection) -> bool:
+        return bool(self._missing(conn))
+
+    def run(self, conn: Connection):
+        for name in self._missing(conn):
+            conn.exec_driver_sql(f'ALTER TABLE "{self.table}" ADD COLUMN "{name}" {self.columns[name]}')
+
+class Backfill(BatchedStep):
+    """UPDATE table SET ... WHERE ... in rowid batches"""
+
+    def __init__(self, name: str, table: str, assignments: str, where: str):
+        self.name = name
+        self.table = table
+        self.assignments = assignments
+        self.where = where
+
+    def applies(self, conn: Connection) -> bool:
+        return conn.exec_driver_sql(f'SELECT 1 FROM "{self.table}" WHERE {self.where} LIMIT 1').first() is not None
+
+    def count(self, conn: Connection) -> int:
+        return conn.exec_driver_sql(f'SELECT count(*) FROM "{self.table}" WHERE {self.where}').scalar()
+
+    def batch(self, conn: Connection, after: int, size: int) -> Tuple[int, Optional[int]]:
+        last = self._next_rowid(conn, self.table, after, size, self.where)
+        if last is None:
+            return 0, None
+        result = conn.exec_driver_sql(
+            f'UPDATE "{self.table}" SET {self.assignments} WHERE rowid > ? AND rowid <= ? AND ({self.where})',
+            (after, last)
+        )
+        return result.rowcount, last
+
+class CreateIndexes(Step):
+    """Create the indexes declared on tables that are missing from the database.
+
+    SQLite builds an index in one transaction, so the time estimate comes from building
+    it on a sample of the rows in a temporary table.
+    """
+
+    def __init__(self, tables: Sequence[Table]):
+        self.name = "create indexes"
+        self.tables = tables
+
+    def _missing(self, conn: Connection):
+        missing = []
+        for table in self.tables:
+            if not inspect(conn).has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+            missing += [index for index in table.indexes if index.name not in existing]
+        return missing
+
+    def applies(self, conn: Connection) -> bool:
+        return bool(self._missing(conn))
+
+    def count(self, conn: Connection) -> int:
+        return sum(table_rows(conn, index.table.name) for index in self._missing(conn))
+
+    def run(self, conn: Connection):
+        for index in self._missing(conn):
+            index.create(bind=conn, checkfirst=True)
+
+    def sample(self, conn: Connection, rows: int) -> int:
+        done = 0
+        for i, index in enumerate(self._missing(conn)):
+            columns = ", ".join(f'"{column.name}"' for column in index.columns)
+            conn.exec_driver_sql(
+                f'CREATE TEMP TABLE _migration_sample_{i} AS SELECT {columns} FROM "{index.table.name}" LIMIT {int(rows)}'
+            )
+            conn.exec_driver_sql(f"CREATE INDEX temp._migration_sample_{i}_ix ON _migration_sample_{i} ({columns})")
+            done += conn.exec_driver_sql(f"SELECT count(*) FROM _migration_sample_{i}").scalar()
+        return done
+
+class RebuildTable(BatchedStep):
+    """Recreate a table with its declared schema (for changes ALTER TABLE can't make, such as
+    dropping NOT NULL) without locking it for the whole copy.
+
+    Rows are copied in batches into a new table, with rowids kept, while triggers mirror
+    the writes made meanwhile; the tables are swapped, and the old table's indexes and
+    triggers recreated, in the transaction of the final batch.
+    """
+
+    def __init__(self, table: Table, when: Callable[[Connection], bool]):
+        self.name = f"rebuild {table.name}"
+        self.table = table
+        self.when = when
+        self.new_name = f"{table.name}_rebuild"
+
+    def applies(self, conn: Connection) -> bool:
+        return inspect(conn).has_table(self.table.name) and self.when(conn)
+
+    def count(self, conn: Connection) -> int:
+        return table_rows(conn, self.table.name)
+
+    def _columns(self, conn: Connection) -> str:
+        declared = {column.name for column in self.table.columns}
+        return ", ".join(f'"{name}"' for name in table_columns(conn, self.table.name) if name in declared)
+
+    def _mirror_triggers(self) -> List[str]:
+        return [f"{self.new_name}_{suffix}" for suffix in ("ai", "au", "ad")]
+
+    def prepare(self, conn: Connection):
+        columns = self._columns(conn)
+        new_values = ", ".join(f"new.{column}" for column in columns.split(", "))
+        copy = f'INSERT OR REPLACE INTO "{self.new_name}"(rowid, {columns}) VALUES (new.rowid, {new_values});'
+        conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.new_name}"')
+        conn.execute(CreateTable(self.table.to_metadata(MetaData(), name=self.new_name)))
+        ai, au, ad = self._mirror_triggers()
+        conn.exec_driver_sql(f'CREATE TRIGGER "{ai}" AFTER INSERT ON "{self.table.name}" BEGIN {copy} END')
+        conn.exec_driver_sql(f'CREATE TRIGGER "{au}" AFTER UPDATE ON "{self.table.name}" BEGIN {copy} END')
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER "{ad}" AFTER DELETE ON "{self.table.name}" '
+            f'BEGIN DELETE FROM "{self.new_name}" WHERE rowid = old.rowid; END'
+        )
+
+    def batch(self, conn: Connection, after: int, size: int) -> Tuple[int, Optional[int]]:
+        last = self._next_rowid(conn, self.table.name, after, size)
+        if last is None:
+            return 0, None
+        columns = self._columns(conn)
+        # Rows the triggers already copied are current, so they're left alone
+        result = conn.exec_driver_sql(
+            f'INSERT OR IGNORE INTO "{self.new_name}"(rowid, {columns}) '
+            f'SELECT rowid, {columns} FROM "{self.table.name}" WHERE rowid > ? AND rowid <= ?',
+            (after, last)
+        )
+        return result.rowcount, last
+
+    def finish(self, conn: Connection):
+        for trigger in self._mirror_triggers():
+            conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS "{trigger}"')
+        # Indexes and triggers are dropped with the table; recreate them on the new one
+        schema = [sql for sql, in conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+            (self.table.name,)
+        )]
+        conn.exec_driver_sql(f'DROP TABLE "{self.table.name}"')
+        conn.exec_driver_sql(f'ALTER TABLE "{self.new_name}" RENAME TO "{self.table.name}"')
+        for sql in schema:
+            conn.exec_driver_sql(sql)
+
+class FtsIndex(BatchedStep):
+    """Create an external-content FTS5 index over a table and fill it in batches.
+
+    While it fills, the sync triggers only apply to rows at or below the checkpoint (rows
+    after it are indexed by a later batch); the final batch swaps in unconditional triggers.
+    A build of SQLite without FTS5 skips the step, leaving lexical search disabled.
+
+    Index rows are keyed by the table's rowid. Unless the table has an INTEGER PRIMARY KEY
+    (meetings has a VARCHAR id), VACUUM and table rebuilds may renumber those rowids, so
+    they must be followed by `INSERT INTO <fts_table>(<fts_table>) VALUES('rebuild')`.
+    """
+
+    def __init__(self, fts_table: str, table: str, columns: Sequence[str], tokenize: str):
+        self.name = f"create {fts_table}"
+        self.fts_table = fts_table
+        self.table = table
+        self.columns = ", ".join(columns)
+        self.tokenize = tokenize
+        self.version = self.step = None  # Set by the runner, for the checkpoint the triggers read
+
+    def applies(self, conn: Connection) -> bool:
+        if inspect(conn).has_table(self.fts_table):
+            return False
+        try:
+            conn.exec_driver_sql("CREATE VIRTUAL TABLE temp._migration_fts_probe USING fts5(probe)")
+            conn.exec_driver_sql("DROP TABLE temp._migration_fts_probe")
+        except Exception as e:
+            print(f"Warning: SQLite FTS5 is not available, lexical search is disabled: {e}")
+            return False
+        return True
+
+    def count(self, conn: Connection) -> int:
+        return table_rows(conn, self.table)
+
+    def _triggers(self, condition: str = "") -> List[str]:
+        columns = self.columns.split(", ")
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        delete_old = f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {self.columns}) VALUES ('delete', old.rowid, {old_values});"
+        insert_new = f"INSERT INTO {self.fts_table}(rowid, {self.columns}) VALUES (new.rowid, {new_values});"
+        when_new = when_old = ""
+        if condition:
+            when_new = f"WHEN new.rowid <= {condition} "
+            when_old = f"WHEN old.rowid <= {condition} "
+        return [
+            f"CREATE TRIGGER {self.fts_table}_ai AFTER INSERT ON {self.table} {when_new}BEGIN {insert_new} END",
+            f"CREATE TRIGGER {self.fts_table}_ad AFTER DELETE ON {self.table} {when_old}BEGIN {delete_old} END",
+            # Status and timestamp updates don't touch the index
+            f"CREATE TRIGGER {self.fts_table}_au AFTER UPDATE OF {self.columns} ON {self.table} {when_old}"
+            f"BEGIN {delete_old} {insert_new} END"
+        ]
+
+    def _drop_triggers(self, conn: Connection):
+        for suffix in ("ai", "ad", "au"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {self.fts_table}_{suffix}")
+
+    def prepare(self, conn: Connection):
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+            f"{self.columns}, content='{self.table}', content_rowid='rowid', tokenize='{self.tokenize}')"
+        )
+        checkpoint = (f"(SELECT last_key FROM {PROGRESS_TABLE} "
+                      f"WHERE version = {int(self.version or 0)} AND step = {int(self.step or 0)})")
+        self._drop_triggers(conn)
+        for sql in self._triggers(checkpoint):
+            conn.exec_driver_sql(sql)
+
+    def batch(self, conn: Connection, after: int, size: int) -> Tuple[int, Optional[int]]:
+        last = self._next_rowid(conn, self.table, after, size)
+        if last is None:
+            return 0, None
+        result = conn.exec_driver_sql(
+            f"INSERT INTO {self.fts_table}(rowid, {self.columns}) "
+            f"SELECT rowid, {self.columns} FROM {self.table} WHERE rowid > ? AND rowid <= ?",
+            (after, last)
+        )
+        return result.rowcount, last
+
+    def finish(self, conn: Connection):
+        self._drop_triggers(conn)
+        for sql in self._triggers():
+            conn.exec_driver_sql(sql)
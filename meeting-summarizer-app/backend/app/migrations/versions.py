@@ -0,0 +1,54 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from app.database import Base, Meeting, FTS_TABLE, FTS_COLUMNS, FTS_TOKENIZE
+from app.migrations.runner import Migration
+from app.migrations.steps import AddColumns, Backfill, CreateIndexes, FtsIndex, RebuildTable, Run
+
+# Schema history, oldest first. Append new migrations with the next version; never edit
+# or renumber applied ones. The baseline creates missing tables from the current models,
+# so every step has to detect and skip work that is already done.
+
+def _create_missing_tables(conn: Connection):
+    Base.metadata.create_all(bind=conn)
+
+def _transcript_not_null(conn: Connection) -> bool:
+    return any(column["name"] == "transcript" and not column["nullable"]
+               for column in inspect(conn).get_columns("meetings"))
+
+MIGRATIONS = [
+    Migration(1, "baseline", [
+        Run("create missing tables", _create_missing_tables),
+    ]),
+    # Formerly migrate_db.py
+    Migration(2, "meeting details and status", [
+        AddColumns("meetings", {"description": "TEXT", "updated_at": "DATETIME", "status": "VARCHAR"}),
+        Backfill("backfill meetings.updated_at", "meetings", "updated_at = created_at", "updated_at IS NULL"),
+        Backfill("backfill meetings.status", "meetings",
+                 "status = CASE WHEN transcript IS NOT NULL AND transcript != '' THEN 'completed' ELSE 'draft' END",
+                 "status IS NULL"),
+    ]),
+    # Formerly migrate_transcript.py (empty meetings have no transcript yet)
+    Migration(3, "nullable meeting transcript", [
+        RebuildTable(Meeting.__table__, when=_transcript_not_null),
+    ]),
+    # Formerly done by the vector store on load
+    Migration(4, "vector chunk kinds", [
+        AddColumns("vector_chunks", {"kind": "VARCHAR"}),
+        Backfill("backfill vector_chunks.kind", "vector_chunks",
+                 "kind = CASE WHEN text LIKE 'Summary: %' THEN 'summary' "
+                 "WHEN text LIKE 'Key Point: %' THEN 'key_point' "
+                 "WHEN text LIKE 'Action Item: %' THEN 'action_item' "
+                 "ELSE 'transcript' END",
+                 "kind IS NULL"),
+    ]),
+    Migration(5, "vector chunk audio offsets", [
+        AddColumns("vector_chunks", {"start": "FLOAT", "end": "FLOAT"}),
+    ]),
+    # Keyset pagination and the other declared indexes of existing tables
+    Migration(6, "declared indexes", [
+        CreateIndexes(Base.metadata.sorted_tables),
+    ]),
+    Migration(7, "meeting full-text index", [
+        FtsIndex(FTS_TABLE, "meetings", FTS_COLUMNS, FTS_TOKENIZE),
+    ]),
+]
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from datetime import datetime
+
+class MeetingListItem(BaseModel):
+    """A meeting as shown in lists: everything but the transcript, of which only the start is included"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    title: str
+    description: Optional[str] = None
+    summary: Optional[str] = None
+    key_points: Optional[List[str]] = None
+    action_items: Optional[List[str]] = None
+    transcript_preview: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    duration: Optional[float] = None
+    language: Optional[str] = None
+    file_name: Optional[str] = None
+    status: str
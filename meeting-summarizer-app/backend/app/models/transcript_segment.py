@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class WordTimestamp(BaseModel):
+    word: str
+    start: float
+    end: float
+    probability: Optional[float] = None
+
+class TranscriptSegmentResponse(BaseModel):
+    idx: int
+    start: float
+    end: float
+    text: str
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    words: Optional[List[WordTimestamp]] = None  # Only when requested
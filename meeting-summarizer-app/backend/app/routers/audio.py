@@ -1,4 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse, FileResponse
 import aiofiles
 import os
@@ -6,6 +6,8 @@ import uuid
 from pathlib import Path
 from config import settings
 from app.models.meeting import TranscriptionResponse
+from app.services.whisper_client import WhisperClient, get_whisper_client
+from app.services.inference_executor import InferenceQueueFull, cancel_on_disconnect
 
 router = APIRouter()
 
@@ -52,10 +54,15 @@ async def upload_audio(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio_direct(file: UploadFile = File(...)):
+async def transcribe_audio_direct(
+    request: Request,
+    file: UploadFile = File(...),
+    whisper_client: WhisperClient = Depends(get_whisper_client)
+):
     """Upload and transcribe audio file in one step"""
     await validate_audio_file(file)
     
+    file_path = None
     try:
         # Generate unique filename
         file_ext = Path(file.filename).suffix.lower()
@@ -72,17 +79,8 @@ async def transcribe_audio_direct(file: UploadFile = File(...)):
         # Get file size
         file_size_mb = len(content) / (1024 * 1024)
         
-        # Transcribe the file
-        from app.services.whisper_client import WhisperClient
-        whisper_client = WhisperClient()
-        
-        result = await whisper_client.transcribe(file_path)
-        
-        # Clean up temporary file
-        try:
-            os.remove(file_path)
-        except:
-            pass  # Don't fail if cleanup fails
+        # Transcribe the file (cancelled if the client goes away)
+        result = await cancel_on_disconnect(request, whisper_client.transcribe(file_path))
         
         return TranscriptionResponse(
             text=result["text"],
@@ -90,17 +88,27 @@ async def transcribe_audio_direct(file: UploadFile = File(...)):
             duration=result.get("duration")
         )
     
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
-        # Clean up file if transcription fails
+        raise HTTPException(status_code=500, detail=f"Error transcribing audio: {str(e)}")
+    finally:
+        # Clean up the temporary file, also when the request was cancelled
+        # (asyncio.CancelledError isn't an Exception)
         try:
-            if 'file_path' in locals() and os.path.exists(file_path):
+            if file_path and os.path.exists(file_path):
                 os.remove(file_path)
-        except:
-            pass
-        raise HTTPException(status_code=500, detail=f"Error transcribing audio: {str(e)}")
+        except OSError:
+            pass  # Don't fail if cleanup fails
 
 @router.post("/transcribe/{file_id}", response_model=TranscriptionResponse)
-async def transcribe_audio(file_id: str):
+async def transcribe_audio(
+    file_id: str,
+    request: Request,
+    whisper_client: WhisperClient = Depends(get_whisper_client)
+):
     """Transcribe uploaded audio file"""
     file_path = os.path.join(settings.UPLOAD_DIR, file_id)
     
@@ -108,11 +116,7 @@ async def transcribe_audio(file_id: str):
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        # This would be injected in a real app, but for now we'll import here
-        from app.services.whisper_client import WhisperClient
-        whisper_client = WhisperClient()
-        
-        result = await whisper_client.transcribe(file_path)
+        result = await cancel_on_disconnect(request, whisper_client.transcribe(file_path))
         
         return TranscriptionResponse(
             text=result["text"],
@@ -120,6 +124,8 @@ async def transcribe_audio(file_id: str):
             duration=None
         )
     
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error transcribing audio: {str(e)}")
 
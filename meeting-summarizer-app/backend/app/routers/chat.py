@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import json
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.chat import ChatQueryRequest, ChatResponse
 from app.services.meeting_chat import meeting_chat_service
+from app.utils.metrics import metrics
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 @router.post("/query", response_model=ChatResponse)
 async def query_meetings(
     request: ChatQueryRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Ask questions about your meetings using natural language"""
     try:
@@ -24,6 +28,40 @@ async def query_meetings(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process query: {str(e)}")
 
+@router.post("/stream")
+async def stream_query(body: ChatQueryRequest, request: Request):
+    """Server-Sent Events stream of the answer: a "meetings" event with the retrieved
+    meetings, "token" events as the model generates, then "done" (or "error").
+    Generation is cancelled if the client disconnects."""
+    query = (body.query or "").strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    async def event_stream():
+        # Own session: the response body outlives request-scoped dependencies
+        db = AsyncSessionLocal()
+        events = meeting_chat_service.stream_query(query, db)
+        try:
+            async for event, data in events:
+                if await request.is_disconnected():
+                    metrics.inc("chat.stream.cancelled")
+                    return
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except asyncio.CancelledError:
+            # The server cancels the response when it notices the disconnect first
+            metrics.inc("chat.stream.cancelled")
+            raise
+        finally:
+            # Closes the Ollama stream as well, so the model stops generating
+            await events.aclose()
+            await db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/suggestions")
 async def get_query_suggestions():
     """Get sample queries users can ask"""
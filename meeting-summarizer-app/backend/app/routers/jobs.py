@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import asyncio
+import json
+from app.database import get_async_db, AsyncSessionLocal, Job
+from app.models.job import JobResponse, JobStatus
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+# Seconds between job row reads while streaming progress
+EVENT_POLL_INTERVAL = 0.5
+TERMINAL_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+
+async def _job_snapshot(job_id: str) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        job = await job_queue.aget(db, job_id)
+        return JobResponse.model_validate(job).model_dump(mode="json") if job else None
+
+async def _job_updates(job_id: str):
+    """Yield the job state every time its status, stage or progress changes"""
+    last = None
+    while True:
+        snapshot = await _job_snapshot(job_id)
+        if snapshot is None:
+            return
+
+        marker = (snapshot["status"], snapshot["stage"], snapshot["progress"])
+        if marker != last:
+            last = marker
+            yield snapshot
+
+        if snapshot["status"] in TERMINAL_STATUSES:
+            return
+        await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+@router.get("/", response_model=List[JobResponse])
+async def list_jobs(status: Optional[str] = None, limit: int = 50, db: AsyncSession = Depends(get_async_db)):
+    """List recent jobs, optionally filtered by status"""
+    statement = select(Job)
+    if status:
+        try:
+            JobStatus(status)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        statement = statement.where(Job.status == status)
+    return (await db.scalars(statement.order_by(Job.created_at.desc()).limit(limit))).all()
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get the current status of a job"""
+    job = await job_queue.aget(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of job progress, closed once the job finishes"""
+    if await _job_snapshot(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for snapshot in _job_updates(job_id):
+            if await request.is_disconnected():
+                return
+            yield f"event: job\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws/{job_id}")
+async def websocket_job_events(websocket: WebSocket, job_id: str):
+    """WebSocket stream of job progress, closed once the job finishes"""
+    await websocket.accept()
+    try:
+        found = False
+        async for snapshot in _job_updates(job_id):
+            found = True
+            await websocket.send_text(json.dumps({"type": "job_update", **snapshot}))
+        if not found:
+            await websocket.send_text(json.dumps({"type": "error", "error": "Job not found"}))
+        await websocket.close()
+    except WebSocketDisconnect:
+        print(f"[JOBS] WebSocket for job {job_id} disconnected")
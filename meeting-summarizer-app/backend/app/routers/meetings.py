@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy import Row, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer
+from typing import List, Optional, Tuple
+import base64
+import json
 import uuid
 from datetime import datetime
 from app.models.meeting import (
@@ -8,62 +12,53 @@ from app.models.meeting import (
     MeetingResponse, MeetingUpdate, MeetingCreateEmpty, MeetingStartRecording,
     MeetingStopRecording, MeetingStatus
 )
-from app.services.summarizer import MeetingSummarizer
-from app.database import get_db, create_tables
+from app.models.meeting_list import MeetingListItem
+from app.models.transcript_segment import TranscriptSegmentResponse
+from app.models.job import JobResponse, JobKind
+from app.services.job_queue import job_queue
+from app.services.transcript_segments import delete_segments, segments_in_range
+from app.database import get_db, get_async_db
 from app.database import Meeting as DBMeeting
 
 router = APIRouter()
 
-# Create tables on startup
-create_tables()
+MEETINGS_PAGE_SIZE = 50
+MEETINGS_PAGE_MAX = 200
+TRANSCRIPT_PREVIEW_CHARS = 200
+SEGMENTS_PAGE_MAX = 2000
 
-@router.post("/create", response_model=MeetingResponse)
+@router.post("/create", response_model=JobResponse, status_code=202)
 async def create_meeting(meeting_data: MeetingCreate, db: Session = Depends(get_db)):
-    """Create a new meeting and process audio"""
+    """Create a new meeting and queue its audio for processing.
+
+    Returns the processing job; poll /api/jobs/{job_id} or subscribe to its events for progress.
+    """
     try:
         # Generate unique meeting ID
         meeting_id = str(uuid.uuid4())
         
-        # This would be injected in a real app
-        from app.services.whisper_client import WhisperClient
-        from app.services.ollama_client import OllamaClient
-        
-        whisper_client = WhisperClient()
-        ollama_client = OllamaClient()
-        summarizer = MeetingSummarizer(whisper_client, ollama_client)
-        
-        # Process the audio file
-        result = await summarizer.process_complete_meeting(meeting_data.audio_file_path)
-        
-        # Create database meeting object
+        # Create the meeting up front; the job fills in transcript and summary
         db_meeting = DBMeeting(
             id=meeting_id,
             title=meeting_data.title,
-            transcript=result["transcription"].text,
-            summary=result["summary"].summary,
-            key_points=result["summary"].key_points,
-            action_items=result["summary"].action_items,
+            transcript=None,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
-            duration=result["transcription"].duration,
-            language=result["transcription"].language,
             file_name=meeting_data.audio_file_path.split('/')[-1] if '/' in meeting_data.audio_file_path else meeting_data.audio_file_path,
-            status=MeetingStatus.COMPLETED.value
+            status=MeetingStatus.PROCESSING.value
         )
         
         # Save to database
         db.add(db_meeting)
         db.commit()
-        db.refresh(db_meeting)
         
-        # Add to vector store for future context
-        try:
-            from app.services.vector_store import vector_store
-            vector_store.add_meeting(db_meeting)
-        except Exception as e:
-            print(f"Warning: Could not add meeting to vector store: {e}")
-        
-        return db_meeting
+        job = job_queue.enqueue(
+            db,
+            JobKind.PROCESS_MEETING_AUDIO.value,
+            {"audio_file_path": meeting_data.audio_file_path},
+            meeting_id=meeting_id
+        )
+        return job
     
     except Exception as e:
         db.rollback()
@@ -86,18 +81,13 @@ async def create_meeting_from_transcription(meeting_data: MeetingCreateFromText,
         ollama_client = OllamaClient()
         print("DEBUG: Created Ollama client")
         
-        # Generate summary from transcription
-        print("DEBUG: Starting summary generation...")
-        summary = await ollama_client.generate_summary(meeting_data.transcription)
-        print(f"DEBUG: Generated summary: {len(summary)} characters")
-        
-        print("DEBUG: Starting key points extraction...")
-        key_points = await ollama_client.extract_key_points(meeting_data.transcription)
-        print(f"DEBUG: Generated {len(key_points)} key points")
-        
-        print("DEBUG: Starting action items extraction...")
-        action_items = await ollama_client.extract_action_items(meeting_data.transcription)
-        print(f"DEBUG: Generated {len(action_items)} action items")
+        # Generate summary, key points and action items from transcription
+        print("DEBUG: Starting transcript analysis...")
+        analysis = await ollama_client.analyze_transcript(meeting_data.transcription)
+        summary = analysis["summary"]
+        key_points = analysis["key_points"]
+        action_items = analysis["action_items"]
+        print(f"DEBUG: Generated summary ({len(summary)} characters), {len(key_points)} key points, {len(action_items)} action items in {analysis['timings']['total']}s ({analysis['mode']})")
         
         # Create database meeting object
         print("DEBUG: Creating database meeting object...")
@@ -219,8 +209,17 @@ async def start_recording(meeting_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error starting recording: {str(e)}")
 
 @router.post("/{meeting_id}/stop-recording", response_model=MeetingResponse)
-async def stop_recording(meeting_id: str, recording_data: MeetingStopRecording, db: Session = Depends(get_db)):
-    """Stop recording and optionally process audio for an existing meeting"""
+async def stop_recording(
+    meeting_id: str,
+    recording_data: MeetingStopRecording,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """Stop recording and optionally queue audio processing for an existing meeting.
+
+    When audio is queued the meeting is returned in processing state and the job id
+    is sent in the X-Job-Id header.
+    """
     try:
         print(f"DEBUG: Stopping recording for meeting: {meeting_id}")
         
@@ -236,50 +235,22 @@ async def stop_recording(meeting_id: str, recording_data: MeetingStopRecording,
                 detail=f"Meeting is not currently recording (status: {meeting.status})"
             )
         
-        # If audio file is provided, process it
+        # If audio file is provided, queue it for processing
         if recording_data.audio_file_path:
-            print(f"DEBUG: Processing audio file: {recording_data.audio_file_path}")
+            print(f"DEBUG: Queueing audio file for processing: {recording_data.audio_file_path}")
             meeting.status = MeetingStatus.PROCESSING.value
             meeting.updated_at = datetime.utcnow()
             db.commit()
             
-            try:
-                # Process the audio file
-                from app.services.whisper_client import WhisperClient
-                from app.services.ollama_client import OllamaClient
-                from app.services.summarizer import MeetingSummarizer
-                
-                whisper_client = WhisperClient()
-                ollama_client = OllamaClient()
-                summarizer = MeetingSummarizer(whisper_client, ollama_client)
-                
-                # Process the audio file
-                result = await summarizer.process_complete_meeting(recording_data.audio_file_path)
-                
-                # Update meeting with results
-                meeting.transcript = result["transcription"].text
-                meeting.summary = result["summary"].summary
-                meeting.key_points = result["summary"].key_points
-                meeting.action_items = result["summary"].action_items
-                meeting.duration = result["transcription"].duration
-                meeting.language = result["transcription"].language
-                meeting.file_name = recording_data.audio_file_path.split('/')[-1] if '/' in recording_data.audio_file_path else recording_data.audio_file_path
-                meeting.status = MeetingStatus.COMPLETED.value
-                meeting.updated_at = datetime.utcnow()
-                
-                # Add to vector store for future context
-                try:
-                    from app.services.vector_store import vector_store
-                    vector_store.add_meeting(meeting)
-                except Exception as e:
-                    print(f"Warning: Could not add meeting to vector store: {e}")
-                    
-            except Exception as e:
-                print(f"DEBUG: Error processing audio: {str(e)}")
-                meeting.status = MeetingStatus.DRAFT.value  # Revert to draft on error
-                meeting.updated_at = datetime.utcnow()
-                db.commit()
-                raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
+            # The job moves the meeting to completed (or back to draft on error)
+            job = job_queue.enqueue(
+                db,
+                JobKind.PROCESS_MEETING_AUDIO.value,
+                {"audio_file_path": recording_data.audio_file_path},
+                meeting_id=meeting_id
+            )
+            response.headers["X-Job-Id"] = job.id
+            response.headers["Location"] = f"/api/jobs/{job.id}"
         else:
             # Just stop recording without processing
             meeting.status = MeetingStatus.DRAFT.value
@@ -319,12 +290,11 @@ async def add_transcript_to_meeting(meeting_id: str, transcript_data: MeetingCre
             from app.services.ollama_client import OllamaClient
             ollama_client = OllamaClient()
             
-            print("DEBUG: Starting summary generation...")
-            summary = await ollama_client.generate_summary(transcript_data.transcription)
-            print("DEBUG: Starting key points extraction...")
-            key_points = await ollama_client.extract_key_points(transcript_data.transcription)
-            print("DEBUG: Starting action items extraction...")
-            action_items = await ollama_client.extract_action_items(transcript_data.transcription)
+            print("DEBUG: Starting transcript analysis...")
+            analysis = await ollama_client.analyze_transcript(transcript_data.transcription)
+            summary = analysis["summary"]
+            key_points = analysis["key_points"]
+            action_items = analysis["action_items"]
             
             # Update meeting with transcript and analysis
             meeting.transcript = transcript_data.transcription
@@ -336,17 +306,20 @@ async def add_transcript_to_meeting(meeting_id: str, transcript_data: MeetingCre
             meeting.file_name = transcript_data.file_name
             meeting.status = MeetingStatus.COMPLETED.value
             meeting.updated_at = datetime.utcnow()
+            # Timed segments of an earlier recording no longer match the transcript
+            delete_segments(db, meeting.id)
             
-            # Add to vector store for future context
+            db.commit()
+            db.refresh(meeting)
+            
+            # Replace any chunks indexed for this meeting (after the commit: the vector
+            # store writes through its own session and reads the committed segments)
             try:
                 from app.services.vector_store import vector_store
-                vector_store.add_meeting(meeting)
+                vector_store.upsert_meeting(meeting)
                 print("DEBUG: Added to vector store")
             except Exception as e:
                 print(f"Warning: Could not add meeting to vector store: {e}")
-            
-            db.commit()
-            db.refresh(meeting)
             print("DEBUG: Successfully added transcript and generated summary")
             
             return meeting
@@ -365,31 +338,115 @@ async def add_transcript_to_meeting(meeting_id: str, transcript_data: MeetingCre
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error adding transcript to meeting: {str(e)}")
 
-@router.get("/", response_model=List[MeetingResponse])
-async def get_all_meetings(status: Optional[str] = None, db: Session = Depends(get_db)):
-    """Get all meetings, optionally filtered by status"""
-    query = db.query(DBMeeting)
+def _encode_cursor(meeting: DBMeeting) -> str:
+    """Opaque position after meeting in (created_at, id) descending order"""
+    raw = json.dumps([meeting.created_at.isoformat(), meeting.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, meeting_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), str(meeting_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _page_statement(statement: Select, status: Optional[str], limit: Optional[int], cursor: Optional[str]) -> Select:
+    """Newest meetings first, filtered by status; with limit, one page (plus one row, to
+    tell whether more follow) starting after cursor.
     
+    Pages are selected by keyset on (created_at, id), which the composite indexes on
+    meetings serve directly, so every page costs the same however deep it is.
+    """
     if status:
         # Validate status
         try:
             MeetingStatus(status)
-            query = query.filter(DBMeeting.status == status)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        statement = statement.where(DBMeeting.status == status)
+    
+    if cursor:
+        created_at, meeting_id = _decode_cursor(cursor)
+        statement = statement.where(tuple_(DBMeeting.created_at, DBMeeting.id) < tuple_(created_at, meeting_id))
     
-    meetings = query.order_by(DBMeeting.created_at.desc()).all()
+    statement = statement.order_by(DBMeeting.created_at.desc(), DBMeeting.id.desc())
+    return statement if limit is None else statement.limit(limit + 1)
+
+def _page(rows: list, response: Response, limit: Optional[int]) -> list:
+    """Trim the extra row; when more meetings follow, put the next page's cursor in X-Next-Cursor"""
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0] if isinstance(rows[-1], Row) else rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last)
+    return rows
+
+@router.get("/", response_model=List[MeetingResponse])
+async def get_all_meetings(
+    response: Response,
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MEETINGS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all meetings, optionally filtered by status (one page of them with limit/cursor)"""
+    meetings = (await db.scalars(_page_statement(select(DBMeeting), status, limit, cursor))).all()
+    return _page(list(meetings), response, limit)
+
+@router.get("/list", response_model=List[MeetingListItem])
+async def list_meetings(
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = Query(MEETINGS_PAGE_SIZE, ge=1, le=MEETINGS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One page of meetings for list views: no transcript, only its first TRANSCRIPT_PREVIEW_CHARS"""
+    preview = func.substr(DBMeeting.transcript, 1, TRANSCRIPT_PREVIEW_CHARS).label("transcript_preview")
+    statement = select(DBMeeting, preview).options(defer(DBMeeting.transcript, raiseload=True))
+    rows = (await db.execute(_page_statement(statement, status, limit, cursor))).all()
+    meetings = []
+    for meeting, transcript_preview in _page(rows, response, limit):
+        meeting.transcript_preview = transcript_preview
+        meetings.append(meeting)
     return meetings
 
 @router.get("/{meeting_id}", response_model=MeetingResponse)
-async def get_meeting(meeting_id: str, db: Session = Depends(get_db)):
+async def get_meeting(meeting_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a specific meeting by ID"""
-    meeting = db.query(DBMeeting).filter(DBMeeting.id == meeting_id).first()
+    meeting = await db.get(DBMeeting, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
     return meeting
 
+@router.get("/{meeting_id}/segments", response_model=List[TranscriptSegmentResponse])
+async def get_transcript_segments(
+    meeting_id: str,
+    start: Optional[float] = Query(None, ge=0, description="Window start (seconds into the audio)"),
+    end: Optional[float] = Query(None, ge=0, description="Window end (seconds into the audio)"),
+    words: bool = Query(False, description="Include word timestamps"),
+    limit: int = Query(SEGMENTS_PAGE_MAX, ge=1, le=SEGMENTS_PAGE_MAX),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Timed transcript segments overlapping [start, end), without loading the whole transcript"""
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if await db.scalar(select(DBMeeting.id).where(DBMeeting.id == meeting_id)) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    
+    segments = await segments_in_range(db, meeting_id, start, end, limit=limit, words=words)
+    return [
+        TranscriptSegmentResponse(
+            idx=segment.idx,
+            start=segment.start,
+            end=segment.end,
+            text=segment.text,
+            avg_logprob=segment.avg_logprob,
+            no_speech_prob=segment.no_speech_prob,
+            words=segment.words if words else None
+        ) for segment in segments
+    ]
+
 @router.post("/{meeting_id}/summarize", response_model=SummaryResponse)
 async def regenerate_summary(meeting_id: str, db: Session = Depends(get_db)):
     """Regenerate summary for a meeting"""
@@ -404,9 +461,10 @@ async def regenerate_summary(meeting_id: str, db: Session = Depends(get_db)):
         ollama_client = OllamaClient()
         
         # Generate new summary
-        summary = await ollama_client.generate_summary(meeting.transcript)
-        key_points = await ollama_client.extract_key_points(meeting.transcript)
-        action_items = await ollama_client.extract_action_items(meeting.transcript)
+        analysis = await ollama_client.analyze_transcript(meeting.transcript)
+        summary = analysis["summary"]
+        key_points = analysis["key_points"]
+        action_items = analysis["action_items"]
         
         # Update meeting in database
         meeting.summary = summary
@@ -416,6 +474,13 @@ async def regenerate_summary(meeting_id: str, db: Session = Depends(get_db)):
         
         db.commit()
         
+        # Re-index so searches don't return the old summary
+        try:
+            from app.services.vector_store import vector_store
+            vector_store.upsert_meeting(meeting)
+        except Exception as e:
+            print(f"Warning: Could not update meeting in vector store: {e}")
+        
         return SummaryResponse(
             summary=summary,
             key_points=key_points,
@@ -462,7 +527,15 @@ async def delete_meeting(meeting_id: str, db: Session = Depends(get_db)):
     
     try:
         db.delete(meeting)
+        delete_segments(db, meeting_id)
         db.commit()
+        
+        try:
+            from app.services.vector_store import vector_store
+            vector_store.remove_meeting(meeting_id)
+        except Exception as e:
+            print(f"Warning: Could not remove meeting from vector store: {e}")
+        
         return {"message": "Meeting deleted successfully"}
     
     except Exception as e:
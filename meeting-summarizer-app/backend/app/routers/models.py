@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from config import settings
+from app.services.model_registry import model_registry
+from app.services.inference_executor import inference_executor
+
+router = APIRouter()
+
+class WhisperModelSpec(BaseModel):
+    name: str = settings.WHISPER_MODEL
+    device: str = settings.WHISPER_DEVICE
+    compute_type: str = settings.WHISPER_COMPUTE_TYPE
+
+class WhisperSwapRequest(WhisperModelSpec):
+    unload_previous: bool = True
+
+@router.get("/")
+async def get_models():
+    """List models loaded in the API process, the active Whisper model and memory use"""
+    stats = model_registry.stats()
+    stats["inference"] = inference_executor.stats()
+    return stats
+
+@router.post("/whisper/load")
+async def load_whisper_model(spec: WhisperModelSpec):
+    """Load (and warm up) a Whisper model without making it active"""
+    try:
+        # Loading takes seconds, keep it off the event loop
+        await run_in_threadpool(model_registry.get, (spec.name, spec.device, spec.compute_type))
+        return model_registry.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading model: {str(e)}")
+
+@router.post("/whisper/swap")
+async def swap_whisper_model(request: WhisperSwapRequest):
+    """Make another Whisper model the active one"""
+    key = (request.name, request.device, request.compute_type)
+    if inference_executor.is_running():
+        # Inference workers hold the models; they load the new one on their next request
+        model_registry.set_active(key)
+        inference_executor.set_model_key(key)
+        return model_registry.stats()
+    
+    try:
+        await run_in_threadpool(
+            model_registry.swap,
+            key,
+            request.unload_previous
+        )
+        return model_registry.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error swapping model: {str(e)}")
+
+@router.post("/whisper/unload")
+async def unload_whisper_model(spec: WhisperModelSpec):
+    """Unload a Whisper model to free its memory"""
+    key = (spec.name, spec.device, spec.compute_type)
+    if key == model_registry.active_key:
+        raise HTTPException(status_code=400, detail="Cannot unload the active model; swap to another model first")
+
+    if not model_registry.unload(key):
+        raise HTTPException(status_code=404, detail="Model not loaded")
+    return model_registry.stats()
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.pronunciation import PronunciationCorrectionCreate, PronunciationCorrectionUpdate, PronunciationCorrectionResponse
 from app.services.pronunciation_corrector import pronunciation_corrector
 
 router = APIRouter(prefix="/pronunciation", tags=["pronunciation"])
 
 @router.get("/corrections", response_model=List[PronunciationCorrectionResponse])
-async def get_all_corrections(db: Session = Depends(get_db)):
+async def get_all_corrections(db: AsyncSession = Depends(get_async_db)):
     """Get all pronunciation corrections"""
-    corrections = pronunciation_corrector.get_all_corrections(db)
+    corrections = await pronunciation_corrector.aget_all_corrections(db)
     return corrections
 
 @router.post("/corrections", response_model=PronunciationCorrectionResponse)
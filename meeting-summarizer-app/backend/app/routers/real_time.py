@@ -1,5 +1,8 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+import asyncio
 import json
 import uuid
 from app.services.real_time_transcriber import real_time_transcriber
@@ -10,12 +13,36 @@ router = APIRouter()
 
 @router.websocket("/ws/real-time-transcribe")
 async def websocket_real_time_transcribe(websocket: WebSocket):
-    """WebSocket endpoint for real-time transcription and suggestions"""
+    """WebSocket endpoint for real-time transcription and suggestions.
+    
+    Client -> server: binary audio frames, and JSON commands `start_session`
+    (`mode`: `ai_assistant` for VOSK or `standard` for Whisper), `get_session`, `end_session`.
+    
+    Server -> client (JSON, every message has `type` and `session_id`):
+    - `session_started` - `mode`, `engine`
+    - `partial` - `text`: current hypothesis of the utterance in progress (VOSK); it
+      may change with every message until the utterance is closed, `full_transcript`
+    - `final` - `text`/`transcription`: a closed utterance (VOSK endpoint), `confidence`,
+      `words` (word timings), `full_transcript`
+    - `suggestions_update` - `suggestions` generated in the background from recent
+      finals (`based_on`); sent independently of transcription messages
+    - `transcription_update` - one Whisper transcription per audio chunk
+    - `session_data`, `session_ended`, `error`
+    """
     await websocket.accept()
     print("INFO:     connection open")
     session_id = str(uuid.uuid4())
     use_vosk = True  # Default to VOSK for real-time (AI Assistant mode)
     
+    # Transcription replies and background suggestion updates share the socket
+    send_lock = asyncio.Lock()
+    
+    async def send_message(message: dict):
+        async with send_lock:
+            await websocket.send_text(json.dumps(message))
+    
+    real_time_transcriber.start_suggestions(session_id, send_message)
+    
     try:
         while True:
             # Receive audio data
@@ -32,28 +59,13 @@ async def websocket_real_time_transcribe(websocket: WebSocket):
                 if "bytes" in data:
                     # Process audio chunk
                     print(f"[WEBSOCKET] Processing audio chunk of {len(data['bytes'])} bytes for session {session_id} (VOSK: {use_vosk})")
-                    result = await real_time_transcriber.process_audio_chunk(
+                    messages = await real_time_transcriber.process_audio_chunk(
                         session_id, data["bytes"], use_vosk=use_vosk
                     )
                     
-                    print(f"[WEBSOCKET] Transcriber result: {result}")
-                    
-                    # Ensure we always send a response with the expected format
-                    response = {
-                        "type": "transcription_update",
-                        "session_id": session_id,
-                        "transcription": result.get("transcription", ""),
-                        "full_transcript": result.get("full_transcript", ""),
-                        "suggestions": result.get("suggestions", []),
-                        "timestamp": result.get("timestamp", "")
-                    }
-                    
-                    if result.get("error"):
-                        response["error"] = result["error"]
-                    
-                    print(f"[WEBSOCKET] Sending response: {response}")
-                    # Send result back to client
-                    await websocket.send_text(json.dumps(response))
+                    # A chunk can produce any number of partial/final messages (or none)
+                    for message in messages:
+                        await send_message({"session_id": session_id, **message})
                 
                 elif "text" in data:
                     # Handle text commands
@@ -71,34 +83,36 @@ async def websocket_real_time_transcribe(websocket: WebSocket):
                             # Initialize VOSK session
                             real_time_transcriber.start_vosk_session(session_id)
                         
-                        await websocket.send_text(json.dumps({
+                        await send_message({
                             "type": "session_started",
                             "session_id": session_id,
                             "status": "ready",
                             "mode": mode,
                             "engine": "vosk" if use_vosk else "whisper"
-                        }))
+                        })
                         print(f"[WEBSOCKET] Session started: {session_id}, mode: {mode}, engine: {'VOSK' if use_vosk else 'Whisper'}")
                     
                     elif command == "end_session":
-                        # Clean up VOSK session if needed
+                        # Deliver the utterance still in progress, then clean up VOSK session if needed
+                        for message in await real_time_transcriber.flush_vosk_session(session_id):
+                            await send_message({"session_id": session_id, **message})
                         real_time_transcriber.end_vosk_session(session_id)
                         result = real_time_transcriber.end_session(session_id)
-                        await websocket.send_text(json.dumps({
+                        await send_message({
                             "type": "session_ended",
                             "session_id": session_id,
                             **result
-                        }))
+                        })
                         print(f"[WEBSOCKET] Session ended: {session_id}")
                         break
                     
                     elif command == "get_session":
                         session_data = real_time_transcriber.get_session(session_id)
-                        await websocket.send_text(json.dumps({
+                        await send_message({
                             "type": "session_data",
                             "session_id": session_id,
                             **session_data
-                        }))
+                        })
     
     except WebSocketDisconnect:
         # Clean up sessions on disconnect
@@ -115,11 +129,11 @@ async def websocket_real_time_transcribe(websocket: WebSocket):
         real_time_transcriber.end_session(session_id)
         try:
             if websocket.client_state.value != 3:  # Not DISCONNECTED
-                await websocket.send_text(json.dumps({
+                await send_message({
                     "type": "error",
                     "session_id": session_id,
                     "error": str(e)
-                }))
+                })
         except:
             pass  # Connection might be closed
     
@@ -141,15 +155,32 @@ async def rebuild_vector_index(db: Session = Depends(get_db)):
     """Rebuild the vector search index from all meetings"""
     try:
         vector_store.rebuild_index(db)
-        return {"message": "Vector index rebuilt successfully", "chunks": len(vector_store.chunks)}
+        return {"message": "Vector index rebuilt successfully", "chunks": vector_store.count()}
     except Exception as e:
         return {"error": str(e)}
 
+@router.get("/vector-index")
+async def vector_index_stats():
+    """Vector index type, size and search parameters"""
+    return vector_store.stats()
+
 @router.get("/search-meetings")
-async def search_meetings(query: str, top_k: int = 5):
-    """Search for similar content in previous meetings"""
+async def search_meetings(
+    query: str,
+    top_k: int = 5,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    meeting_id: Optional[List[str]] = Query(None),
+    kind: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None)
+):
+    """Search for similar content in previous meetings, optionally filtered by
+    creation time, meeting, chunk kind (transcript, summary, key_point, action_item) and meeting status"""
     try:
-        results = vector_store.search_similar(query, top_k)
+        results = await vector_store.asearch_similar(
+            query, top_k, created_after=created_after, created_before=created_before,
+            meeting_ids=meeting_id, kinds=kind, statuses=status
+        )
         return {"results": results}
     except Exception as e:
         return {"error": str(e)}
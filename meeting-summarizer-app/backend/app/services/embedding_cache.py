@@ -0,0 +1,101 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from app.utils.metrics import metrics
+
+DIGEST_SIZE = 32  # sha256
+
+class EmbeddingCache:
+    """On-disk cache of text embeddings keyed by (model name, sha256(text)).
+
+    Each model has two append-only files: `<model>.f16` holds the embeddings as
+    float16 rows (half the size of float32, read through a memory map so only the
+    rows that are used get paged in) and `<model>.keys` holds the sha256 digest of
+    each row's text in the same order. Rows are written before their keys, so after
+    a crash both files are truncated to the rows that have a key.
+    """
+
+    def __init__(self, directory: str, model_name: str, dimension: int):
+        self.dimension = dimension
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.vectors_file = os.path.join(directory, f"{slug}.f16")
+        self.keys_file = os.path.join(directory, f"{slug}.keys")
+        self._lock = threading.Lock()
+        self._rows: Dict[bytes, int] = {}
+        self._memmap: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self):
+        row_bytes = self.dimension * 2
+        key_rows = os.path.getsize(self.keys_file) // DIGEST_SIZE if os.path.exists(self.keys_file) else 0
+        vector_rows = os.path.getsize(self.vectors_file) // row_bytes if os.path.exists(self.vectors_file) else 0
+        rows = min(key_rows, vector_rows)
+        # Drop rows whose key (or key whose row) was never fully written
+        for path, size in ((self.keys_file, rows * DIGEST_SIZE), (self.vectors_file, rows * row_bytes)):
+            with open(path, "ab") as f:
+                f.truncate(size)
+        with open(self.keys_file, "rb") as f:
+            keys = f.read()
+        self._rows = {keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]: i for i in range(rows)}
+        print(f"[EMBEDDINGS] Loaded {rows} cached embeddings from {self.vectors_file}")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _vectors(self, rows: int) -> np.memmap:
+        """Memory map covering at least the first rows rows"""
+        if self._memmap is None or len(self._memmap) < rows:
+            self._memmap = np.memmap(self.vectors_file, dtype=np.float16, mode="r", shape=(len(self._rows), self.dimension))
+        return self._memmap
+
+    def _append(self, digests: List[bytes], vectors: np.ndarray):
+        with self._lock:
+            new = [i for i, digest in enumerate(digests) if digest not in self._rows]
+            if not new:
+                return
+            first_row = len(self._rows)
+            for path, data in (
+                (self.vectors_file, vectors[new].astype(np.float16).tobytes()),
+                (self.keys_file, b"".join(digests[i] for i in new))
+            ):
+                with open(path, "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            for offset, i in enumerate(new):
+                self._rows[digests[i]] = first_row + offset
+
+    def encode(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Embeddings for texts (float32, unit length), calling encode only for texts not cached"""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        digests = [self.digest(text) for text in texts]
+        missing: Dict[bytes, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest not in self._rows:
+                missing[digest] = text
+
+        metrics.inc("embeddings.cache.hits", len(texts) - len(missing))
+        metrics.inc("embeddings.cache.misses", len(missing))
+        if missing:
+            with metrics.timer("embeddings.encode.seconds"):
+                encoded = np.asarray(encode(list(missing.values())), dtype=np.float32)
+            self._append(list(missing.keys()), encoded)
+
+        with self._lock:
+            rows = np.array([self._rows[digest] for digest in digests], dtype=np.int64)
+        vectors = np.asarray(self._vectors(int(rows.max()) + 1)[rows], dtype=np.float32)
+        # Restore unit length lost to float16 rounding (inner product == cosine)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def stats(self) -> Dict[str, int]:
+        return {"embeddings": len(self._rows), "bytes": len(self._rows) * self.dimension * 2}
@@ -0,0 +1,210 @@
+import asyncio
+import multiprocessing
+import time
+from typing import List, Optional
+from fastapi import Request
+from config import settings
+from app.utils.metrics import metrics
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference submission queue is full; callers should answer 503"""
+
+def _worker_main(conn, model_key):
+    """Worker process loop: preload the model, then serve transcription requests from the pipe"""
+    from app.services.model_registry import model_registry
+    from app.services.whisper_client import WhisperClient
+
+    try:
+        model_registry.get(model_key)
+    except Exception as e:
+        print(f"[INFERENCE] Worker could not preload model: {e}")
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+
+        audio, key = request
+        try:
+            key = tuple(key)
+            # Keep one model per worker: drop others when the active model was swapped
+            for loaded in model_registry.loaded_keys():
+                if loaded != key:
+                    model_registry.unload(loaded)
+            conn.send(("ok", WhisperClient(key).transcribe_sync(audio)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    def __init__(self, ctx, model_key):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, model_key), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def terminate(self):
+        try:
+            self.process.terminate()
+            self.process.join(timeout=5)
+        finally:
+            self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.terminate()
+
+class InferenceExecutor:
+    """Pool of worker processes, each holding a preloaded Whisper model.
+
+    Requests wait in a bounded queue for a free worker; when the queue is full,
+    submissions are rejected with InferenceQueueFull instead of piling up. Cancelling
+    the awaiting task (e.g. because the client disconnected) drops a queued request,
+    or kills and replaces the worker if decoding already started. Killing and spawning
+    processes blocks, so replacements are made in the background, off the event loop.
+    """
+
+    def __init__(self, workers: int = settings.INFERENCE_WORKERS, queue_size: int = settings.INFERENCE_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._ctx = multiprocessing.get_context("spawn")
+        self._all: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._waiting = 0
+        self._model_key = None
+        self._respawning = set()  # Background replacement tasks (referenced so they aren't collected)
+
+    def is_running(self) -> bool:
+        return self._idle is not None
+
+    def is_ready(self) -> bool:
+        return self.is_running() and any(worker.is_alive() for worker in self._all)
+
+    async def start(self, model_key):
+        """Spawn the worker processes; each starts loading model_key immediately"""
+        if self.workers <= 0:
+            print("[INFERENCE] Inference pool disabled, transcribing in-process")
+            return
+        self._model_key = tuple(model_key)
+        self._idle = asyncio.Queue()
+        for _ in range(self.workers):
+            worker = _Worker(self._ctx, self._model_key)
+            self._all.append(worker)
+            self._idle.put_nowait(worker)
+        self._update_gauges()
+        print(f"[INFERENCE] Started {self.workers} inference worker(s)")
+
+    async def stop(self):
+        workers, self._all, self._idle = self._all, [], None
+        await asyncio.gather(*(asyncio.to_thread(worker.stop) for worker in workers))
+
+    def stats(self) -> dict:
+        return {
+            "running": self.is_running(),
+            "workers": len(self._all),
+            "alive_workers": sum(1 for worker in self._all if worker.is_alive()),
+            "idle_workers": self._idle.qsize() if self._idle else 0,
+            "queue_depth": self._waiting,
+            "queue_size": self.queue_size
+        }
+
+    def set_model_key(self, model_key):
+        """Model preloaded by replacement workers; running workers switch on their next request"""
+        self._model_key = tuple(model_key)
+
+    def _update_gauges(self):
+        metrics.set_gauge("inference.queue_depth", self._waiting)
+        metrics.set_gauge("inference.busy_workers", len(self._all) - self._idle.qsize() if self._idle else 0)
+
+    def _respawn(self, worker: _Worker):
+        """Replace a dead or killed worker in the background; the replacement joins the idle queue"""
+        task = asyncio.get_running_loop().create_task(self._replace(worker))
+        self._respawning.add(task)
+        task.add_done_callback(self._respawning.discard)
+
+    async def _replace(self, worker: _Worker):
+        # Joining the old process and spawning the new one both block, so they run in threads
+        await asyncio.to_thread(worker.terminate)
+        replacement = await asyncio.to_thread(_Worker, self._ctx, self._model_key)
+        if self._idle is None:
+            # Stopped meanwhile
+            await asyncio.to_thread(replacement.stop)
+            return
+        self._all = [w for w in self._all if w is not worker] + [replacement]
+        self._idle.put_nowait(replacement)
+        self._update_gauges()
+
+    async def transcribe(self, audio, model_key) -> dict:
+        """Transcribe a file path or an array of 16 kHz samples on a worker"""
+        if self._waiting >= self.queue_size:
+            metrics.inc("inference.rejected")
+            raise InferenceQueueFull(f"Inference queue is full ({self._waiting} waiting)")
+
+        self._waiting += 1
+        self._update_gauges()
+        enqueued_at = time.perf_counter()
+        try:
+            worker = await self._idle.get()
+            while not worker.is_alive():
+                self._respawn(worker)
+                worker = await self._idle.get()
+        except asyncio.CancelledError:
+            metrics.inc("inference.cancelled_queued")
+            raise
+        finally:
+            self._waiting -= 1
+        metrics.observe("inference.wait.seconds", time.perf_counter() - enqueued_at)
+        self._update_gauges()
+
+        started_at = time.perf_counter()
+        try:
+            worker.conn.send((audio, tuple(model_key)))
+            status, payload = await asyncio.get_running_loop().run_in_executor(None, worker.conn.recv)
+        except asyncio.CancelledError:
+            # The only way to stop a running decode is to stop its process
+            print("[INFERENCE] Request cancelled mid-decode, restarting worker")
+            metrics.inc("inference.cancelled_running")
+            self._respawn(worker)
+            worker = None
+            raise
+        except (EOFError, OSError) as e:
+            metrics.inc("inference.worker_crashes")
+            self._respawn(worker)
+            worker = None
+            raise RuntimeError(f"Inference worker died: {e}")
+        finally:
+            metrics.observe("inference.run.seconds", time.perf_counter() - started_at)
+            if worker is not None and self._idle is not None:
+                self._idle.put_nowait(worker)
+            self._update_gauges()
+
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+async def cancel_on_disconnect(request: Request, coro, poll_interval: float = 0.5):
+    """Await coro, cancelling it if the HTTP client disconnects first"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                print("[INFERENCE] Client disconnected, cancelling transcription")
+                task.cancel()
+                raise asyncio.CancelledError()
+    finally:
+        if not task.done():
+            task.cancel()
+
+# Global instance
+inference_executor = InferenceExecutor()
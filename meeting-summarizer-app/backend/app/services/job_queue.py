@@ -0,0 +1,207 @@
+import asyncio
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from config import settings
+from app.database import SessionLocal, Job, Meeting as DBMeeting
+from app.models.job import JobStatus
+from app.models.meeting import MeetingStatus
+from app.services.job_worker import run_job
+from app.utils.metrics import metrics
+
+class JobQueue:
+    """Persistent job queue: rows live in the jobs table, work runs in a pool of worker processes"""
+
+    def __init__(self, max_workers: int = settings.JOB_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that already holds torch/FAISS state is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def start(self):
+        """Recover interrupted jobs and start dispatching"""
+        self._executor = self._create_executor()
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self.recover_interrupted)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        print(f"[JOBS] Job queue started with {self.max_workers} worker process(es)")
+
+    async def stop(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._executor:
+            # Running jobs stay in "running" and are re-queued on the next start
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def recover_interrupted(self, job_id: Optional[str] = None):
+        """Re-queue jobs that were running when the server (or their worker) stopped"""
+        db = SessionLocal()
+        try:
+            query = db.query(Job).filter(Job.status == JobStatus.RUNNING.value)
+            if job_id:
+                query = query.filter(Job.id == job_id)
+            interrupted = query.all()
+            for job in interrupted:
+                if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+                    job.status = JobStatus.FAILED.value
+                    job.error = f"Interrupted after {job.attempts} attempts"
+                    job.finished_at = datetime.utcnow()
+                    self._revert_meeting(db, job)
+                else:
+                    job.status = JobStatus.QUEUED.value
+                    job.stage = "requeued"
+                job.updated_at = datetime.utcnow()
+            db.commit()
+            if interrupted:
+                print(f"[JOBS] Recovered {len(interrupted)} interrupted job(s)")
+        finally:
+            db.close()
+
+    def enqueue(self, db: Session, kind: str, payload: Dict, meeting_id: Optional[str] = None) -> Job:
+        """Persist a new job and wake the dispatcher"""
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            meeting_id=meeting_id,
+            payload=payload,
+            status=JobStatus.QUEUED.value,
+            stage="queued",
+            progress=0.0,
+            attempts=0,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        metrics.inc(f"jobs.{kind}.enqueued")
+
+        if self._wakeup:
+            self._wakeup.set()
+        return job
+
+    def get(self, db: Session, job_id: str) -> Optional[Job]:
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    async def aget(self, db: AsyncSession, job_id: str) -> Optional[Job]:
+        return await db.get(Job, job_id)
+
+    async def _dispatch_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                free_slots = self.max_workers - len(self._running)
+                if free_slots <= 0:
+                    continue
+                # Database work runs in a thread so the loop keeps serving requests and websockets
+                for job_id in await asyncio.to_thread(self._claim, free_slots):
+                    self._running[job_id] = asyncio.create_task(self._run(job_id))
+                metrics.set_gauge("jobs.running", len(self._running))
+            except Exception as e:
+                print(f"[JOBS] Dispatcher error: {e}")
+
+    def _claim(self, limit: int) -> List[str]:
+        """Mark the oldest queued jobs as running and return their ids"""
+        db = SessionLocal()
+        try:
+            jobs = db.query(Job).filter(
+                Job.status == JobStatus.QUEUED.value
+            ).order_by(Job.created_at).limit(limit).all()
+
+            for job in jobs:
+                job.status = JobStatus.RUNNING.value
+                job.stage = "starting"
+                job.attempts += 1
+                job.started_at = datetime.utcnow()
+                job.updated_at = datetime.utcnow()
+            db.commit()
+            return [job.id for job in jobs]
+        finally:
+            db.close()
+
+    async def _run(self, job_id: str):
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            status = await loop.run_in_executor(executor, run_job, job_id)
+            metrics.inc(f"jobs.{status}")
+            if status == JobStatus.COMPLETED.value:
+                await asyncio.to_thread(self._on_completed, job_id)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); replace the pool and let recovery retry the job
+            print(f"[JOBS] Worker process died while running job {job_id}")
+            metrics.inc("jobs.worker_crashes")
+            if self._executor is executor:
+                self._executor = self._create_executor()
+            await asyncio.to_thread(self.recover_interrupted, job_id)
+        except Exception as e:
+            print(f"[JOBS] Error running job {job_id}: {e}")
+            await asyncio.to_thread(self._mark_failed, job_id, str(e))
+        finally:
+            self._running.pop(job_id, None)
+            metrics.set_gauge("jobs.running", len(self._running))
+            self._wakeup.set()
+
+    def _on_completed(self, job_id: str):
+        """Post-processing that must happen in the API process (the vector index lives here)"""
+        db = SessionLocal()
+        try:
+            job = self.get(db, job_id)
+            if not job or not job.meeting_id:
+                return
+            meeting = db.query(DBMeeting).filter(DBMeeting.id == job.meeting_id).first()
+            if meeting:
+                try:
+                    from app.services.vector_store import vector_store
+                    vector_store.upsert_meeting(meeting)  # A retried job may have indexed it already
+                except Exception as e:
+                    print(f"Warning: Could not add meeting to vector store: {e}")
+        finally:
+            db.close()
+
+    def _mark_failed(self, job_id: str, error: str):
+        db = SessionLocal()
+        try:
+            job = self.get(db, job_id)
+            if job and job.status not in (JobStatus.COMPLETED.value, JobStatus.FAILED.value):
+                job.status = JobStatus.FAILED.value
+                job.stage = "failed"
+                job.error = error
+                job.finished_at = datetime.utcnow()
+                job.updated_at = datetime.utcnow()
+                self._revert_meeting(db, job)
+                db.commit()
+        finally:
+            db.close()
+
+    def _revert_meeting(self, db: Session, job: Job):
+        """Put a meeting whose processing failed back into draft"""
+        if not job.meeting_id:
+            return
+        meeting = db.query(DBMeeting).filter(DBMeeting.id == job.meeting_id).first()
+        if meeting and meeting.status == MeetingStatus.PROCESSING.value:
+            meeting.status = MeetingStatus.DRAFT.value
+            meeting.updated_at = datetime.utcnow()
+
+# Global instance
+job_queue = JobQueue()
@@ -0,0 +1,104 @@
+"""
+Job entry points executed inside the job queue's worker processes.
+
+Each worker process keeps its own Whisper model (via the model registry) across
+jobs and writes progress straight to the job row, so the API process only has
+to read it back.
+"""
+import asyncio
+import traceback
+from datetime import datetime
+from app.database import SessionLocal, Job, Meeting as DBMeeting
+from app.models.job import JobStatus, JobKind
+from app.models.meeting import MeetingStatus
+from app.services.transcript_segments import replace_segments
+
+def _update_job(db, job: Job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+async def _process_meeting_audio(db, job: Job):
+    from app.services.whisper_client import WhisperClient
+    from app.services.ollama_client import OllamaClient
+    from app.services.summarizer import MeetingSummarizer
+
+    meeting = db.query(DBMeeting).filter(DBMeeting.id == job.meeting_id).first()
+    if not meeting:
+        raise ValueError(f"Meeting {job.meeting_id} not found")
+
+    audio_file_path = job.payload["audio_file_path"]
+    summarizer = MeetingSummarizer(WhisperClient(), OllamaClient())
+
+    _update_job(db, job, stage="transcribing", progress=0.1)
+    transcription, segments = await summarizer.process_audio_segments(audio_file_path)
+
+    _update_job(db, job, stage="summarizing", progress=0.6)
+    summary = await summarizer.generate_meeting_summary(transcription.text)
+
+    meeting.transcript = transcription.text
+    meeting.summary = summary.summary
+    meeting.key_points = summary.key_points
+    meeting.action_items = summary.action_items
+    meeting.duration = transcription.duration
+    meeting.language = transcription.language
+    meeting.file_name = audio_file_path.split('/')[-1] if '/' in audio_file_path else audio_file_path
+    meeting.status = MeetingStatus.COMPLETED.value
+    meeting.updated_at = datetime.utcnow()
+    # Timed segments go in with the transcript, in the same transaction
+    segment_count = replace_segments(db, meeting.id, segments)
+    db.commit()
+
+    return {"meeting_id": meeting.id, "transcript_length": len(transcription.text), "segments": segment_count}
+
+HANDLERS = {
+    JobKind.PROCESS_MEETING_AUDIO.value: _process_meeting_audio,
+}
+
+async def _run(job_id: str) -> str:
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            print(f"[JOBS] Job {job_id} not found")
+            return JobStatus.FAILED.value
+
+        try:
+            handler = HANDLERS[job.kind]
+            result = await handler(db, job)
+            _update_job(
+                db, job,
+                status=JobStatus.COMPLETED.value,
+                stage="completed",
+                progress=1.0,
+                result=result,
+                error=None,
+                finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            print(f"[JOBS] Job {job_id} failed: {e}")
+            print(f"[JOBS] Full traceback: {traceback.format_exc()}")
+            db.rollback()
+            _update_job(
+                db, job,
+                status=JobStatus.FAILED.value,
+                stage="failed",
+                error=str(e),
+                finished_at=datetime.utcnow()
+            )
+            # Revert the meeting to draft on error, same as the synchronous path did
+            if job.meeting_id:
+                meeting = db.query(DBMeeting).filter(DBMeeting.id == job.meeting_id).first()
+                if meeting and meeting.status == MeetingStatus.PROCESSING.value:
+                    meeting.status = MeetingStatus.DRAFT.value
+                    meeting.updated_at = datetime.utcnow()
+                    db.commit()
+
+        return job.status
+    finally:
+        db.close()
+
+def run_job(job_id: str) -> str:
+    """Run one job to completion in the current (worker) process and return its final status"""
+    return asyncio.run(_run(job_id))
@@ -0,0 +1,90 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import FTS_TABLE
+from app.utils.metrics import metrics
+
+# Column weights for bm25, in FTS_COLUMNS order: title, transcript, summary, key_points, action_items
+BM25_WEIGHTS = (5.0, 1.0, 3.0, 2.0, 2.0)
+
+STOPWORDS = {
+    "a", "about", "all", "an", "and", "any", "are", "as", "at", "be", "did", "do", "does", "for",
+    "from", "had", "has", "have", "how", "i", "in", "is", "it", "last", "me", "meeting", "meetings",
+    "my", "of", "on", "or", "our", "said", "show", "that", "the", "there", "this", "to", "us", "was",
+    "we", "were", "what", "when", "where", "which", "who", "why", "with", "you"
+}
+
+SNIPPET_TOKENS = 48  # Length of the matched passage returned per meeting
+
+TERM_PATTERN = re.compile(r'"([^"]+)"|([\w][\w\-./#]*)', re.UNICODE)
+
+def _terms(query: str) -> List[str]:
+    """Quoted phrases and words of the query, without stopwords"""
+    terms = []
+    for phrase, word in TERM_PATTERN.findall(query):
+        term = phrase or word
+        if phrase or term.lower() not in STOPWORDS:
+            terms.append(term)
+    return terms
+
+def has_exact_terms(query: str) -> bool:
+    """Whether the query names something a keyword match answers best:
+    a quoted phrase, an id or version such as JIRA-1234, v2.3 or 512, or an acronym"""
+    for phrase, word in TERM_PATTERN.findall(query):
+        if phrase or any(c.isdigit() for c in word) or (len(word) > 1 and word.isupper()):
+            return True
+    return False
+
+def to_match_expression(query: str) -> str:
+    """FTS5 MATCH expression that ORs the query terms, each quoted so punctuation is never syntax"""
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in _terms(query))
+
+async def search_meetings(
+    db: AsyncSession,
+    query: str,
+    limit: int = 20,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+) -> List[Tuple[str, float, str]]:
+    """(meeting id, score, snippet) ranked by BM25 over title, transcript, summary, key points
+    and action items; the snippet is the passage around the matched terms"""
+    expression = to_match_expression(query)
+    if not expression:
+        return []
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    conditions = [f"{FTS_TABLE} MATCH :expression"]
+    params = {"expression": expression, "limit": limit}
+    dates = []
+    if created_after is not None:
+        conditions.append("meetings.created_at >= :created_after")
+        params["created_after"] = created_after
+        dates.append(bindparam("created_after", type_=DateTime))
+    if created_before is not None:
+        conditions.append("meetings.created_at < :created_before")
+        params["created_before"] = created_before
+        dates.append(bindparam("created_before", type_=DateTime))
+    try:
+        # Joined on the implicit rowid, which VACUUM may renumber: rebuild the index after one (see FtsIndex)
+        with metrics.timer("chat.lexical_search.seconds"):
+            rows = (await db.execute(text(
+                f"SELECT meetings.id, bm25({FTS_TABLE}, {weights}) AS score, "
+                f"snippet({FTS_TABLE}, -1, '', '', '...', {SNIPPET_TOKENS}) "
+                f"FROM {FTS_TABLE} JOIN meetings ON meetings.rowid = {FTS_TABLE}.rowid "
+                f"WHERE {' AND '.join(conditions)} ORDER BY score LIMIT :limit"
+            ).bindparams(*dates), params)).all()
+    except Exception as e:
+        # No FTS5 in this SQLite build (or an unparsable query): answer from dense search only
+        print(f"[CHAT] Lexical search unavailable: {e}")
+        return []
+    # bm25() is lower for better matches; flip it so larger is better
+    return [(meeting_id, -score, snippet) for meeting_id, score, snippet in rows]
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> Dict[str, float]:
+    """Fuse ranked id lists: each list contributes 1 / (k + rank) for every id it ranks"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return scores
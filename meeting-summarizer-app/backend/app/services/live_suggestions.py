@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+from config import settings
+from app.utils.metrics import metrics
+
+class SessionSuggester:
+    """Background suggestion generation for one real-time session.
+
+    Final utterances are queued without waiting; a single task per session coalesces
+    them, waits until the speaker pauses for SUGGESTION_DEBOUNCE seconds and at least
+    SUGGESTION_INTERVAL seconds have passed since the previous LLM call, then generates
+    suggestions and pushes them with `send`. Because the task handles one batch at a
+    time, at most one LLM call per session is in flight; utterances arriving meanwhile
+    are merged into the next batch.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        generate: Callable[[str, str], Awaitable[List[Dict]]],
+        send: Callable[[Dict], Awaitable[None]],
+        interval: float = settings.SUGGESTION_INTERVAL,
+        debounce: float = settings.SUGGESTION_DEBOUNCE
+    ):
+        self.session_id = session_id
+        self.generate = generate
+        self.send = send
+        self.interval = interval
+        self.debounce = debounce
+        self._pending: List[str] = []
+        self._full_transcript = ""
+        self._last_final_at = 0.0
+        self._last_call_at: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def add_final(self, text: str, full_transcript: str):
+        """Queue a final utterance; never blocks the transcription path"""
+        self._pending.append(text)
+        self._full_transcript = full_transcript
+        self._last_final_at = time.monotonic()
+        self._wakeup.set()
+
+    async def _wait_for_batch(self):
+        """Sleep until the speaker paused and the per-session interval has elapsed"""
+        while True:
+            now = time.monotonic()
+            ready_at = self._last_final_at + self.debounce
+            if self._last_call_at is not None:
+                ready_at = max(ready_at, self._last_call_at + self.interval)
+            if now >= ready_at:
+                return
+            await asyncio.sleep(ready_at - now)
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._wait_for_batch()
+
+            batch, self._pending = self._pending, []
+            if not batch:
+                continue
+
+            metrics.observe("realtime.suggestions.coalesced_finals", len(batch), buckets=(1, 2, 3, 5, 10, 20, 50))
+            self._last_call_at = time.monotonic()
+            text = " ".join(batch)
+            try:
+                with metrics.timer("realtime.suggestions.seconds"):
+                    suggestions = await self.generate(text, self._full_transcript)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[SUGGESTIONS] Error generating suggestions for session {self.session_id}: {e}")
+                metrics.inc("realtime.suggestions.errors")
+                continue
+
+            if not suggestions:
+                continue
+            try:
+                await self.send({
+                    "type": "suggestions_update",
+                    "session_id": self.session_id,
+                    "suggestions": suggestions,
+                    "based_on": text,
+                    "timestamp": datetime.now().isoformat()
+                })
+            except Exception as e:
+                # Websocket closed; the session cleanup will stop this task
+                print(f"[SUGGESTIONS] Could not send suggestions for session {self.session_id}: {e}")
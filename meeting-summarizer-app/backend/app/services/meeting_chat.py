@@ -1,16 +1,30 @@
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from app.database import Meeting
 from app.services.vector_store import vector_store
+from app.services.lexical_search import has_exact_terms, reciprocal_rank_fusion, search_meetings
+from app.utils.metrics import metrics
+from config import settings
 from app.services.ollama_client import OllamaClient
 import json
 import re
+import time
+
+EXCERPT_CHARS = 500  # Transcript prefix used when no passage of a meeting matched
+PASSAGES_PER_MEETING = 3
+NO_MEETINGS_RESPONSE = (
+    "I couldn't find any relevant meetings for your query. "
+    "Please try a different question or check if you have any meetings recorded."
+)
 
 class MeetingChatService:
     def __init__(self):
         self.ollama_client = OllamaClient()
     
-    async def process_query(self, query: str, db: Session) -> Dict[str, Any]:
+    async def process_query(self, query: str, db: AsyncSession) -> Dict[str, Any]:
         """Process a natural language query about meetings"""
         try:
             # Determine query type and extract relevant meetings
@@ -23,16 +37,7 @@ class MeetingChatService:
             return {
                 "query": query,
                 "response": response,
-                "query_type": query_analysis.get("type", "general"),
-                "meetings_found": len(relevant_meetings),
-                "relevant_meetings": [
-                    {
-                        "id": meeting.id,
-                        "title": meeting.title,
-                        "created_at": meeting.created_at.isoformat(),
-                        "relevance_score": meeting.relevance_score if hasattr(meeting, 'relevance_score') else 0
-                    } for meeting in relevant_meetings[:5]  # Top 5 most relevant
-                ]
+                **self._describe_results(query_analysis, relevant_meetings)
             }
         except Exception as e:
             return {
@@ -43,6 +48,60 @@ class MeetingChatService:
                 "relevant_meetings": []
             }
     
+    async def stream_query(self, query: str, db: AsyncSession) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Answer a query as (event, data) pairs: "meetings" once retrieval is done, then
+        "token" for each piece of the answer as the model generates it, then "done".
+        Failures end the stream with an "error" event.
+        
+        Closing the iterator stops generation on the Ollama side as well.
+        """
+        start = time.perf_counter()
+        try:
+            query_analysis = await self._analyze_query(query)
+            relevant_meetings = await self._get_relevant_meetings(query, query_analysis, db)
+        except Exception as e:
+            yield "error", {"message": f"I'm sorry, I encountered an error while processing your query: {str(e)}"}
+            return
+        
+        yield "meetings", {"query": query, **self._describe_results(query_analysis, relevant_meetings)}
+        
+        if not relevant_meetings:
+            yield "token", {"text": NO_MEETINGS_RESPONSE}
+            yield "done", {}
+            return
+        
+        prompt = self._create_prompt(query, query_analysis, self._prepare_meeting_context(relevant_meetings, query_analysis["type"]))
+        tokens = self.ollama_client.stream_generate(prompt)
+        first = True
+        try:
+            async for token in tokens:
+                if first:
+                    first = False
+                    metrics.observe("chat.stream.ttft.seconds", time.perf_counter() - start)
+                yield "token", {"text": token}
+        except Exception as e:
+            yield "error", {"message": f"I found relevant meetings but had trouble generating a response. Error: {str(e)}"}
+            return
+        finally:
+            await tokens.aclose()
+        metrics.observe("chat.stream.seconds", time.perf_counter() - start)
+        yield "done", {}
+    
+    def _describe_results(self, analysis: Dict, meetings: List[Meeting]) -> Dict[str, Any]:
+        """Query type and the top meetings an answer was based on"""
+        return {
+            "query_type": analysis.get("type", "general"),
+            "meetings_found": len(meetings),
+            "relevant_meetings": [
+                {
+                    "id": meeting.id,
+                    "title": meeting.title,
+                    "created_at": meeting.created_at.isoformat(),
+                    "relevance_score": meeting.relevance_score if hasattr(meeting, 'relevance_score') else 0
+                } for meeting in meetings[:5]  # Top 5 most relevant
+            ]
+        }
+    
     async def _analyze_query(self, query: str) -> Dict[str, Any]:
         """Analyze the query to determine intent and type"""
         query_lower = query.lower()
@@ -116,40 +175,103 @@ class MeetingChatService:
         
         return entities
     
-    async def _get_relevant_meetings(self, query: str, analysis: Dict, db: Session) -> List[Meeting]:
-        """Get meetings relevant to the query"""
-        # Use vector search to find semantically similar content
-        similar_chunks = vector_store.search_similar(query, top_k=10)
+    def _date_range(self, dates: List[str], now: Optional[datetime] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """[start, end) creation-time range covering the extracted date terms; (None, None) if there are none"""
+        now = now or datetime.utcnow()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week = today - timedelta(days=today.weekday())
+        month = today.replace(day=1)
+        previous_month = (month - timedelta(days=1)).replace(day=1)
+        ranges = {
+            "today": (today, None),
+            "yesterday": (today - timedelta(days=1), today),
+            "this week": (week, None),
+            "last week": (week - timedelta(days=7), week),
+            "this month": (month, None),
+            "last month": (previous_month, month)
+        }
+        spans = [ranges[term] for term in dates if term in ranges]
+        if not spans:
+            return None, None
+        start = min(span[0] for span in spans)
+        end = None if any(span[1] is None for span in spans) else max(span[1] for span in spans)
+        return start, end
+    
+    async def _get_relevant_meetings(self, query: str, analysis: Dict, db: AsyncSession) -> List[Meeting]:
+        """Get meetings relevant to the query (keyword and semantic matches, fused by rank)"""
+        # Time-scoped questions ("last week") only consider meetings from that period
+        created_after, created_before = self._date_range(analysis.get("entities", {}).get("dates", []))
         
-        if not similar_chunks:
-            # Fallback: get recent meetings
-            meetings = db.query(Meeting).order_by(Meeting.created_at.desc()).limit(5).all()
-            return meetings
+        # Keyword search (FTS5/BM25) is cheap and catches exact terms embeddings miss
+        lexical = await search_meetings(
+            db, query, limit=settings.CHAT_LEXICAL_TOP_K, created_after=created_after, created_before=created_before
+        )
+        lexical_ids = [meeting_id for meeting_id, _, _ in lexical]
+        # Passages that matched the query, per meeting; they become the context instead of the transcript
+        passages: Dict[str, List[str]] = {}
         
-        # Get unique meeting IDs from similar chunks
-        meeting_ids = list(set(chunk['meeting_id'] for chunk in similar_chunks))
+        if lexical_ids and has_exact_terms(query):
+            # Ids, codes and quoted phrases are answered by the keyword matches alone,
+            # without waking the embedding model
+            metrics.inc("chat.retrieval.lexical_only")
+            rankings = [lexical_ids]
+        else:
+            # Use vector search to find semantically similar content
+            similar_chunks = await vector_store.asearch_similar(
+                query, top_k=10, created_after=created_after, created_before=created_before
+            )
+            # Meetings in order of their best chunk (chunks come sorted by similarity)
+            dense_ids = list(dict.fromkeys(chunk['meeting_id'] for chunk in similar_chunks))
+            rankings = [lexical_ids, dense_ids]
+            for chunk in similar_chunks:
+                if chunk.get('kind', 'transcript') == 'transcript':  # Summaries and items are in the context already
+                    passages.setdefault(chunk['meeting_id'], []).append(chunk['text'])
         
-        # Fetch meetings and add relevance scores
-        meetings = []
-        for meeting_id in meeting_ids:
-            meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-            if meeting:
-                # Calculate relevance score based on chunk similarities
-                relevance_score = max(
-                    chunk['similarity'] for chunk in similar_chunks 
-                    if chunk['meeting_id'] == meeting_id
-                )
-                meeting.relevance_score = relevance_score
-                meetings.append(meeting)
+        for meeting_id, _, snippet in lexical:
+            passages.setdefault(meeting_id, []).append(snippet)
+        
+        relevance = reciprocal_rank_fusion(rankings, k=settings.CHAT_RRF_K)
+        if not relevance:
+            # Fallback: get recent meetings (of the requested period)
+            recent = self._meetings_statement()
+            if created_after is not None:
+                recent = recent.where(Meeting.created_at >= created_after)
+            if created_before is not None:
+                recent = recent.where(Meeting.created_at < created_before)
+            rows = await db.execute(recent.order_by(Meeting.created_at.desc()).limit(5))
+            return self._with_excerpts(rows.all())
+        
+        # Fetch all candidate meetings in one query and add relevance scores
+        rows = await db.execute(self._meetings_statement().where(Meeting.id.in_(list(relevance))))
+        meetings = self._with_excerpts(rows.all())
+        for meeting in meetings:
+            meeting.relevance_score = relevance[meeting.id]
+            meeting.matched_passages = passages.get(meeting.id, [])[:PASSAGES_PER_MEETING]
         
         # Sort by relevance
         meetings.sort(key=lambda m: m.relevance_score, reverse=True)
         return meetings
     
+    def _meetings_statement(self) -> Select:
+        """Meetings with the first EXCERPT_CHARS of the transcript computed in SQL.
+        
+        The full transcript is never loaded (accessing it raises), so context building
+        can't fall back to one lazy load per meeting.
+        """
+        excerpt = func.substr(Meeting.transcript, 1, EXCERPT_CHARS).label("transcript_excerpt")
+        return select(Meeting, excerpt).options(defer(Meeting.transcript, raiseload=True))
+    
+    def _with_excerpts(self, rows) -> List[Meeting]:
+        meetings = []
+        for meeting, excerpt in rows:
+            meeting.transcript_excerpt = excerpt
+            meetings.append(meeting)
+        return meetings
+    
     async def _generate_response(self, query: str, analysis: Dict, meetings: List[Meeting]) -> str:
         """Generate AI response based on query and relevant meetings"""
         if not meetings:
-            return "I couldn't find any relevant meetings for your query. Please try a different question or check if you have any meetings recorded."
+            return NO_MEETINGS_RESPONSE
         
         # Prepare context from meetings
         context = self._prepare_meeting_context(meetings, analysis["type"])
@@ -157,10 +279,9 @@ class MeetingChatService:
         # Create prompt based on query type
         prompt = self._create_prompt(query, analysis, context)
         
-        # Generate response using Ollama
+        # Generate response using Ollama (off the event loop, within the shared generation limit)
         try:
-            response = self.ollama_client.client.generate(model=self.ollama_client.model, prompt=prompt)
-            return response['response'].strip()
+            return await self.ollama_client.generate(prompt)
         except Exception as e:
             return f"I found relevant meetings but had trouble generating a response. Error: {str(e)}"
     
@@ -186,10 +307,12 @@ class MeetingChatService:
                 if key_points:
                     meeting_info.append(f"Key Points: {', '.join(key_points)}")
             
-            # Add transcript excerpt for context
-            if meeting.transcript:
-                transcript_excerpt = meeting.transcript[:500]  # First 500 chars
-                meeting_info.append(f"Transcript Excerpt: {transcript_excerpt}...")
+            # Add the passages that matched the query, or the start of the transcript
+            passages = getattr(meeting, 'matched_passages', None)
+            if passages:
+                meeting_info.append("Relevant Excerpts:\n" + "\n".join(f"- {passage}" for passage in passages))
+            elif getattr(meeting, 'transcript_excerpt', None):
+                meeting_info.append(f"Transcript Excerpt: {meeting.transcript_excerpt}...")
             
             context_parts.append("\n".join(meeting_info))
         
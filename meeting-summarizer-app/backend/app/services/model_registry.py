@@ -0,0 +1,185 @@
+import gc
+import resource
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import settings
+from app.services.whisper_backends import create_backend, SAMPLE_RATE
+
+# (model name, device, compute type)
+ModelKey = Tuple[str, str, str]
+
+class ModelRegistry:
+    """Process-wide cache of loaded Whisper models, one instance per (name, device, compute type).
+
+    Models are loaded with the engine selected by WHISPER_ENGINE (see whisper_backends).
+    """
+
+    def __init__(self):
+        self._models: Dict[ModelKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self.active_key: ModelKey = (
+            settings.WHISPER_MODEL,
+            settings.WHISPER_DEVICE,
+            settings.WHISPER_COMPUTE_TYPE
+        )
+
+    def _key_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            if key not in self._load_locks:
+                self._load_locks[key] = threading.Lock()
+            return self._load_locks[key]
+
+    def resolve(self, key: Optional[ModelKey] = None) -> ModelKey:
+        """Return the given key, or the active model key when none is given"""
+        return tuple(key) if key else self.active_key
+
+    def get(self, key: Optional[ModelKey] = None, cpu_threads: int = 0):
+        """Return the loaded model for key, loading and warming it up on first use.
+
+        cpu_threads applies when this call loads the model (see create_backend).
+        """
+        key = self.resolve(key)
+
+        entry = self._models.get(key)
+        if entry is None:
+            # Only one thread loads a given model; the others wait for it
+            with self._key_lock(key):
+                entry = self._models.get(key)
+                if entry is None:
+                    entry = self._load(key, cpu_threads)
+                    with self._lock:
+                        self._models[key] = entry
+
+        entry["last_used"] = time.time()
+        entry["uses"] += 1
+        return entry["model"]
+
+    def _load(self, key: ModelKey, cpu_threads: int = 0) -> Dict[str, Any]:
+        name, device, compute_type = key
+        print(f"[MODELS] Loading Whisper model {name} on {device} ({compute_type}, {settings.WHISPER_ENGINE})")
+        rss_before = self._current_rss_bytes()
+        start = time.perf_counter()
+
+        model = create_backend(name, device, compute_type, cpu_threads=cpu_threads)
+        load_seconds = time.perf_counter() - start
+        memory_bytes = self._model_memory_bytes(model, rss_before)
+
+        warmup_seconds = None
+        if settings.WHISPER_WARMUP:
+            warmup_seconds = self._warmup(model)
+
+        print(f"[MODELS] Whisper model {name} ready in {load_seconds:.2f}s")
+        return {
+            "model": model,
+            "loaded_at": time.time(),
+            "last_used": time.time(),
+            "uses": 0,
+            "load_seconds": load_seconds,
+            "warmup_seconds": warmup_seconds,
+            "engine": model.engine,
+            "memory_bytes": memory_bytes
+        }
+
+    def _warmup(self, model) -> Optional[float]:
+        """Run one short decode so the first real request doesn't pay for lazy initialisation"""
+        try:
+            start = time.perf_counter()
+            silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+            model.transcribe(silence, language="en")
+            return time.perf_counter() - start
+        except Exception as e:
+            print(f"[MODELS] Warm-up failed (model is still usable): {e}")
+            return None
+
+    def _current_rss_bytes(self) -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * resource.getpagesize()
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def _model_memory_bytes(self, model, rss_before: int) -> int:
+        try:
+            memory_bytes = model.memory_bytes()
+        except Exception:
+            memory_bytes = None
+        if memory_bytes is None:
+            # Engines that keep weights outside Python: use the RSS growth of the load
+            memory_bytes = max(0, self._current_rss_bytes() - rss_before)
+        return memory_bytes
+
+    def is_loaded(self, key: Optional[ModelKey] = None) -> bool:
+        return self.resolve(key) in self._models
+
+    def loaded_keys(self) -> List[ModelKey]:
+        return list(self._models)
+
+    def unload(self, key: ModelKey) -> bool:
+        """Drop a loaded model so its memory can be reclaimed"""
+        key = tuple(key)
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._models.pop(key, None)
+        if entry is None:
+            return False
+
+        del entry
+        gc.collect()
+        print(f"[MODELS] Unloaded Whisper model {key[0]} ({key[1]}, {key[2]})")
+        return True
+
+    def set_active(self, key: ModelKey) -> ModelKey:
+        """Make key the active model without loading it in this process"""
+        self.active_key = tuple(key)
+        return self.active_key
+
+    def swap(self, key: ModelKey, unload_previous: bool = True) -> ModelKey:
+        """Load key, make it the active model and optionally unload the previous one"""
+        key = tuple(key)
+        previous = self.active_key
+
+        # Load before switching so requests never see a missing model
+        self.get(key)
+        self.active_key = key
+
+        if unload_previous and previous != key:
+            self.unload(previous)
+        return key
+
+    def stats(self) -> Dict[str, Any]:
+        """Report loaded models and their memory use"""
+        models: List[Dict[str, Any]] = []
+        for (name, device, compute_type), entry in list(self._models.items()):
+            models.append({
+                "name": name,
+                "device": device,
+                "compute_type": compute_type,
+                "engine": entry["engine"],
+                "active": (name, device, compute_type) == self.active_key,
+                "uses": entry["uses"],
+                "loaded_at": entry["loaded_at"],
+                "last_used": entry["last_used"],
+                "load_seconds": round(entry["load_seconds"], 3),
+                "warmup_seconds": round(entry["warmup_seconds"], 3) if entry["warmup_seconds"] is not None else None,
+                "memory_mb": round(entry["memory_bytes"] / (1024 * 1024), 1)
+            })
+
+        # ru_maxrss is reported in KB on Linux
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return {
+            "active": {
+                "name": self.active_key[0],
+                "device": self.active_key[1],
+                "compute_type": self.active_key[2],
+                "engine": settings.WHISPER_ENGINE
+            },
+            "models": models,
+            "total_model_memory_mb": round(sum(m["memory_mb"] for m in models), 1),
+            "process_peak_rss_mb": round(peak_rss_mb, 1)
+        }
+
+# Global instance
+model_registry = ModelRegistry()
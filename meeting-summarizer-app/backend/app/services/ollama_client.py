@@ -1,77 +1,278 @@
 import ollama
-from typing import List
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from config import settings
+from app.services.transcript_chunker import estimate_tokens, split_transcript, chunk_summary_cache
+from app.utils.metrics import metrics
 import asyncio
 
+# Bump when the chunk prompt changes so cached chunk summaries are not reused
+CHUNK_PROMPT_VERSION = "v1"
+# Tokens kept free in the context window for instructions and the answer
+PROMPT_RESERVE_TOKENS = 1024
+MAX_REDUCE_LEVELS = 4
+
+TRANSCRIPT_SOURCE = "meeting transcript"
+CONDENSED_SOURCE = "set of summaries of consecutive parts of one long meeting"
+
+# Shared across client instances so the limit holds process-wide (one per event loop,
+# since job workers run each job in a fresh loop)
+_generation_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+def _get_generation_slots() -> asyncio.Semaphore:
+    global _generation_slots
+    loop = asyncio.get_running_loop()
+    if _generation_slots is None or _generation_slots[0] is not loop:
+        _generation_slots = (loop, asyncio.Semaphore(settings.OLLAMA_MAX_CONCURRENCY))
+    return _generation_slots[1]
+
+# In-flight condense_transcript calls by transcript hash, so concurrent callers with the
+# same transcript share one map step instead of all missing the chunk cache at once
+_condensing: Dict[str, asyncio.Task] = {}
+
 class OllamaClient:
     def __init__(self):
         self.client = ollama.Client(host=settings.OLLAMA_HOST)
+        self.async_client = ollama.AsyncClient(host=settings.OLLAMA_HOST)
         self.model = settings.OLLAMA_MODEL
-    
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """Run a generate call in a thread pool, bounded by the shared concurrency limit"""
+        async with _get_generation_slots():
+            response = await asyncio.get_event_loop().run_in_executor(
+                None, lambda: self.client.generate(model=self.model, prompt=prompt, **kwargs)
+            )
+        return response['response'].strip()
+
+    async def stream_generate(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Yield response tokens as Ollama produces them, bounded by the shared concurrency limit.
+
+        Uses the async client's streaming API, so no executor thread is held while the
+        model runs. Closing the generator early (e.g. the caller's client disconnected)
+        closes the HTTP stream, which makes Ollama stop generating.
+        """
+        start = time.perf_counter()
+        async with _get_generation_slots():
+            stream = await self.async_client.generate(model=self.model, prompt=prompt, stream=True, **kwargs)
+            first = True
+            try:
+                async for part in stream:
+                    token = part['response']
+                    if not token:
+                        continue
+                    if first:
+                        first = False
+                        metrics.observe("ollama.stream.ttft.seconds", time.perf_counter() - start)
+                    yield token
+            finally:
+                await stream.aclose()
+
+    async def condense_transcript(self, text: str) -> Tuple[str, bool]:
+        """Map step of map-reduce summarization for transcripts longer than the model context.
+
+        The transcript is split on segment boundaries into token-bounded chunks which are
+        summarized in parallel (bounded by the shared generation limit). Partial summaries
+        are cached by content hash, so regenerating only re-runs chunks that changed. If
+        the joined partials are still too long the step repeats on them. Concurrent calls
+        for the same transcript share one run. Returns the text to prompt with and whether it was condensed.
+        """
+        budget = settings.OLLAMA_CONTEXT_TOKENS - PROMPT_RESERVE_TOKENS
+        if estimate_tokens(text) <= budget:
+            return text, False
+
+        key = chunk_summary_cache.key(self.model, CHUNK_PROMPT_VERSION, text)
+        loop = asyncio.get_running_loop()
+        task = _condensing.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._condense(text, budget))
+            _condensing[key] = task
+            task.add_done_callback(lambda done: _condensing.pop(key) if _condensing.get(key) is done else None)
+        # A cancelled caller must not cancel the map step the others are waiting on
+        return await asyncio.shield(task)
+
+    async def _condense(self, text: str, budget: int) -> Tuple[str, bool]:
+        condensed = False
+
+        for level in range(MAX_REDUCE_LEVELS):
+            if estimate_tokens(text) <= budget:
+                break
+
+            chunks = split_transcript(text, min(settings.SUMMARY_CHUNK_TOKENS, budget))
+            print(f"[OLLAMA] Condensing {estimate_tokens(text)} tokens in {len(chunks)} chunks (level {level})")
+            partials = await asyncio.gather(*(self._summarize_chunk(chunk) for chunk in chunks))
+            text = "\n".join(f"Part {i + 1}: {partial}" for i, partial in enumerate(partials))
+            condensed = True
+
+        return text, condensed
+
+    async def _summarize_chunk(self, chunk: str) -> str:
+        key = chunk_summary_cache.key(self.model, CHUNK_PROMPT_VERSION, chunk)
+        cached = chunk_summary_cache.get(key)
+        if cached is not None:
+            metrics.inc("ollama.chunk_summary.cache_hits")
+            return cached
+
+        metrics.inc("ollama.chunk_summary.cache_misses")
+        prompt = f"""
+        Summarize this part of a longer meeting transcript. Keep every decision, agreement,
+        task, owner and deadline that is mentioned:
+
+        {chunk}
+        """
+        summary = await self.generate(prompt)
+        chunk_summary_cache.set(key, summary)
+        return summary
+
+    async def _prepare_text(self, text: str) -> Tuple[str, str]:
+        text, condensed = await self.condense_transcript(text)
+        return text, CONDENSED_SOURCE if condensed else TRANSCRIPT_SOURCE
+
     async def generate_summary(self, text: str) -> str:
         """Generate a summary of the meeting transcript"""
+        text, source = await self._prepare_text(text)
         prompt = f"""
-        Please provide a concise summary of the following meeting transcript:
+        Please provide a concise summary of the following {source}:
 
         {text}
 
         Focus on the main topics discussed, decisions made, and overall outcomes.
         """
-        
+
         try:
-            # Run the synchronous call in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.client.generate(model=self.model, prompt=prompt)
-            )
-            return response['response'].strip()
+            return await self.generate(prompt)
         except Exception as e:
             print(f"Error generating summary: {e}")
             raise
-    
+
     async def extract_key_points(self, text: str) -> List[str]:
         """Extract key points from the meeting transcript"""
+        text, source = await self._prepare_text(text)
         prompt = f"""
-        Extract the key points from this meeting transcript. Return them as a numbered list:
+        Extract the key points from this {source}. Return them as a numbered list:
 
         {text}
 
         Focus on important decisions, agreements, and main discussion points.
         """
-        
+
         try:
-            # Run the synchronous call in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.client.generate(model=self.model, prompt=prompt)
-            )
+            response = await self.generate(prompt)
             # Parse the response into a list
-            points = response['response'].strip().split('\n')
+            points = response.split('\n')
             return [point.strip() for point in points if point.strip()]
         except Exception as e:
             print(f"Error extracting key points: {e}")
             raise
-    
+
     async def extract_action_items(self, text: str) -> List[str]:
         """Extract action items from the meeting transcript"""
+        text, source = await self._prepare_text(text)
         prompt = f"""
-        Extract action items and tasks from this meeting transcript. Return them as a numbered list:
+        Extract action items and tasks from this {source}. Return them as a numbered list:
 
         {text}
 
         Focus on specific tasks, assignments, deadlines, and follow-up actions.
         """
-        
+
         try:
-            # Run the synchronous call in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.client.generate(model=self.model, prompt=prompt)
-            )
+            response = await self.generate(prompt)
             # Parse the response into a list
-            items = response['response'].strip().split('\n')
+            items = response.split('\n')
             return [item.strip() for item in items if item.strip()]
         except Exception as e:
             print(f"Error extracting action items: {e}")
             raise
-    
+
+    async def analyze_transcript(self, text: str, mode: Optional[str] = None) -> Dict:
+        """Generate summary, key points and action items for a transcript.
+
+        "fused" sends one structured-output prompt (the transcript is prefilled once);
+        "concurrent" runs the three prompts in parallel. Fused falls back to concurrent
+        if the model does not return usable JSON. Transcripts longer than the model
+        context are condensed first (see condense_transcript).
+        """
+        mode = mode or settings.OLLAMA_ANALYSIS_MODE
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        text, condensed = await self.condense_transcript(text)
+        if condensed:
+            timings["map"] = time.perf_counter() - start
+        source = CONDENSED_SOURCE if condensed else TRANSCRIPT_SOURCE
+
+        result = None
+        if mode == "fused":
+            try:
+                result = await self._analyze_fused(text, source, timings)
+            except Exception as e:
+                print(f"[OLLAMA] Fused analysis failed, falling back to concurrent prompts: {e}")
+                metrics.inc("ollama.analysis.fused_fallbacks")
+                mode = "concurrent"
+
+        if result is None:
+            result = await self._analyze_concurrent(text, timings)
+
+        timings["total"] = time.perf_counter() - start
+        for stage, seconds in timings.items():
+            metrics.observe(f"ollama.analysis.{mode}.{stage}.seconds", seconds)
+        print(f"[OLLAMA] Analysis ({mode}) timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+
+        result["mode"] = mode
+        result["timings"] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+        return result
+
+    async def _analyze_fused(self, text: str, source: str, timings: Dict[str, float]) -> Dict:
+        prompt = f"""
+        Analyze the following {source} and respond with a JSON object with exactly these keys:
+        - "summary": a concise summary focusing on the main topics discussed, decisions made, and overall outcomes
+        - "key_points": a list of strings with important decisions, agreements, and main discussion points
+        - "action_items": a list of strings with specific tasks, assignments, deadlines, and follow-up actions
+
+        {text}
+        """
+
+        start = time.perf_counter()
+        response = await self.generate(prompt, format="json")
+        timings["fused"] = time.perf_counter() - start
+
+        data = json.loads(response)
+        if not isinstance(data, dict) or not isinstance(data.get("summary"), str):
+            raise ValueError("Structured response is missing a summary")
+
+        return {
+            "summary": data["summary"].strip(),
+            "key_points": self._as_string_list(data.get("key_points")),
+            "action_items": self._as_string_list(data.get("action_items"))
+        }
+
+    async def _analyze_concurrent(self, text: str, timings: Dict[str, float]) -> Dict:
+        async def timed(stage: str, coro):
+            start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = time.perf_counter() - start
+
+        summary, key_points, action_items = await asyncio.gather(
+            timed("summary", self.generate_summary(text)),
+            timed("key_points", self.extract_key_points(text)),
+            timed("action_items", self.extract_action_items(text))
+        )
+        return {
+            "summary": summary,
+            "key_points": key_points,
+            "action_items": action_items
+        }
+
+    def _as_string_list(self, value) -> List[str]:
+        if isinstance(value, str):
+            value = value.split('\n')
+        if not isinstance(value, list):
+            return []
+        return [str(item).strip() for item in value if str(item).strip()]
+
     def is_ready(self) -> bool:
         """Check if Ollama is ready"""
         try:
@@ -1,5 +1,7 @@
 import re
 from typing import Dict, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.database import PronunciationCorrection
 import uuid
@@ -116,6 +118,14 @@ class PronunciationCorrector:
             PronunciationCorrection.usage_count.desc(),
             PronunciationCorrection.created_at.desc()
         ).all()
+    
+    async def aget_all_corrections(self, db: AsyncSession) -> List[PronunciationCorrection]:
+        """Get all pronunciation corrections without blocking the event loop"""
+        corrections = await db.scalars(select(PronunciationCorrection).order_by(
+            PronunciationCorrection.usage_count.desc(),
+            PronunciationCorrection.created_at.desc()
+        ))
+        return list(corrections)
 
 # Global instance
 pronunciation_corrector = PronunciationCorrector()
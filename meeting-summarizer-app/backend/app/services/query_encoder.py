@@ -0,0 +1,123 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from config import settings
+from app.utils.metrics import metrics
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+HIT_BUCKETS = (0, 1)  # One sample per lookup: 1 = hit, so the histogram's avg is the hit rate
+
+class QueryEncoder:
+    """Shared embedding service for search queries.
+
+    Recently seen queries are answered from an LRU cache without touching the model.
+    Other requests are queued; a batcher thread collects what arrives within
+    `window` seconds (or until `max_batch` distinct queries) and encodes the batch
+    with one model call on a small thread pool, so concurrent searches from live
+    sessions and chat share forward passes. Identical queries in a batch are
+    encoded once. Usable from threads (`encode`) and from the event loop (`aencode`).
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        cache_size: int = settings.QUERY_CACHE_SIZE,
+        window: float = settings.QUERY_BATCH_WINDOW_MS / 1000,
+        max_batch: int = settings.QUERY_BATCH_MAX,
+        workers: int = settings.QUERY_ENCODER_THREADS
+    ):
+        self._encode = encode
+        self.cache_size = cache_size
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="query-encoder")
+        self._batcher: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _cache_get(self, query: str) -> Optional[np.ndarray]:
+        with self._cache_lock:
+            vector = self._cache.get(query)
+            if vector is not None:
+                self._cache.move_to_end(query)
+        metrics.observe("query_embeddings.cache_hit", 1 if vector is not None else 0, buckets=HIT_BUCKETS)
+        return vector
+
+    def _cache_put(self, query: str, vector: np.ndarray):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[query] = vector
+            self._cache.move_to_end(query)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def submit(self, query: str) -> Future:
+        """Future resolving to the query's embedding (float32, read-only)"""
+        future: Future = Future()
+        vector = self._cache_get(query)
+        if vector is not None:
+            future.set_result(vector)
+            return future
+
+        if self._batcher is None:
+            with self._start_lock:
+                if self._batcher is None:
+                    self._batcher = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                    self._batcher.start()
+        self._queue.put((query, future, time.monotonic()))
+        return future
+
+    def encode(self, query: str) -> np.ndarray:
+        """Blocking embedding lookup for worker threads"""
+        return self.submit(query).result()
+
+    async def aencode(self, query: str) -> np.ndarray:
+        """Embedding lookup that doesn't block the event loop"""
+        return await asyncio.wrap_future(self.submit(query))
+
+    def _run(self):
+        while True:
+            query, future, queued_at = self._queue.get()
+            batch: Dict[str, List] = {query: [(future, queued_at)]}
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    query, future, queued_at = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.setdefault(query, []).append((future, queued_at))
+            self._executor.submit(self._encode_batch, batch)
+
+    def _encode_batch(self, batch: Dict[str, List]):
+        queries = list(batch)
+        metrics.observe("query_embeddings.batch_size", len(queries), buckets=BATCH_SIZE_BUCKETS)
+        try:
+            with metrics.timer("query_embeddings.encode.seconds"):
+                vectors = np.asarray(self._encode(queries), dtype=np.float32)
+        except Exception as e:
+            for waiters in batch.values():
+                for future, _ in waiters:
+                    future.set_exception(e)
+            return
+
+        now = time.monotonic()
+        for query, vector in zip(queries, vectors):
+            vector.flags.writeable = False  # Shared by the cache and every caller
+            self._cache_put(query, vector)
+            for future, queued_at in batch[query]:
+                metrics.observe("query_embeddings.wait.seconds", now - queued_at)
+                future.set_result(vector)
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached_queries": len(self._cache), "queued": self._queue.qsize()}
@@ -1,11 +1,12 @@
-import asyncio
 import websockets
 import json
 import tempfile
 import os
-from typing import Dict, List
-from app.services.whisper_client import WhisperClient
+from typing import Awaitable, Callable, Dict, List
+from app.services.whisper_client import whisper_client
 from app.services.vosk_client import VoskClient
+from app.services.stream_decoder import StreamingDecoder
+from app.services.live_suggestions import SessionSuggester
 from app.services.ollama_client import OllamaClient
 from app.services.vector_store import vector_store
 from app.services.pronunciation_corrector import pronunciation_corrector
@@ -14,13 +15,14 @@ from datetime import datetime
 
 class RealTimeTranscriber:
     def __init__(self):
-        self.whisper_client = WhisperClient()
+        self.whisper_client = whisper_client  # Shared model from the registry
         self.vosk_client = VoskClient()
         self.ollama_client = OllamaClient()
         self.active_sessions: Dict[str, Dict] = {}
-        self.last_suggestion_time = {}  # Rate limiting for suggestions
+        self.suggesters: Dict[str, SessionSuggester] = {}  # Background suggestion task per session
         self.audio_buffers = {}  # Buffer audio chunks before transcription
         self.vosk_recognizers = {}  # Store VOSK recognizers per session
+        self.decoders: Dict[str, StreamingDecoder] = {}  # Long-lived ffmpeg decoder per session
         self.min_confidence = 0.6  # Increased confidence threshold for better quality
         self.use_vosk = True  # Use VOSK for real-time transcription by default
     
@@ -30,6 +32,8 @@ class RealTimeTranscriber:
             if self.vosk_client.is_ready():
                 recognizer = self.vosk_client.create_recognizer()
                 self.vosk_recognizers[session_id] = recognizer
+                if session_id not in self.decoders:
+                    self.decoders[session_id] = StreamingDecoder(session_id=session_id)
                 print(f"[TRANSCRIBER] VOSK recognizer created for session {session_id}")
                 return True
             else:
@@ -40,13 +44,35 @@ class RealTimeTranscriber:
             return False
     
     def end_vosk_session(self, session_id: str):
-        """Clean up VOSK recognizer for a session"""
+        """Clean up VOSK recognizer and audio decoder for a session"""
         if session_id in self.vosk_recognizers:
             del self.vosk_recognizers[session_id]
             print(f"[TRANSCRIBER] VOSK recognizer cleaned up for session {session_id}")
+        
+        decoder = self.decoders.pop(session_id, None)
+        if decoder is not None:
+            decoder.close()
+            print(f"[TRANSCRIBER] Audio decoder stopped for session {session_id}")
+    
+    def start_suggestions(self, session_id: str, send: Callable[[Dict], Awaitable[None]]):
+        """Generate suggestions for a session in the background, pushing them with send"""
+        if session_id not in self.suggesters:
+            suggester = SessionSuggester(session_id, self.get_suggestions, send)
+            suggester.start()
+            self.suggesters[session_id] = suggester
+    
+    def stop_suggestions(self, session_id: str):
+        suggester = self.suggesters.pop(session_id, None)
+        if suggester is not None:
+            suggester.stop()
     
-    async def process_audio_chunk(self, session_id: str, audio_data: bytes, use_vosk: bool = True) -> Dict:
-        """Process audio chunk and return transcription with enhanced validation"""
+    async def process_audio_chunk(self, session_id: str, audio_data: bytes, use_vosk: bool = True) -> List[Dict]:
+        """Process audio chunk and return the websocket messages it produced.
+        
+        VOSK sessions stream `partial` messages for the utterance in progress and a
+        `final` message whenever Kaldi detects an endpoint; Whisper sessions return one
+        `transcription_update` per chunk.
+        """
         try:
             print(f"[TRANSCRIBER] Processing chunk for session {session_id}, size: {len(audio_data)} bytes, using VOSK: {use_vosk}")
             
@@ -54,6 +80,7 @@ class RealTimeTranscriber:
             if session_id not in self.active_sessions:
                 self.active_sessions[session_id] = {
                     'full_transcript': '',
+                    'partial': '',
                     'last_update': datetime.now(),
                     'suggestions': []
                 }
@@ -64,52 +91,85 @@ class RealTimeTranscriber:
                 if session_id not in self.vosk_recognizers:
                     if not self.start_vosk_session(session_id):
                         # Fall back to Whisper if VOSK fails
-                        return await self._process_with_whisper(session_id, audio_data)
+                        return [await self._process_with_whisper(session_id, audio_data)]
                 
                 recognizer = self.vosk_recognizers[session_id]
                 
-                # Convert WebM to PCM for VOSK
-                pcm_data = self.vosk_client._convert_to_pcm(audio_data)
+                # Decode WebM to PCM for VOSK on the session's streaming decoder
+                pcm_data = await self.decoders[session_id].decode(audio_data)
                 if not pcm_data:
-                    print("[TRANSCRIBER] Failed to convert audio to PCM")
-                    return await self._build_response(session_id, "", 0.0, False, "Audio conversion failed")
-                
-                # Process with VOSK stream
-                result = self.vosk_client.transcribe_stream(recognizer, pcm_data)
+                    # The decoder may still be buffering the start of the stream
+                    print("[TRANSCRIBER] No PCM decoded from this chunk yet")
+                    return []
                 
-                if result and result.get("text"):
-                    text = result["text"].strip()
-                    confidence = result.get("confidence", 0.8)  # VOSK typically has good confidence
-                    
-                    # Basic validation for VOSK results
-                    if len(text) < 2 or self._is_garbled_text(text):
-                        return await self._build_response(session_id, "", 0.0, False, "Low quality VOSK transcription")
-                    
-                    # Update session with new text
-                    session = self.active_sessions[session_id]
-                    if text not in session['full_transcript']:  # Avoid duplicates
-                        session['full_transcript'] += f" {text}"
-                        session['last_update'] = datetime.now()
-                    
-                    return await self._build_response(session_id, text, confidence, True, engine="vosk")
-                else:
-                    # No speech detected or empty result
-                    return await self._build_response(session_id, "", 0.0, False, engine="vosk")
+                events = self.vosk_client.transcribe_stream(recognizer, pcm_data)
+                return await self._vosk_messages(session_id, events)
             
             # Use Whisper for standard mode or fallback
             else:
-                return await self._process_with_whisper(session_id, audio_data)
+                return [await self._process_with_whisper(session_id, audio_data)]
         
         except Exception as e:
             print(f"[TRANSCRIBER] Error processing audio chunk: {e}")
-            return await self._build_response(session_id, "", 0.0, False, str(e))
+            return [await self._build_response(session_id, "", 0.0, False, str(e))]
+    
+    async def flush_vosk_session(self, session_id: str) -> List[Dict]:
+        """Emit the utterance still open at the end of a VOSK session as a final message"""
+        recognizer = self.vosk_recognizers.get(session_id)
+        if recognizer is None or session_id not in self.active_sessions:
+            return []
+        
+        event = self.vosk_client.flush(recognizer)
+        return await self._vosk_messages(session_id, [event] if event else [])
+    
+    async def _vosk_messages(self, session_id: str, events: List[Dict]) -> List[Dict]:
+        """Turn VOSK streaming events into websocket messages and update the session"""
+        session = self.active_sessions[session_id]
+        messages = []
+        
+        for event in events:
+            text = event["text"]
+            
+            if event["type"] == "partial":
+                if text == session.get('partial'):
+                    continue  # Nothing new to show
+                session['partial'] = text
+                messages.append({
+                    "type": "partial",
+                    "text": text,
+                    "full_transcript": session['full_transcript'].strip(),
+                    "engine": "vosk",
+                    "timestamp": datetime.now().isoformat()
+                })
+                continue
+            
+            # Final: the utterance is closed, the partial hypothesis is replaced by it
+            session['partial'] = ''
+            
+            # Basic validation for VOSK results
+            if len(text) < 2 or self._is_garbled_text(text):
+                print(f"[TRANSCRIBER] Dropping low quality VOSK utterance: '{text}'")
+                continue
+            
+            session['full_transcript'] += f" {text}"
+            session['last_update'] = datetime.now()
+            
+            response = await self._build_response(
+                session_id, text, event["confidence"], True, engine="vosk", message_type="final"
+            )
+            response["text"] = text
+            response["words"] = event.get("words", [])
+            messages.append(response)
+        
+        return messages
     
-    async def _build_response(self, session_id: str, transcription: str, confidence: float, is_final: bool, error: str = None, engine: str = "unknown") -> Dict:
+    async def _build_response(self, session_id: str, transcription: str, confidence: float, is_final: bool, error: str = None, engine: str = "unknown", message_type: str = "transcription_update") -> Dict:
         """Build standardized response format"""
         session = self.active_sessions.get(session_id, {})
         full_transcript = session.get('full_transcript', '').strip()
         
         response = {
+            "type": message_type,
             "transcription": transcription,
             "full_transcript": full_transcript,
             "confidence": confidence,
@@ -123,16 +183,11 @@ class RealTimeTranscriber:
         if error:
             response["error"] = error
         
-        # Generate suggestions if we have meaningful transcription
-        if transcription and len(transcription.strip()) > 5 and confidence > 0.5:
-            print(f"[TRANSCRIBER] Generating suggestions for: '{transcription[:50]}...'")
-            try:
-                suggestions = await self.get_suggestions(transcription, full_transcript)
-                response["suggestions"] = suggestions
-                print(f"[TRANSCRIBER] Generated {len(suggestions)} suggestions")
-            except Exception as e:
-                print(f"[TRANSCRIBER] Error generating suggestions: {e}")
-                response["suggestions"] = []
+        # Queue meaningful transcriptions for the session's suggestion task; suggestions
+        # arrive later as suggestions_update messages so captions never wait on the LLM
+        suggester = self.suggesters.get(session_id)
+        if suggester and transcription and len(transcription.strip()) > 5 and confidence > 0.5:
+            suggester.add_final(transcription, full_transcript)
         
         return response
     
@@ -149,7 +204,7 @@ class RealTimeTranscriber:
             print(f"[TRANSCRIBER] Processing with Whisper for session {session_id}")
             
             # Process with Whisper
-            result = self.whisper_client.transcribe(temp_audio_path)
+            result = await self.whisper_client.transcribe(temp_audio_path)
             
             # Clean up temporary file
             os.unlink(temp_audio_path)
@@ -188,24 +243,12 @@ class RealTimeTranscriber:
     async def get_suggestions(self, current_sentence: str, full_context: str) -> List[Dict]:
         """Get context-aware suggestions based on current conversation"""
         try:
+            # Rate limiting and coalescing happen in the session's SessionSuggester
             print(f"[SUGGESTIONS] Starting suggestion generation for: '{current_sentence[:100]}...'")
             
-            # Rate limiting: only generate suggestions every 5 seconds to avoid overload (reduced from 10)
-            session_key = f"{current_sentence[:50]}"  # Use first 50 chars as key
-            current_time = datetime.now().timestamp()
-            
-            if session_key in self.last_suggestion_time:
-                time_since_last = current_time - self.last_suggestion_time[session_key]
-                if time_since_last < 5:  # Reduced from 10 to 5 seconds
-                    print(f"[SUGGESTIONS] Rate limited: {time_since_last:.1f}s since last, need 5s")
-                    return []  # Skip if too recent
-            
-            self.last_suggestion_time[session_key] = current_time
-            print(f"[SUGGESTIONS] Rate limit passed, generating suggestions...")
-            
-            # Search for similar content in previous meetings
+            # Search for similar content in previous meetings (embedding + FAISS, off the event loop)
             print(f"[SUGGESTIONS] Searching vector store for similar content...")
-            similar_chunks = vector_store.search_similar(current_sentence, top_k=3)
+            similar_chunks = await vector_store.asearch_similar(current_sentence, top_k=3)
             print(f"[SUGGESTIONS] Found {len(similar_chunks)} similar chunks")
             
             if not similar_chunks:
@@ -237,17 +280,10 @@ class RealTimeTranscriber:
             """
             
             print(f"[SUGGESTIONS] Calling LLM for suggestion generation...")
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                lambda: self.ollama_client.client.generate(
-                    model=self.ollama_client.model,
-                    prompt=prompt
-                )
-            )
+            suggestions_text = await self.ollama_client.generate(prompt)
             
             # Parse LLM response
             try:
-                suggestions_text = response['response'].strip()
                 print(f"[SUGGESTIONS] LLM response received: {suggestions_text[:200]}...")
                 
                 # Extract JSON array from response
@@ -273,7 +309,7 @@ class RealTimeTranscriber:
                 
             except (json.JSONDecodeError, AttributeError) as e:
                 print(f"[SUGGESTIONS] Error parsing LLM suggestions: {e}")
-                print(f"[SUGGESTIONS] Raw response was: {response.get('response', 'No response')}")
+                print(f"[SUGGESTIONS] Raw response was: {suggestions_text}")
                 
                 # Fallback: simple context suggestions
                 print(f"[SUGGESTIONS] Using fallback suggestion...")
@@ -445,6 +481,7 @@ class RealTimeTranscriber:
     
     def end_session(self, session_id: str) -> Dict:
         """End a session and return final transcript"""
+        self.stop_suggestions(session_id)
         if session_id in self.active_sessions:
             session = self.active_sessions.pop(session_id)
             
@@ -471,6 +508,12 @@ class RealTimeTranscriber:
         buffer_count = len(self.audio_buffers)
         self.audio_buffers.clear()
         
+        # Stop all streaming decoders and suggestion tasks
+        for session_id in list(self.decoders):
+            self.end_vosk_session(session_id)
+        for session_id in list(self.suggesters):
+            self.stop_suggestions(session_id)
+        
         return {
             'message': f'Cleared {cleared_count} active sessions and {buffer_count} audio buffers',
             'cleared_sessions': cleared_count,
@@ -0,0 +1,179 @@
+import asyncio
+import time
+from typing import Optional
+from config import settings
+from app.utils.metrics import metrics
+
+# First bytes of every WebM/Matroska file
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+class _FFmpegProcess:
+    """One ffmpeg process decoding its stdin to raw s16le PCM on stdout"""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.output = bytearray()
+        self.output_ready = asyncio.Event()
+        self.eof = False
+        self.bytes_in = 0
+        self._tasks = []
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-nostdin', '-loglevel', 'error',
+            # Start decoding as soon as the first packets arrive instead of probing seconds of input
+            '-fflags', 'nobuffer', '-probesize', '4096', '-analyzeduration', '0',
+            '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(self.sample_rate),
+            '-flush_packets', '1', 'pipe:1',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._read_stderr())
+        ]
+
+    async def _read_stdout(self):
+        while True:
+            data = await self.process.stdout.read(65536)
+            if not data:
+                break
+            self.output.extend(data)
+            self.output_ready.set()
+        self.eof = True
+        self.output_ready.set()
+
+    async def _read_stderr(self):
+        async for line in self.process.stderr:
+            print(f"[DECODER] ffmpeg: {line.decode(errors='ignore').rstrip()}")
+
+    async def write(self, data: bytes):
+        self.bytes_in += len(data)
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    def take_output(self) -> bytes:
+        # Keep whole 16-bit samples; an odd trailing byte waits for the next read
+        size = len(self.output) - len(self.output) % 2
+        data = bytes(self.output[:size])
+        del self.output[:size]
+        if not self.eof:
+            self.output_ready.clear()
+        return data
+
+    async def finish(self, timeout: float) -> bytes:
+        """Close stdin and return whatever PCM ffmpeg still flushes"""
+        try:
+            self.process.stdin.close()
+            await asyncio.wait_for(self._tasks[0], timeout)
+        except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError):
+            pass
+        tail = self.take_output()
+        self.kill()
+        return tail
+
+    def kill(self):
+        for task in self._tasks:
+            task.cancel()
+        if self.process and self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+class StreamingDecoder:
+    """Long-lived ffmpeg decoder for one real-time session.
+
+    Compressed audio (WebM/Opus, Ogg, fragmented MP4) is written to ffmpeg's stdin as it
+    arrives and raw 16 kHz mono s16le PCM is read back from stdout, with no temp files.
+    Clients that send each chunk as a complete file (a new EBML header) roll over to a
+    pre-spawned process, so no fork/exec happens on the request path.
+    """
+
+    def __init__(self, sample_rate: int = 16000, session_id: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.session_id = session_id
+        self._current: Optional[_FFmpegProcess] = None
+        self._spare: Optional[_FFmpegProcess] = None
+        self._lock = asyncio.Lock()
+        self._rollovers = 0
+        self.closed = False
+
+    async def _spawn(self) -> _FFmpegProcess:
+        process = _FFmpegProcess(self.sample_rate)
+        await process.start()
+        metrics.inc("realtime.decoder.spawned")
+        return process
+
+    async def _next_process(self) -> _FFmpegProcess:
+        process = self._spare or await self._spawn()
+        self._spare = None
+        return process
+
+    async def decode(self, data: bytes) -> bytes:
+        """Feed compressed bytes and return the PCM decoded so far.
+
+        Waits up to REALTIME_DECODE_WAIT seconds for the first output, then keeps
+        reading until ffmpeg has been quiet for REALTIME_DECODE_QUIET seconds. PCM that
+        arrives later is returned with the next chunk.
+        """
+        if self.closed:
+            raise RuntimeError("Decoder is closed")
+
+        async with self._lock:
+            start = time.perf_counter()
+            pcm = bytearray()
+
+            if self._current is None:
+                self._current = await self._next_process()
+            elif data[:4] == EBML_MAGIC and self._current.bytes_in > 0:
+                # A new file begins: flush the previous stream and switch processes
+                pcm.extend(await self._current.finish(settings.REALTIME_DECODE_WAIT))
+                self._current = await self._next_process()
+                self._rollovers += 1
+                metrics.inc("realtime.decoder.rollovers")
+
+            current = self._current
+            try:
+                await current.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # ffmpeg exited (e.g. corrupt input); start over with the next chunk
+                print(f"[DECODER] ffmpeg exited for session {self.session_id}, restarting")
+                metrics.inc("realtime.decoder.restarts")
+                current.kill()
+                self._current = None
+                return bytes(pcm)
+
+            wait = settings.REALTIME_DECODE_WAIT
+            while not current.eof:
+                try:
+                    await asyncio.wait_for(current.output_ready.wait(), wait)
+                except asyncio.TimeoutError:
+                    break
+                pcm.extend(current.take_output())
+                wait = settings.REALTIME_DECODE_QUIET
+            pcm.extend(current.take_output())
+
+            if current.eof:
+                self._current = None
+
+            metrics.observe("realtime.decode.seconds", time.perf_counter() - start)
+            metrics.observe("realtime.decode.bytes", len(pcm), buckets=(0, 4000, 16000, 32000, 64000, 128000, 256000))
+
+            # Clients sending whole files need a new process per chunk: have it ready
+            # before the next one arrives
+            if self._rollovers and self._spare is None and not self.closed:
+                self._spare = await self._spawn()
+            return bytes(pcm)
+
+    def close(self):
+        """Kill the ffmpeg processes; safe to call more than once"""
+        self.closed = True
+        for process in (self._current, self._spare):
+            if process is not None:
+                process.kill()
+        self._current = None
+        self._spare = None
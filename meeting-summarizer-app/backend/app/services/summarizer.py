@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 from app.services.whisper_client import WhisperClient
 from app.services.ollama_client import OllamaClient
 from app.models.meeting import TranscriptionResponse, SummaryResponse
@@ -10,24 +10,28 @@ class MeetingSummarizer:
     
     async def process_audio(self, audio_file_path: str) -> TranscriptionResponse:
         """Transcribe audio file using Whisper"""
+        transcription, _ = await self.process_audio_segments(audio_file_path)
+        return transcription
+    
+    async def process_audio_segments(self, audio_file_path: str) -> Tuple[TranscriptionResponse, List[Dict[str, Any]]]:
+        """Transcribe audio file using Whisper, also returning its timed segments (with word timestamps)"""
         result = await self.whisper.transcribe(audio_file_path)
+        segments = result.get("segments") or []
         
         return TranscriptionResponse(
             text=result["text"],
             language=result.get("language"),
-            duration=None  # You can calculate this from segments if needed
-        )
+            duration=segments[-1]["end"] if segments else None
+        ), segments
     
     async def generate_meeting_summary(self, transcript: str) -> SummaryResponse:
         """Generate comprehensive meeting summary using Ollama"""
-        summary = await self.ollama.generate_summary(transcript)
-        key_points = await self.ollama.extract_key_points(transcript)
-        action_items = await self.ollama.extract_action_items(transcript)
+        analysis = await self.ollama.analyze_transcript(transcript)
         
         return SummaryResponse(
-            summary=summary,
-            key_points=key_points,
-            action_items=action_items
+            summary=analysis["summary"],
+            key_points=analysis["key_points"],
+            action_items=analysis["action_items"]
         )
     
     async def process_complete_meeting(self, audio_file_path: str) -> Dict:
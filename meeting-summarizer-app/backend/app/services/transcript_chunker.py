@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional
+from config import settings
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (LLaMA-style tokenizers average ~0.75 words per token)"""
+    return int(len(text.split()) * 4 / 3) + 1
+
+def _split_segments(text: str) -> List[str]:
+    """Split a transcript into segments: lines first, then sentences"""
+    segments = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        segments.extend(s.strip() for s in re.split(r'(?<=[.!?])\s+', line) if s.strip())
+    return segments
+
+def split_transcript(text: str, max_tokens: int) -> List[str]:
+    """Pack transcript segments into chunks of at most max_tokens (estimated).
+
+    Chunks always end on a segment boundary unless a single segment is larger
+    than the budget, in which case it is cut on word boundaries.
+    """
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for segment in _split_segments(text):
+        segment_tokens = estimate_tokens(segment)
+
+        if segment_tokens > max_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            words = segment.split()
+            step = max(1, int(max_tokens * 3 / 4))
+            for i in range(0, len(words), step):
+                chunks.append(" ".join(words[i:i + step]))
+            continue
+
+        if current and current_tokens + segment_tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+
+        current.append(segment)
+        current_tokens += segment_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+class ChunkSummaryCache:
+    """Chunk summaries keyed by content hash, kept in memory and as small JSON files on disk"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.path.join(settings.UPLOAD_DIR, "summary_cache")
+        self._memory: Dict[str, str] = {}
+
+    def key(self, model: str, prompt_version: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt_version}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        if key in self._memory:
+            return self._memory[key]
+        try:
+            with open(self._path(key), "r") as f:
+                summary = json.load(f)["summary"]
+            self._memory[key] = summary
+            return summary
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, summary: str):
+        self._memory[key] = summary
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a crash never leaves a half-written entry
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"summary": summary}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[SUMMARY CACHE] Could not persist chunk summary: {e}")
+
+# Global instance
+chunk_summary_cache = ChunkSummaryCache()
@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer
+from app.database import TranscriptSegment
+from app.utils.metrics import metrics
+
+# Whisper decodes 30 s windows, so no segment is longer; this bounds how early a segment
+# overlapping a window can start, which lets range reads seek on the (meeting_id, start) index
+MAX_SEGMENT_SECONDS = 30.0
+
+def segment_rows(meeting_id: str, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """transcript_segments rows for Whisper segments (either engine's shape)"""
+    rows = []
+    for idx, segment in enumerate(segments):
+        text = (segment.get("text") or "").strip()
+        if not text:
+            continue
+        rows.append({
+            "meeting_id": meeting_id,
+            "idx": idx,
+            "start": float(segment.get("start") or 0.0),
+            "end": float(segment.get("end") or segment.get("start") or 0.0),
+            "text": text,
+            "avg_logprob": segment.get("avg_logprob"),
+            "no_speech_prob": segment.get("no_speech_prob"),
+            "words": [
+                {"word": word["word"], "start": word["start"], "end": word["end"], "probability": word.get("probability")}
+                for word in segment.get("words") or []
+            ] or None
+        })
+    return rows
+
+def delete_segments(db: Session, meeting_id: str):
+    db.execute(delete(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id))
+
+def replace_segments(db: Session, meeting_id: str, segments: List[Dict[str, Any]]) -> int:
+    """Replace a meeting's segments with one bulk insert (executemany); the caller commits"""
+    delete_segments(db, meeting_id)
+    rows = segment_rows(meeting_id, segments)
+    if rows:
+        with metrics.timer("transcript_segments.insert.seconds"):
+            db.execute(insert(TranscriptSegment), rows)
+    return len(rows)
+
+def load_segments(db: Session, meeting_ids: List[str]) -> Dict[str, List[TranscriptSegment]]:
+    """Segments (without word timestamps) of several meetings in order, by meeting id"""
+    if not meeting_ids:
+        return {}
+    segments: Dict[str, List[TranscriptSegment]] = {}
+    rows = db.scalars(
+        select(TranscriptSegment)
+        .options(defer(TranscriptSegment.words))
+        .where(TranscriptSegment.meeting_id.in_(meeting_ids))
+        .order_by(TranscriptSegment.meeting_id, TranscriptSegment.idx)
+    )
+    for segment in rows:
+        segments.setdefault(segment.meeting_id, []).append(segment)
+    return segments
+
+async def segments_in_range(
+    db: AsyncSession,
+    meeting_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    limit: int = 500,
+    words: bool = False
+) -> List[TranscriptSegment]:
+    """Segments of a meeting overlapping the [start, end) window in seconds, in order.
+
+    Served by the (meeting_id, start) index: the scan is bounded to segments starting
+    within MAX_SEGMENT_SECONDS before the window and before its end.
+    """
+    statement = select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id)
+    if start is not None:
+        statement = statement.where(
+            TranscriptSegment.start > start - MAX_SEGMENT_SECONDS,
+            TranscriptSegment.end > start
+        )
+    if end is not None:
+        statement = statement.where(TranscriptSegment.start < end)
+    if not words:
+        statement = statement.options(defer(TranscriptSegment.words, raiseload=True))
+    return list(await db.scalars(statement.order_by(TranscriptSegment.start, TranscriptSegment.idx).limit(limit)))
@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session
+from config import settings
+from app.database import Meeting as DBMeeting, VectorChunk
+from app.utils.metrics import metrics
+
+MIN_SIMILARITY = 0.3  # Hits scoring at or below this are dropped
+POSTFILTER_GROWTH = 4  # Hits fetched per requested result, multiplied again each round too few match
+POSTFILTER_ROUNDS = 3
+
+# (k, allowed ids or None) -> top-k (scores, ids) of one query, as VectorIndex.search
+IndexSearch = Callable[[int, Optional[np.ndarray]], Tuple[np.ndarray, np.ndarray]]
+
+def apply_filters(
+    query: Query,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    meeting_ids: Optional[List[str]] = None,
+    kinds: Optional[List[str]] = None,
+    statuses: Optional[List[str]] = None
+) -> Query:
+    """Restrict a query over vector_chunks.
+
+    created_after/created_before bound the meeting's creation time (inclusive/exclusive),
+    kinds are chunk kinds (transcript, summary, key_point, action_item) and statuses are
+    meeting statuses.
+    """
+    if created_after is not None:
+        query = query.filter(VectorChunk.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(VectorChunk.created_at < created_before)
+    if meeting_ids is not None:
+        query = query.filter(VectorChunk.meeting_id.in_(meeting_ids))
+    if kinds is not None:
+        query = query.filter(VectorChunk.kind.in_(kinds))
+    if statuses is not None:
+        # A correlated lookup rather than a join: without table statistics SQLite would
+        # drive a join from meetings and visit every chunk of every matching meeting
+        status = select(DBMeeting.status).where(DBMeeting.id == VectorChunk.meeting_id).scalar_subquery()
+        query = query.filter(status.in_(statuses))
+    return query
+
+def _hits(scores: np.ndarray, ids: np.ndarray) -> List[Tuple[int, float]]:
+    return [(int(chunk_id), float(score)) for score, chunk_id in zip(scores[0], ids[0])
+            if chunk_id >= 0 and score > MIN_SIMILARITY]
+
+def _hydrate(db: Session, hits: List[Tuple[int, float]], filters: Dict) -> List[Tuple[Row, float]]:
+    """vector_chunks rows of the hits that match filters, best first, loaded with one query
+    (plain rows: nothing is modified, so ORM instances would only add overhead)"""
+    if not hits:
+        return []
+    query = db.query(*VectorChunk.__table__.columns).filter(VectorChunk.id.in_([chunk_id for chunk_id, _ in hits]))
+    rows = {row.id: row for row in apply_filters(query, **filters)}
+    # Vectors whose metadata was never committed have no row
+    return [(rows[chunk_id], score) for chunk_id, score in hits if chunk_id in rows]
+
+def _candidate_ids(db: Session, filters: Dict, limit: Optional[int] = None) -> np.ndarray:
+    """Ids of the chunks matching filters (at most limit)"""
+    query = apply_filters(db.query(VectorChunk.id), **filters)
+    if limit is not None:
+        query = query.limit(limit)
+    return np.array([chunk_id for chunk_id, in query], dtype=np.int64)
+
+def search_chunks(
+    db: Session,
+    search_index: IndexSearch,
+    total: int,
+    top_k: int,
+    filters: Dict,
+    postfilter_fraction: float = settings.VECTOR_FILTER_POSTFILTER_FRACTION
+) -> List[Tuple[Row, float]]:
+    """Top-k (vector_chunks row, similarity) among the total indexed chunks that match filters.
+
+    Filters are first applied to the results of an unfiltered search for POSTFILTER_GROWTH
+    times top_k hits. That finds enough matches for broad filters (e.g. transcript chunks,
+    a wide date range) at a cost that doesn't depend on how many chunks they match. If too
+    few hits match, up to postfilter_fraction of the chunk ids matching the filter are read;
+    when that is all of them, only those are scored (an id selector), so a narrow filter
+    makes the search cheaper. Otherwise the over-fetch grows POSTFILTER_GROWTH times per
+    round, for POSTFILTER_ROUNDS rounds, before falling back to all matching ids. Meeting
+    filters match a few meetings' chunks, so they go to the id selector directly.
+    """
+    filters = {name: value for name, value in filters.items() if value is not None}
+    if total == 0:
+        return []
+    if not filters:
+        return _hydrate(db, _hits(*search_index(min(top_k, total), None)), {})
+
+    candidates = None
+    if "meeting_ids" not in filters:
+        k = min(total, top_k * POSTFILTER_GROWTH)
+        for round in range(POSTFILTER_ROUNDS):
+            hits = _hits(*search_index(k, None))
+            results = _hydrate(db, hits, filters)
+            # Fewer hits than asked for: the index or the similarity threshold ran out
+            if len(results) >= top_k or len(hits) < k or k == total:
+                metrics.inc("vector.search.postfiltered")
+                return results[:top_k]
+            if round == 0:
+                limit = int(postfilter_fraction * total)
+                candidates = _candidate_ids(db, filters, limit + 1)
+                if len(candidates) <= limit:
+                    break
+                candidates = None
+            k = min(total, k * POSTFILTER_GROWTH)
+
+    if candidates is None:
+        candidates = _candidate_ids(db, filters)
+    metrics.observe("vector.search.filtered_candidates", len(candidates),
+                    buckets=(0, 10, 100, 1000, 10000, 100000, 1000000))
+    if len(candidates) == 0:
+        return []
+    return _hydrate(db, _hits(*search_index(min(top_k, len(candidates)), candidates)), {})
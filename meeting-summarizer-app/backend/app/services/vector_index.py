@@ -0,0 +1,152 @@
+import math
+from typing import Any, Dict, Optional, Set, Tuple
+import numpy as np
+import faiss
+from config import settings
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# faiss wants ~39 training points per centroid, and 256 per PQ code (8 bits)
+IVF_POINTS_PER_CENTROID = 39
+PQ_MIN_TRAINING_POINTS = 256 * IVF_POINTS_PER_CENTROID
+
+def ivf_nlist(size: int) -> int:
+    """Number of IVF cells for a corpus of size vectors (VECTOR_IVF_NLIST, or ~4*sqrt(n))"""
+    nlist = settings.VECTOR_IVF_NLIST or int(4 * math.sqrt(max(1, size)))
+    return max(1, min(nlist, size // IVF_POINTS_PER_CENTROID))
+
+def pq_subquantizers(dimension: int) -> int:
+    """Largest divisor of dimension that is at most VECTOR_PQ_M"""
+    for m in range(min(settings.VECTOR_PQ_M, dimension), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+def min_training_size(kind: str) -> int:
+    """Smallest corpus an index of this kind can be built from"""
+    return PQ_MIN_TRAINING_POINTS if kind == "ivfpq" else 0
+
+class VectorIndex:
+    """An inner-product FAISS index of one kind (flat, hnsw or ivfpq) keyed by our chunk ids.
+
+    - flat: exact brute-force scan (IndexFlatIP)
+    - hnsw: graph search (IndexHNSWFlat); `ef_search` trades recall for latency.
+      HNSW can't remove vectors, so removed ids are excluded at search time with an
+      id selector until the index is rebuilt (`needs_rebuild`).
+    - ivfpq: inverted lists over k-means cells with product-quantized vectors
+      (IndexIVFPQ); `nprobe` cells are scanned per query. Needs `train` before `add`,
+      and its scores are approximate.
+
+    Searches can be restricted to a set of ids with an id selector: distances are
+    only computed for vectors in the set, so a filtered search is cheaper than an
+    unfiltered one. On HNSW, a graph walk would visit mostly filtered-out nodes when
+    the set is small (below `exact_fraction` of the index), so those searches scan
+    the set exactly instead.
+    """
+
+    def __init__(self, kind: str, dimension: int, size: int = 0):
+        if kind not in INDEX_TYPES:
+            raise ValueError(f"Unknown vector index type {kind!r}, expected one of {', '.join(INDEX_TYPES)}")
+        self.kind = kind
+        self.dimension = dimension
+        self.ef_search = settings.VECTOR_HNSW_EF_SEARCH
+        self.nprobe = settings.VECTOR_IVF_NPROBE
+        self.exact_fraction = settings.VECTOR_FILTER_EXACT_FRACTION
+        self._deleted: Set[int] = set()
+        self._selector: Optional[Tuple[Any, Any, np.ndarray]] = None
+
+        if kind == "flat":
+            self.index = faiss.IndexIDMap(faiss.IndexFlatIP(dimension))
+        elif kind == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(dimension, settings.VECTOR_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            hnsw.hnsw.efConstruction = settings.VECTOR_HNSW_EF_CONSTRUCTION
+            self.index = faiss.IndexIDMap(hnsw)
+        else:
+            self.quantizer = faiss.IndexFlatIP(dimension)  # Must outlive the IVF index
+            self.index = faiss.IndexIVFPQ(
+                self.quantizer, dimension, ivf_nlist(size), pq_subquantizers(dimension), 8, faiss.METRIC_INNER_PRODUCT
+            )
+
+    @property
+    def is_trained(self) -> bool:
+        return self.index.is_trained
+
+    def train(self, vectors: np.ndarray, max_points: int = 0):
+        """Train IVF centroids and PQ codebooks on (a random sample of) vectors"""
+        if self.is_trained:
+            return
+        max_points = max_points or max(self.index.nlist * 64, PQ_MIN_TRAINING_POINTS * 2)
+        if len(vectors) > max_points:
+            sample = np.random.default_rng(0).choice(len(vectors), max_points, replace=False)
+            vectors = vectors[np.sort(sample)]
+        self.index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        if len(ids):
+            self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), np.asarray(ids, dtype=np.int64))
+
+    def remove(self, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.kind == "hnsw":
+            self._deleted.update(ids.tolist())
+            self._selector = None
+        else:
+            self.index.remove_ids(ids)
+
+    def count(self) -> int:
+        return self.index.ntotal - len(self._deleted)
+
+    def needs_rebuild(self, ratio: float = settings.VECTOR_TOMBSTONE_RATIO) -> bool:
+        """Whether removed-but-still-indexed vectors (HNSW) passed ratio of the index"""
+        return bool(self._deleted) and len(self._deleted) >= ratio * self.index.ntotal
+
+    def _search_params(self, k: int, allowed=None, allowed_count: int = 0):
+        if self.kind == "hnsw":
+            selector = allowed  # Removed ids have no rows, so they're never in an allowed set
+            if selector is None and self._deleted:
+                if self._selector is None:
+                    deleted = np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))
+                    batch = faiss.IDSelectorBatch(len(deleted), faiss.swig_ptr(deleted))
+                    # Keep the array and inner selector alive as long as the outer one
+                    self._selector = (faiss.IDSelectorNot(batch), batch, deleted)
+                selector = self._selector[0]
+            return faiss.SearchParametersHNSW(efSearch=max(self.ef_search, k), sel=selector)
+        if self.kind == "ivfpq":
+            nprobe = self.nprobe
+            if allowed is not None:
+                # Allowed vectors are spread over all cells: probe proportionally more cells
+                # for narrow filters (non-members are skipped without computing distances)
+                nprobe = min(self.index.nlist, math.ceil(nprobe * self.index.ntotal / max(1, allowed_count)))
+            return faiss.SearchParametersIVF(nprobe=nprobe, sel=allowed)
+        return faiss.SearchParameters(sel=allowed) if allowed is not None else None
+
+    def _search_hnsw_exact(self, queries: np.ndarray, k: int, allowed) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact scan of the HNSW vectors, computing distances only for allowed ids"""
+        storage = faiss.downcast_index(self.index.index).storage
+        translated = faiss.IDSelectorTranslated(self.index.id_map, allowed)  # Positions -> our ids
+        scores, positions = storage.search(queries, k, params=faiss.SearchParameters(sel=translated))
+        id_map = self.index.id_map
+        ids = np.array([[id_map.at(int(p)) if p >= 0 else -1 for p in row] for row in positions], dtype=np.int64)
+        return scores, ids
+
+    def search(self, queries: np.ndarray, k: int, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (scores, ids) per query, optionally only among ids; missing results have id -1"""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        allowed = None
+        if ids is not None:
+            ids = np.ascontiguousarray(ids, dtype=np.int64)
+            allowed = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+            if self.kind == "hnsw" and len(ids) < self.exact_fraction * self.index.ntotal:
+                return self._search_hnsw_exact(queries, k, allowed)
+        params = self._search_params(k, allowed, len(ids) if ids is not None else 0)
+        if params is None:
+            return self.index.search(queries, k)
+        return self.index.search(queries, k, params=params)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"type": self.kind, "vectors": self.count()}
+        if self.kind == "hnsw":
+            stats.update(ef_search=self.ef_search, removed_pending_rebuild=len(self._deleted))
+        elif self.kind == "ivfpq":
+            stats.update(nlist=self.index.nlist, nprobe=self.nprobe)
+        return stats
@@ -0,0 +1,350 @@
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from config import settings
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2
+
+def _fsync_dir(directory: str):
+    """Persist a rename/create in directory (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_durable(path: str, write):
+    """Write a file through write(f), flush it to disk and atomically move it into place"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class SegmentStore:
+    """Append-only on-disk storage for embedding vectors and their ids.
+
+    Every append assigns the vectors new ids, writes a new immutable segment
+    (`<name>.ids` with int64 ids, `<name>.vec` with float32 vectors) and then commits
+    it by atomically replacing an fsync'd manifest, which also records the next free
+    id so ids are never reused. A crash at any point leaves either the old or the new
+    manifest; segment files not listed in it are ignored and removed on the next load.
+    Ingest cost depends only on the size of the batch, not on the size of the corpus.
+
+    Background compaction merges segments of similar size (size-tiered, merge_factor
+    at a time) into larger ones, so the number of files stays logarithmic in the
+    corpus size and each vector is rewritten only a logarithmic number of times.
+
+    Deleting vectors appends their ids to a tombstone file (`<name>.del`) committed the
+    same way; tombstoned vectors are skipped on load. Once tombstones exceed
+    tombstone_ratio of the stored vectors, compaction rewrites the segments holding
+    them without the deleted vectors and drops the tombstones.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dimension: int,
+        merge_factor: int = settings.VECTOR_MERGE_FACTOR,
+        segment_target: int = settings.VECTOR_SEGMENT_TARGET,
+        tombstone_ratio: float = settings.VECTOR_TOMBSTONE_RATIO
+    ):
+        self.directory = directory
+        self.dimension = dimension
+        self.merge_factor = max(2, merge_factor)
+        self.segment_target = segment_target
+        self.tombstone_ratio = tombstone_ratio
+        self._lock = threading.Lock()  # Guards the manifest
+        self._compaction: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._read_manifest()
+        if self.manifest["version"] != MANIFEST_VERSION:
+            # Written by an older version: start empty; startup rebuilds an empty index from the database
+            print(f"[VECTOR] Vector store format changed, discarding {self.directory}")
+            self.manifest = self._empty_manifest()
+            self._commit(self.manifest)
+            self._remove_unlisted_files()
+        self.manifest.setdefault("tombstones", [])
+        self._deleted = self._read_tombstones(self.manifest["tombstones"])
+
+    # Manifest
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        path = self._manifest_path()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            if manifest["dimension"] != self.dimension:
+                raise ValueError(
+                    f"Vector store at {self.directory} has dimension {manifest['dimension']}, "
+                    f"expected {self.dimension}; rebuild the index"
+                )
+            return manifest
+        return self._empty_manifest()
+
+    def _empty_manifest(self) -> Dict[str, Any]:
+        return {"version": MANIFEST_VERSION, "dimension": self.dimension, "next_segment": 1, "next_id": 1, "segments": [], "tombstones": []}
+
+    def _commit(self, manifest: Dict[str, Any]):
+        """Durably replace the manifest; the new segments become visible atomically"""
+        data = json.dumps(manifest, indent=2).encode()
+        _write_durable(self._manifest_path(), lambda f: f.write(data))
+        _fsync_dir(self.directory)
+        self.manifest = manifest
+
+    # Segments
+
+    def _segment_path(self, name: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{name}.{extension}")
+
+    def _write_segment(self, name: str, ids: np.ndarray, vectors: np.ndarray):
+        _write_durable(self._segment_path(name, "ids"), lambda f: f.write(ids.tobytes()))
+        _write_durable(self._segment_path(name, "vec"), lambda f: f.write(vectors.tobytes()))
+
+    def _read_segment(self, segment: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        name, count = segment["name"], segment["count"]
+        ids = np.fromfile(self._segment_path(name, "ids"), dtype=np.int64)
+        vectors = np.fromfile(self._segment_path(name, "vec"), dtype=np.float32)
+        if ids.size != count or vectors.size != count * self.dimension:
+            raise ValueError(f"Segment {name} is damaged: expected {count} vectors")
+        return ids, vectors.reshape(count, self.dimension)
+
+    def _read_tombstones(self, tombstones: List[Dict[str, Any]]) -> Set[int]:
+        deleted: Set[int] = set()
+        for tombstone in tombstones:
+            ids = np.fromfile(self._segment_path(tombstone["name"], "del"), dtype=np.int64)
+            if ids.size != tombstone["count"]:
+                raise ValueError(f"Tombstone file {tombstone['name']} is damaged: expected {tombstone['count']} ids")
+            deleted.update(ids.tolist())
+        return deleted
+
+    def _remove_unlisted_files(self):
+        """Delete segment files left behind by interrupted appends or compactions"""
+        listed = {segment["name"] for segment in self.manifest["segments"] + self.manifest.get("tombstones", [])}
+        for file_name in os.listdir(self.directory):
+            name, _, extension = file_name.partition(".")
+            if file_name != MANIFEST_FILE and name not in listed and extension in (
+                "ids", "vec", "del", "jsonl", "ids.tmp", "vec.tmp", "del.tmp", "jsonl.tmp", "json.tmp"
+            ):
+                os.remove(os.path.join(self.directory, file_name))
+
+    def _live(self, ids: np.ndarray, vectors: np.ndarray, deleted: Set[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Drop the vectors whose ids are in deleted"""
+        if not deleted:
+            return ids, vectors
+        keep = ~np.isin(ids, np.fromiter(deleted, dtype=np.int64, count=len(deleted)))
+        return ids[keep], vectors[keep]
+
+    def load(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (ids, vectors) for every committed segment, in commit order, without deleted vectors"""
+        with self._lock:
+            self._remove_unlisted_files()
+            segments = list(self.manifest["segments"])
+            deleted = set(self._deleted)
+        for segment in segments:
+            ids, vectors = self._live(*self._read_segment(segment), deleted)
+            if len(ids):
+                yield ids, vectors
+
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        """Durably store a batch of vectors as a new segment and return their new ids"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        with self._lock:
+            name = f"seg-{self.manifest['next_segment']:08d}"
+            first_id = self.manifest["next_id"]
+            ids = np.arange(first_id, first_id + len(vectors), dtype=np.int64)
+            self._write_segment(name, ids, vectors)
+            manifest = dict(self.manifest)
+            manifest["next_segment"] += 1
+            manifest["next_id"] = first_id + len(vectors)
+            manifest["segments"] = self.manifest["segments"] + [{"name": name, "count": len(vectors)}]
+            self._commit(manifest)
+
+        self.maybe_compact()
+        return ids
+
+    def delete(self, ids: np.ndarray) -> int:
+        """Durably tombstone stored vectors; returns how many were not deleted already"""
+        with self._lock:
+            new_ids = np.array([i for i in np.unique(np.asarray(ids, dtype=np.int64)).tolist() if i not in self._deleted], dtype=np.int64)
+            if len(new_ids) == 0:
+                return 0
+            name = f"del-{self.manifest['next_segment']:08d}"
+            _write_durable(self._segment_path(name, "del"), lambda f: f.write(new_ids.tobytes()))
+            manifest = dict(self.manifest)
+            manifest["next_segment"] += 1
+            manifest["tombstones"] = self.manifest["tombstones"] + [{"name": name, "count": len(new_ids)}]
+            self._commit(manifest)
+            self._deleted.update(new_ids.tolist())
+
+        self.maybe_compact()
+        return len(new_ids)
+
+    def reset(self):
+        """Drop every segment (used before rebuilding the index from the database); ids keep increasing"""
+        with self._lock:
+            manifest = dict(self.manifest)
+            manifest["segments"] = []
+            manifest["tombstones"] = []
+            self._commit(manifest)
+            self._deleted = set()
+            self._remove_unlisted_files()
+
+    def stored_count(self) -> int:
+        """Vectors in segment files, including tombstoned ones"""
+        return sum(segment["count"] for segment in self.manifest["segments"])
+
+    def count(self) -> int:
+        """Live (not deleted) vectors"""
+        return self.stored_count() - len(self._deleted)
+
+    def tombstone_count(self) -> int:
+        return len(self._deleted)
+
+    # Compaction
+
+    def _merge_candidates(self) -> List[Dict[str, Any]]:
+        """Segments of the smallest size tier that has merge_factor members"""
+        tiers: Dict[int, List[Dict[str, Any]]] = {}
+        for segment in self.manifest["segments"]:
+            if segment["count"] < self.segment_target:
+                tier = int(math.log(max(1, segment["count"]), self.merge_factor))
+                tiers.setdefault(tier, []).append(segment)
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= self.merge_factor:
+                return tiers[tier][:self.merge_factor]
+        return []
+
+    def needs_purge(self) -> bool:
+        """Whether tombstones passed tombstone_ratio of the stored vectors"""
+        return bool(self._deleted) and len(self._deleted) >= self.tombstone_ratio * self.stored_count()
+
+    def needs_compaction(self) -> bool:
+        return self.needs_purge() or bool(self._merge_candidates())
+
+    def maybe_compact(self):
+        """Start a background compaction when there are too many segments or tombstones"""
+        if not self.needs_compaction():
+            return
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._compaction = threading.Thread(target=self.compact, name="vector-compaction", daemon=True)
+        self._compaction.start()
+
+    def compact(self):
+        """Purge tombstones if needed, then merge full size tiers until none is left.
+
+        Appends and deletes can continue while it runs.
+        """
+        if self.needs_purge():
+            self._purge()
+        while self._merge_once():
+            pass
+
+    def _purge(self) -> bool:
+        """Rewrite the segments holding tombstoned vectors without them and drop those tombstones"""
+        try:
+            with self._lock:
+                tombstones = list(self.manifest["tombstones"])
+                deleted = set(self._deleted)
+                segments = list(self.manifest["segments"])
+
+            # Ids are never reused, so a tombstoned id can only be in segments that
+            # already existed when it was deleted; later segments need no rewrite
+            deleted_ids = np.fromiter(deleted, dtype=np.int64, count=len(deleted))
+            rewritten: Dict[str, Optional[Dict[str, Any]]] = {}
+            for segment in segments:
+                ids, vectors = self._read_segment(segment)
+                keep = ~np.isin(ids, deleted_ids)
+                if keep.all():
+                    continue
+                if not keep.any():
+                    rewritten[segment["name"]] = None
+                    continue
+                with self._lock:
+                    name = f"seg-{self.manifest['next_segment']:08d}"
+                    manifest = dict(self.manifest)
+                    manifest["next_segment"] += 1
+                    self._commit(manifest)  # Reserve the name
+                self._write_segment(name, ids[keep], vectors[keep])
+                rewritten[segment["name"]] = {"name": name, "count": int(keep.sum())}
+
+            with self._lock:
+                purged_names = {tombstone["name"] for tombstone in tombstones}
+                manifest = dict(self.manifest)
+                segments = [rewritten.get(segment["name"], segment) for segment in self.manifest["segments"]]
+                manifest["segments"] = [segment for segment in segments if segment is not None]
+                # Tombstones written while the purge ran stay for the next one
+                manifest["tombstones"] = [t for t in self.manifest["tombstones"] if t["name"] not in purged_names]
+                self._commit(manifest)
+                self._deleted -= deleted
+                self._remove_unlisted_files()
+            print(f"[VECTOR] Purged {len(deleted)} deleted vectors from {len(rewritten)} segments")
+            return True
+        except Exception as e:
+            print(f"[VECTOR] Tombstone purge failed (index is unaffected): {e}")
+            return False
+
+    def _merge_once(self) -> bool:
+        try:
+            with self._lock:
+                merged = self._merge_candidates()
+                if not merged:
+                    return False
+                name = f"seg-{self.manifest['next_segment']:08d}"
+                manifest = dict(self.manifest)
+                manifest["next_segment"] += 1
+                self._commit(manifest)  # Reserve the name
+
+            # Segments are immutable, so they can be read and merged without the lock
+            parts = [self._read_segment(segment) for segment in merged]
+            ids = np.concatenate([part[0] for part in parts])
+            vectors = np.concatenate([part[1] for part in parts])
+            self._write_segment(name, ids, vectors)
+
+            with self._lock:
+                merged_names = {segment["name"] for segment in merged}
+                # The merged segment takes the place of the first one it replaces
+                segments, inserted = [], False
+                for segment in self.manifest["segments"]:
+                    if segment["name"] in merged_names:
+                        if not inserted:
+                            segments.append({"name": name, "count": len(vectors)})
+                            inserted = True
+                    else:
+                        segments.append(segment)
+                manifest = dict(self.manifest)
+                manifest["segments"] = segments
+                self._commit(manifest)
+                self._remove_unlisted_files()
+            print(f"[VECTOR] Compacted {len(merged)} segments into {name} ({len(vectors)} vectors)")
+            return True
+        except Exception as e:
+            print(f"[VECTOR] Compaction failed (index is unaffected): {e}")
+            return False
+
+    def wait_for_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segments": len(self.manifest["segments"]),
+            "vectors": self.count(),
+            "tombstones": self.tombstone_count(),
+            "compacting": self._compaction is not None and self._compaction.is_alive()
+        }
@@ -1,44 +1,155 @@
+import asyncio
 import os
 import pickle
+import threading
+from datetime import datetime
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 import faiss
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.database import get_db, Meeting as DBMeeting
+from config import settings
+from app.database import get_db, engine, SessionLocal, Meeting as DBMeeting, VectorChunk, TranscriptSegment
+from app.services.transcript_segments import load_segments
+from app.services.vector_segments import SegmentStore
+from app.services.embedding_cache import EmbeddingCache
+from app.services.query_encoder import QueryEncoder
+from app.services.vector_index import INDEX_TYPES, VectorIndex, min_training_size
+from app.services.vector_filters import search_chunks
+from app.utils.metrics import metrics
+
+CHUNK_KINDS = ("transcript", "summary", "key_point", "action_item")
 
 class VectorStore:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", data_dir: str = settings.VECTOR_STORE_DIR):
+        if settings.VECTOR_INDEX_TYPE not in INDEX_TYPES:
+            raise ValueError(f"Unknown VECTOR_INDEX_TYPE {settings.VECTOR_INDEX_TYPE!r}, expected one of {', '.join(INDEX_TYPES)}")
+        if settings.EMBEDDING_THREADS > 0:
+            import torch
+            torch.set_num_threads(settings.EMBEDDING_THREADS)
         self.model = SentenceTransformer(model_name)
         self.dimension = self.model.get_sentence_embedding_dimension()
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner Product for cosine similarity
-        self.chunks = []  # Store text chunks with metadata
-        self.index_file = "meeting_index.faiss"
+        self.embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_DIR, model_name, self.dimension)
+        self.query_encoder = QueryEncoder(self._encode)
+        self.index = VectorIndex("flat", self.dimension)
+        self._index_lock = threading.Lock()  # FAISS indexes aren't safe to search while being modified
+        # While a replacement index is built in the background, changes made meanwhile
+        # are recorded here and replayed onto it before it is swapped in
+        self._pending: Optional[List[Tuple[str, np.ndarray, Optional[np.ndarray]]]] = None
+        self._generation = 0  # Bumped by rebuild_index so a stale background build is discarded
+        # Vectors are persisted incrementally and the index is rebuilt in memory on load;
+        # chunk metadata lives in the vector_chunks table, keyed by FAISS id
+        self.storage = SegmentStore(data_dir, self.dimension)
+        self.index_file = "meeting_index.faiss"  # Legacy full snapshots, migrated on first load
         self.chunks_file = "meeting_chunks.pkl"
         self.load_index()
     
+    def count(self) -> int:
+        """Number of searchable chunks"""
+        return self.index.count()
+    
     def load_index(self):
-        """Load existing index and chunks if they exist"""
+        """Load the committed segments into an exact index, then build the configured one in the background"""
         try:
-            if os.path.exists(self.index_file) and os.path.exists(self.chunks_file):
-                self.index = faiss.read_index(self.index_file)
-                with open(self.chunks_file, 'rb') as f:
-                    self.chunks = pickle.load(f)
-                print(f"Loaded vector index with {len(self.chunks)} chunks")
+            if self.storage.count() == 0 and os.path.exists(self.index_file) and os.path.exists(self.chunks_file):
+                self._migrate_legacy_files()
+            
+            index = VectorIndex("flat", self.dimension)
+            for ids, vectors in self.storage.load():
+                index.add(vectors, ids)
+            self.index = index
+            print(f"Loaded vector index with {self.count()} chunks")
         except Exception as e:
             print(f"Error loading index: {e}")
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.chunks = []
+            self.index = VectorIndex("flat", self.dimension)
+        self._maybe_rebuild_index()
+    
+    # Index type
+    
+    def _target_index_type(self) -> str:
+        """Index type for the current corpus: flat until VECTOR_ANN_THRESHOLD, then VECTOR_INDEX_TYPE"""
+        configured = settings.VECTOR_INDEX_TYPE
+        if self.index.kind == configured:
+            return configured  # Never demote once promoted
+        if self.count() < max(settings.VECTOR_ANN_THRESHOLD, min_training_size(configured)):
+            return "flat"
+        return configured
     
-    def save_index(self):
-        """Save index and chunks to disk"""
+    def _maybe_rebuild_index(self):
+        """Start a background build when the index should be promoted or has too many removed vectors"""
+        with self._index_lock:
+            if self._pending is not None:
+                return  # A build is already running
+            kind = self._target_index_type()
+            if kind == self.index.kind and not self.index.needs_rebuild():
+                return
+            self._pending = []
+            generation = self._generation
+        threading.Thread(target=self._build_index, args=(kind, generation), name="vector-index-build", daemon=True).start()
+    
+    def _build_index(self, kind: str, generation: int):
+        """Build (and for IVF-PQ, train) a new index from storage while the current one keeps serving"""
         try:
-            faiss.write_index(self.index, self.index_file)
-            with open(self.chunks_file, 'wb') as f:
-                pickle.dump(self.chunks, f)
-            print(f"Saved vector index with {len(self.chunks)} chunks")
+            print(f"[VECTOR] Building {kind} index...")
+            with metrics.timer("vector.index.build.seconds"):
+                parts = list(self.storage.load())
+                ids = np.concatenate([part[0] for part in parts]) if parts else np.zeros(0, dtype=np.int64)
+                vectors = np.concatenate([part[1] for part in parts]) if parts else np.zeros((0, self.dimension), dtype=np.float32)
+                index = VectorIndex(kind, self.dimension, size=len(ids))
+                index.train(vectors)
+                index.add(vectors, ids)
+            
+            with self._index_lock:
+                if generation != self._generation:
+                    return
+                # Ids are allocated in increasing order, so chunks added after the snapshot
+                # have larger ids than all of it; removals only apply to ids it contains
+                last_id = int(ids.max()) if len(ids) else 0
+                for op, op_ids, op_vectors in self._pending:
+                    if op == "add":
+                        new = op_ids > last_id
+                        index.add(op_vectors[new], op_ids[new])
+                    else:
+                        present = op_ids[(op_ids > last_id) | np.isin(op_ids, ids)]
+                        index.remove(present)
+                self.index = index
+            metrics.set_gauge("vector.index.vectors", index.count())
+            print(f"[VECTOR] Switched to {kind} index with {index.count()} chunks")
         except Exception as e:
-            print(f"Error saving index: {e}")
+            print(f"[VECTOR] Index build failed, keeping the {self.index.kind} index: {e}")
+        finally:
+            with self._index_lock:
+                if generation == self._generation:
+                    self._pending = None
+    
+    def _migrate_legacy_files(self):
+        """Move a pickled index from older versions into segment storage and vector_chunks"""
+        index = faiss.read_index(self.index_file)
+        with open(self.chunks_file, 'rb') as f:
+            chunks = pickle.load(f)
+        if index.ntotal == len(chunks) and chunks:
+            VectorChunk.__table__.create(bind=engine, checkfirst=True)
+            prefixes = {"Summary: ": "summary", "Key Point: ": "key_point", "Action Item: ": "action_item"}
+            for chunk in chunks:
+                chunk['created_at'] = datetime.fromisoformat(chunk['created_at'])
+                chunk['kind'] = next((kind for prefix, kind in prefixes.items() if chunk['text'].startswith(prefix)), "transcript")
+            self._store_chunks(index.reconstruct_n(0, index.ntotal), chunks)
+        for path in (self.index_file, self.chunks_file):
+            os.replace(path, f"{path}.migrated")
+        print(f"Migrated {len(chunks)} chunks from {self.index_file} to segment storage")
+    
+    def _store_chunks(self, vectors: np.ndarray, rows: List[Dict]) -> np.ndarray:
+        """Persist vectors (which assigns their ids), then their metadata rows.
+        
+        A crash in between leaves vectors without rows, which searches skip; ids are
+        never reused, so rows can't end up attached to the wrong vector.
+        """
+        ids = self.storage.append(vectors)
+        with SessionLocal() as db:
+            db.execute(insert(VectorChunk), [{**row, 'id': int(chunk_id)} for chunk_id, row in zip(ids, rows)])
+            db.commit()
+        return ids
     
     def chunk_text(self, text: str, chunk_size: int = 200, overlap: int = 50) -> List[str]:
         """Split text into overlapping chunks"""
@@ -52,77 +163,195 @@ class VectorStore:
         
         return chunks
     
-    def add_meeting(self, meeting: DBMeeting):
-        """Add a meeting to the vector store"""
-        # Create chunks from transcript
-        text_chunks = self.chunk_text(meeting.transcript)
+    def chunk_segments(self, segments: List[TranscriptSegment], chunk_size: int = 200,
+                       overlap: int = 50) -> List[Tuple[str, float, float]]:
+        """Split timed segments into overlapping chunks of whole segments.
+        
+        Like chunk_text, but chunks end on segment boundaries so each one carries the
+        audio offsets (start of its first segment, end of its last).
+        """
+        counts = [len(segment.text.split()) for segment in segments]
+        chunks = []
+        i = 0
+        while i < len(segments):
+            j, words = i, 0
+            while j < len(segments) and (words == 0 or words + counts[j] <= chunk_size):
+                words += counts[j]
+                j += 1
+            chunk = ' '.join(segment.text for segment in segments[i:j])
+            if len(chunk.strip()) > 20:  # Only add meaningful chunks
+                chunks.append((chunk, segments[i].start, segments[j - 1].end))
+            if j == len(segments):
+                break
+            # Start the next chunk with the trailing segments covering about `overlap` words
+            k, tail = j, 0
+            while k - 1 > i and tail + counts[k - 1] <= overlap:
+                k -= 1
+                tail += counts[k]
+            i = k
+        return chunks
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE, normalize_embeddings=True)
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for chunk texts, reusing cached ones"""
+        return self.embedding_cache.encode(texts, self._encode)
+    
+    def _meeting_rows(self, meeting: DBMeeting, segments: Optional[List[TranscriptSegment]] = None) -> List[Dict]:
+        """Chunk rows (text and metadata) for a meeting"""
+        # Create chunks from transcript, with audio offsets when its timed segments are known
+        if segments:
+            text_chunks = [("transcript", chunk, start, end) for chunk, start, end in self.chunk_segments(segments)]
+        else:
+            text_chunks = [("transcript", chunk, None, None) for chunk in self.chunk_text(meeting.transcript or "")]
         
         # Add summary and key points as separate chunks
         if meeting.summary:
-            text_chunks.append(f"Summary: {meeting.summary}")
+            text_chunks.append(("summary", f"Summary: {meeting.summary}", None, None))
         
         if meeting.key_points:
             for point in meeting.key_points:
-                text_chunks.append(f"Key Point: {point}")
+                text_chunks.append(("key_point", f"Key Point: {point}", None, None))
         
         if meeting.action_items:
             for item in meeting.action_items:
-                text_chunks.append(f"Action Item: {item}")
+                text_chunks.append(("action_item", f"Action Item: {item}", None, None))
         
-        # Generate embeddings
-        embeddings = self.model.encode(text_chunks, normalize_embeddings=True)
-        
-        # Add to index
-        self.index.add(embeddings.astype(np.float32))
+        return [{
+            'text': chunk,
+            'kind': kind,
+            'meeting_id': meeting.id,
+            'meeting_title': meeting.title,
+            'created_at': meeting.created_at,
+            'chunk_index': i,
+            'start': start,
+            'end': end
+        } for i, (kind, chunk, start, end) in enumerate(text_chunks)]
+    
+    def _meetings_rows(self, meetings: List[DBMeeting]) -> List[Dict]:
+        """Chunk rows for several meetings, loading their timed segments with one query"""
+        with SessionLocal() as db:
+            segments = load_segments(db, [meeting.id for meeting in meetings])
+        return [row for meeting in meetings for row in self._meeting_rows(meeting, segments.get(meeting.id))]
+    
+    def _add_chunks(self, embeddings: np.ndarray, rows: List[Dict]):
+        # Persist only this meeting's chunks, then make them searchable
+        ids = self._store_chunks(embeddings, rows)
+        with self._index_lock:
+            self.index.add(embeddings, ids)
+            if self._pending is not None:
+                self._pending.append(("add", ids, embeddings))
+        self._maybe_rebuild_index()
+    
+    def add_meeting(self, meeting: DBMeeting):
+        """Add a meeting to the vector store (use upsert_meeting if it may already be indexed)"""
+        self.add_meetings([meeting])
+    
+    def add_meetings(self, meetings: List[DBMeeting]):
+        """Add several meetings, embedding all their chunks in one batched call"""
+        rows = self._meetings_rows(meetings)
+        if not rows:
+            return
+        self._add_chunks(self.embed([row['text'] for row in rows]), rows)
+        print(f"Added {len(rows)} chunks from {len(meetings)} meeting(s)")
+    
+    def remove_meeting(self, meeting_id: str) -> int:
+        """Remove every chunk of a meeting; returns the number of chunks removed.
         
-        # Store metadata
-        for i, chunk in enumerate(text_chunks):
-            self.chunks.append({
-                'text': chunk,
-                'meeting_id': meeting.id,
-                'meeting_title': meeting.title,
-                'created_at': meeting.created_at.isoformat(),
-                'chunk_index': i
-            })
+        The vectors are tombstoned on disk, then removed from the in-memory index,
+        then their rows are deleted; a crash in between only leaves rows that no
+        search can reach. Tombstoned vectors are purged by the background compaction.
+        """
+        with SessionLocal() as db:
+            ids = np.array([chunk_id for chunk_id, in db.query(VectorChunk.id).filter(VectorChunk.meeting_id == meeting_id)],
+                           dtype=np.int64)
+            if len(ids) == 0:
+                return 0
+            self.storage.delete(ids)
+            with self._index_lock:
+                self.index.remove(ids)
+                if self._pending is not None:
+                    self._pending.append(("remove", ids, None))
+            db.query(VectorChunk).filter(VectorChunk.meeting_id == meeting_id).delete(synchronize_session=False)
+            db.commit()
+        print(f"Removed {len(ids)} chunks from meeting: {meeting_id}")
+        self._maybe_rebuild_index()
+        return len(ids)
+    
+    def upsert_meeting(self, meeting: DBMeeting):
+        """Replace a meeting's chunks with ones built from its current content"""
+        # Embed first so the meeting is missing from search only for the swap itself;
+        # unchanged chunks (e.g. the transcript after a summary regeneration) come from the cache
+        rows = self._meetings_rows([meeting])
+        embeddings = self.embed([row['text'] for row in rows])
+        self.remove_meeting(meeting.id)
+        if rows:
+            self._add_chunks(embeddings, rows)
+            print(f"Indexed {len(rows)} chunks from meeting: {meeting.title}")
+    
+    def search_similar(self, query: str, top_k: int = 5, **filters) -> List[Dict]:
+        """Search for similar text chunks (blocking; use asearch_similar on the event loop).
         
-        self.save_index()
-        print(f"Added {len(text_chunks)} chunks from meeting: {meeting.title}")
+        Accepts the filters of vector_filters.apply_filters.
+        """
+        if self.count() == 0:
+            return []
+        return self._search_embedding(self.query_encoder.encode(query), top_k, filters)
     
-    def search_similar(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Search for similar text chunks"""
-        if len(self.chunks) == 0:
+    async def asearch_similar(self, query: str, top_k: int = 5, **filters) -> List[Dict]:
+        """Search for similar text chunks without blocking the event loop"""
+        if self.count() == 0:
             return []
+        query_embedding = await self.query_encoder.aencode(query)
+        return await asyncio.get_running_loop().run_in_executor(None, self._search_embedding, query_embedding, top_k, filters)
+    
+    def _search_embedding(self, query_embedding: np.ndarray, top_k: int, filters: Optional[Dict] = None) -> List[Dict]:
+        def search_index(k: int, ids: Optional[np.ndarray]):
+            with self._index_lock, metrics.timer("vector.search.seconds"):
+                return self.index.search(query_embedding[None, :], min(k, max(1, self.count())), ids=ids)
         
-        # Generate query embedding
-        query_embedding = self.model.encode([query], normalize_embeddings=True)
-        
-        # Search
-        scores, indices = self.index.search(query_embedding.astype(np.float32), min(top_k, len(self.chunks)))
-        
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx >= 0 and score > 0.3:  # Similarity threshold
-                chunk_data = self.chunks[idx].copy()
-                chunk_data['similarity'] = float(score)
-                results.append(chunk_data)
-        
-        return results
+        with SessionLocal() as db:
+            hits = search_chunks(db, search_index, self.count(), top_k, filters or {})
+            return [{
+                'text': row.text,
+                'meeting_id': row.meeting_id,
+                'meeting_title': row.meeting_title,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'chunk_index': row.chunk_index,
+                'kind': row.kind,
+                'start': row.start,  # Audio offsets (seconds) of transcript chunks, when known
+                'end': row.end,
+                'similarity': score
+            } for row, score in hits]
     
     def rebuild_index(self, db: Session):
         """Rebuild the entire index from database"""
         print("Rebuilding vector index from database...")
         
         # Clear existing index
-        self.index = faiss.IndexFlatIP(self.dimension)
-        self.chunks = []
+        self.storage.reset()
+        with self._index_lock:
+            self.index = VectorIndex("flat", self.dimension)
+            self._generation += 1
+            self._pending = None
+        db.query(VectorChunk).delete()
+        db.commit()
         
         # Get all meetings
         meetings = db.query(DBMeeting).all()
         
-        for meeting in meetings:
-            self.add_meeting(meeting)
+        # Embed several meetings per call so small meetings still fill encoder batches
+        group_size = settings.EMBEDDING_REBUILD_MEETINGS
+        for start in range(0, len(meetings), group_size):
+            self.add_meetings(meetings[start:start + group_size])
         
-        print(f"Rebuilt index with {len(self.chunks)} chunks from {len(meetings)} meetings")
+        print(f"Rebuilt index with {self.count()} chunks from {len(meetings)} meetings")
+    
+    def stats(self) -> Dict:
+        return {**self.index.stats(), "building": self._pending is not None, "storage": self.storage.stats(),
+                "embedding_cache": self.embedding_cache.stats(),
+                "query_encoder": self.query_encoder.stats()}
 
 # Global instance
 vector_store = VectorStore()
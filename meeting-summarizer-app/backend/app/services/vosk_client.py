@@ -1,9 +1,7 @@
 import json
-import tempfile
 import os
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
-import subprocess
 import vosk
 from config import settings
 
@@ -87,98 +85,68 @@ class VoskClient:
         
         return recognizer
     
-    def _convert_to_pcm(self, audio_data: bytes) -> bytes:
-        """Convert WebM/MP4 audio to PCM format required by VOSK"""
-        try:
-            # Create temporary input file
-            with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_input:
-                temp_input.write(audio_data)
-                temp_input_path = temp_input.name
-            
-            # Create temporary output file for PCM
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_output:
-                temp_output_path = temp_output.name
-            
-            # Use FFmpeg to convert to PCM format
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',  # -y to overwrite output files
-                '-i', temp_input_path,
-                '-ar', '16000',  # Sample rate 16kHz
-                '-ac', '1',      # Mono
-                '-f', 'wav',     # WAV format
-                temp_output_path
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                print(f"[VOSK] FFmpeg error: {result.stderr}")
-                return b""
-            
-            # Read the converted PCM data
-            with open(temp_output_path, 'rb') as f:
-                wav_data = f.read()
-            
-            # Clean up temporary files
-            os.unlink(temp_input_path)
-            os.unlink(temp_output_path)
-            
-            # Extract raw PCM data (skip WAV header - typically 44 bytes)
-            if len(wav_data) > 44:
-                pcm_data = wav_data[44:]  # Skip WAV header
-                print(f"[VOSK] Converted {len(audio_data)} bytes to {len(pcm_data)} bytes PCM")
-                return pcm_data
-            else:
-                print(f"[VOSK] Converted file too small: {len(wav_data)} bytes")
-                return b""
-                
-        except Exception as e:
-            print(f"[VOSK] Error converting audio to PCM: {e}")
-            return b""
+    def _final_event(self, result: Dict) -> Optional[Dict]:
+        """Turn a Kaldi Result()/FinalResult() into a final event (None when empty)"""
+        text = result.get("text", "").strip()
+        if not text:
+            return None
+        
+        words = result.get("result", [])
+        confidence = sum(w.get("conf", 0.0) for w in words) / len(words) if words else 0.8
+        return {
+            "type": "final",
+            "text": text,
+            "confidence": confidence,
+            "words": words,
+            "engine": "vosk"
+        }
     
-    def transcribe_stream(self, recognizer, pcm_data: bytes) -> Dict:
-        """Process PCM audio data with VOSK recognizer"""
+    def transcribe_stream(self, recognizer, pcm_data: bytes) -> List[Dict]:
+        """Feed PCM audio to a session's recognizer and return streaming events.
+        
+        Returns `final` events for every utterance Kaldi's endpointer closed inside this
+        audio, followed by at most one `partial` event with the current hypothesis of
+        the open utterance. The recognizer keeps its state between calls, so
+        utterances may span any number of chunks.
+        """
+        events: List[Dict] = []
+        if not pcm_data:
+            return events
+        
         try:
-            if not pcm_data:
-                return {"text": "", "confidence": 0.0}
-            
             # Feed data to recognizer in chunks
             chunk_size = 4000  # Process in 4KB chunks
-            final_result = None
+            partial = None
             
             for i in range(0, len(pcm_data), chunk_size):
                 chunk = pcm_data[i:i + chunk_size]
                 
                 if recognizer.AcceptWaveform(chunk):
-                    # Final result available
-                    result = json.loads(recognizer.Result())
-                    if result.get("text"):
-                        final_result = result
-                        print(f"[VOSK] Final result: {result}")
+                    # Endpoint detected: the utterance is complete
+                    event = self._final_event(json.loads(recognizer.Result()))
+                    if event:
+                        print(f"[VOSK] Final result: {event['text']}")
+                        events.append(event)
+                    partial = None
                 else:
-                    # Partial result
-                    partial_result = json.loads(recognizer.PartialResult())
-                    if partial_result.get("partial"):
-                        print(f"[VOSK] Partial result: {partial_result['partial']}")
-            
-            # Get any remaining result
-            if final_result is None:
-                final_result = json.loads(recognizer.FinalResult())
-                print(f"[VOSK] Final result from FinalResult(): {final_result}")
+                    partial = json.loads(recognizer.PartialResult()).get("partial", "").strip()
             
-            # Extract text and confidence
-            text = final_result.get("text", "").strip()
-            confidence = final_result.get("conf", 0.8)  # VOSK sometimes provides confidence
-            
-            return {
-                "text": text,
-                "confidence": confidence,
-                "engine": "vosk"
-            }
+            # Only the latest hypothesis matters to the client
+            if partial:
+                events.append({"type": "partial", "text": partial, "engine": "vosk"})
+            return events
             
         except Exception as e:
             print(f"[VOSK] Error in transcribe_stream: {e}")
-            return {"text": "", "confidence": 0.0, "error": str(e)}
+            return events
+    
+    def flush(self, recognizer) -> Optional[Dict]:
+        """Close the open utterance at the end of a session and return it as a final event"""
+        try:
+            return self._final_event(json.loads(recognizer.FinalResult()))
+        except Exception as e:
+            print(f"[VOSK] Error flushing recognizer: {e}")
+            return None
     
     def is_ready(self) -> bool:
         """Check if VOSK is ready"""
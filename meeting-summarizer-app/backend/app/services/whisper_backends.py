@@ -0,0 +1,125 @@
+from typing import Any, Dict, Optional, Union
+import numpy as np
+from config import settings
+
+# Try to import the speech engines; at least one must be installed
+try:
+    import whisper
+    OPENAI_WHISPER_AVAILABLE = True
+except ImportError:
+    OPENAI_WHISPER_AVAILABLE = False
+
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+
+class OpenAIWhisperBackend:
+    """Reference PyTorch implementation (openai-whisper), float32 or float16"""
+
+    engine = "openai-whisper"
+
+    def __init__(self, name: str, device: str, compute_type: str, cpu_threads: int = 0):
+        if not OPENAI_WHISPER_AVAILABLE:
+            raise RuntimeError("openai-whisper is not installed")
+
+        if compute_type not in ("float32", "float16"):
+            print(f"[WHISPER] {compute_type} is not supported by openai-whisper, using float32")
+            compute_type = "float32"
+        if compute_type == "float16" and device == "cpu":
+            print("[WHISPER] float16 is not supported on CPU, using float32")
+            compute_type = "float32"
+
+        self.compute_type = compute_type
+        self.model = whisper.load_model(name, device=device)
+        if compute_type == "float16":
+            self.model = self.model.half()
+
+    def transcribe(self, audio: Union[str, np.ndarray], beam_size: int = 1, **options) -> Dict[str, Any]:
+        if beam_size > 1:
+            options["beam_size"] = beam_size
+        result = self.model.transcribe(audio, fp16=self.compute_type == "float16", **options)
+        return {
+            "text": result["text"],
+            "language": result.get("language"),
+            "segments": result.get("segments", [])
+        }
+
+    def memory_bytes(self) -> Optional[int]:
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+class FasterWhisperBackend:
+    """CTranslate2 implementation (faster-whisper); int8 is several times faster on CPU"""
+
+    engine = "faster-whisper"
+
+    def __init__(self, name: str, device: str, compute_type: str, cpu_threads: int = 0):
+        if not FASTER_WHISPER_AVAILABLE:
+            raise RuntimeError("faster-whisper is not installed (pip install faster-whisper)")
+
+        self.compute_type = compute_type
+        self.model = WhisperModel(
+            name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads or settings.WHISPER_CPU_THREADS
+        )
+
+    def transcribe(self, audio: Union[str, np.ndarray], beam_size: int = 1, **options) -> Dict[str, Any]:
+        # faster-whisper spells this option differently
+        if "logprob_threshold" in options:
+            options["log_prob_threshold"] = options.pop("logprob_threshold")
+
+        segments, info = self.model.transcribe(audio, beam_size=beam_size, **options)
+
+        # Same shape as openai-whisper so callers don't care which engine ran
+        converted = []
+        for segment in segments:
+            converted.append({
+                "id": segment.id,
+                "seek": segment.seek,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+                "words": [
+                    {
+                        "word": word.word,
+                        "start": word.start,
+                        "end": word.end,
+                        "probability": word.probability
+                    } for word in (segment.words or [])
+                ]
+            })
+
+        return {
+            "text": "".join(segment["text"] for segment in converted),
+            "language": info.language,
+            "segments": converted
+        }
+
+    def memory_bytes(self) -> Optional[int]:
+        return None  # Weights live in CTranslate2, measured by the registry instead
+
+BACKENDS = {
+    OpenAIWhisperBackend.engine: OpenAIWhisperBackend,
+    FasterWhisperBackend.engine: FasterWhisperBackend,
+}
+
+def create_backend(name: str, device: str, compute_type: str, engine: Optional[str] = None, cpu_threads: int = 0):
+    """Load a Whisper model with the configured engine.
+
+    cpu_threads overrides WHISPER_CPU_THREADS for engines with their own thread pool (faster-whisper).
+    """
+    engine = engine or settings.WHISPER_ENGINE
+    if engine not in BACKENDS:
+        raise ValueError(f"Unknown Whisper engine: {engine}. Available: {list(BACKENDS)}")
+    return BACKENDS[engine](name, device, compute_type, cpu_threads=cpu_threads)
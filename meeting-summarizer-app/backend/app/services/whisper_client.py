@@ -1,40 +1,157 @@
-import whisper
-import torch
-from typing import Optional
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
 from pathlib import Path
+import numpy as np
 from config import settings
+from app.services.model_registry import model_registry, ModelKey
+from app.services.inference_executor import inference_executor
+from app.services.whisper_backends import SAMPLE_RATE
+from app.utils.audio_processor import get_audio_duration, load_audio, plan_split_points
+
+# Process pool for long-file pieces when the inference pool is off or has fewer workers
+_piece_pool: Optional[ProcessPoolExecutor] = None
+_piece_pool_key: Optional[ModelKey] = None
+
+def _init_piece_worker(model_key: ModelKey, threads: int):
+    # Split the cores between workers instead of oversubscribing
+    if settings.WHISPER_ENGINE != "faster-whisper":
+        import torch
+        torch.set_num_threads(threads)
+    model_registry.get(model_key, cpu_threads=settings.WHISPER_CPU_THREADS or threads)
+
+def _transcribe_piece(audio: np.ndarray, model_key: ModelKey) -> dict:
+    return WhisperClient(model_key).transcribe_sync(audio)
+
+def _get_piece_pool(model_key: ModelKey) -> ProcessPoolExecutor:
+    global _piece_pool, _piece_pool_key
+    if _piece_pool is None or _piece_pool_key != model_key:
+        if _piece_pool is not None:
+            _piece_pool.shutdown(wait=False)
+        workers = settings.WHISPER_LONG_FILE_WORKERS
+        _piece_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_piece_worker,
+            initargs=(model_key, max(1, (os.cpu_count() or 1) // workers))
+        )
+        _piece_pool_key = model_key
+    return _piece_pool
+
+def stitch_results(results: List[dict], offsets: List[float]) -> dict:
+    """Merge piece transcriptions into one result with absolute timestamps"""
+    segments = []
+    for result, offset in zip(results, offsets):
+        for segment in result.get("segments", []):
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            segment["start"] = segment.get("start", 0.0) + offset
+            segment["end"] = segment.get("end", 0.0) + offset
+            if segment.get("words"):
+                segment["words"] = [
+                    {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                    for word in segment["words"]
+                ]
+            segments.append(segment)
+
+    return {
+        "text": " ".join(result["text"].strip() for result in results if result["text"].strip()),
+        "language": next((result.get("language") for result in results if result.get("language")), None),
+        "segments": segments
+    }
 
 class WhisperClient:
-    def __init__(self):
-        self.model = None
-        self.load_model()
+    def __init__(self, model_key: Optional[ModelKey] = None):
+        # None follows the registry's active model, so runtime swaps apply without a restart
+        self.model_key = model_key
+    
+    @property
+    def model(self):
+        """Shared model instance from the process-wide registry (loaded lazily)"""
+        return model_registry.get(self.model_key)
     
     def load_model(self):
-        """Load Whisper model optimized for M1 Mac"""
+        """Make sure the Whisper model is loaded and warmed up"""
         try:
-            # Use CPU for now due to MPS compatibility issues
-            device = "cpu"
-            self.model = whisper.load_model(settings.WHISPER_MODEL, device=device)
-            print(f"Whisper model loaded on {device}")
+            model_registry.get(self.model_key)
+            key = model_registry.resolve(self.model_key)
+            print(f"Whisper model {key[0]} loaded on {key[1]}")
         except Exception as e:
             print(f"Error loading Whisper model: {e}")
             raise
     
     async def transcribe(self, audio_file_path: str) -> dict:
-        """Transcribe audio file to text"""
-        try:
-            print(f"[WHISPER] Starting transcription of: {audio_file_path}")
+        """Transcribe audio file to text without blocking the event loop.
+
+        Runs on the inference process pool when it is started (API server), otherwise
+        in a thread of the current process (job workers, scripts). Raises
+        InferenceQueueFull when the pool's submission queue is full. Files longer than
+        WHISPER_LONG_FILE_MIN_SECONDS use the parallel long-file mode.
+        """
+        if settings.WHISPER_LONG_FILE_MIN_SECONDS > 0:
+            duration = await asyncio.get_running_loop().run_in_executor(None, get_audio_duration, audio_file_path)
+            if duration and duration >= settings.WHISPER_LONG_FILE_MIN_SECONDS:
+                return await self.transcribe_long(audio_file_path)
+        
+        if inference_executor.is_running():
+            return await inference_executor.transcribe(audio_file_path, model_registry.resolve(self.model_key))
+        return await asyncio.get_running_loop().run_in_executor(None, self.transcribe_sync, audio_file_path)
+    
+    async def transcribe_long(self, audio_file_path: str, chunk_minutes: Optional[float] = None) -> dict:
+        """Long-file mode: cut the audio at silences into ~chunk_minutes pieces, transcribe
+        the pieces in parallel and stitch the segments back with absolute timestamps.
+        """
+        loop = asyncio.get_running_loop()
+        chunk_seconds = (chunk_minutes or settings.WHISPER_CHUNK_MINUTES) * 60
+        key = model_registry.resolve(self.model_key)
+        
+        audio = await loop.run_in_executor(None, load_audio, audio_file_path, SAMPLE_RATE)
+        bounds = plan_split_points(audio, SAMPLE_RATE, chunk_seconds)
+        offsets = [start / SAMPLE_RATE for start, _ in bounds]
+        print(f"[WHISPER] Long-file mode: {len(audio) / SAMPLE_RATE:.0f}s split into {len(bounds)} pieces")
+        
+        if inference_executor.is_running() and inference_executor.workers >= settings.WHISPER_LONG_FILE_WORKERS:
+            # Don't flood the shared submission queue: one piece in flight per worker
+            slots = asyncio.Semaphore(inference_executor.workers)
             
-            if not Path(audio_file_path).exists():
-                print(f"[WHISPER] ERROR: Audio file not found: {audio_file_path}")
-                raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+            async def run_piece(piece):
+                async with slots:
+                    return await inference_executor.transcribe(piece, key)
             
-            file_size = Path(audio_file_path).stat().st_size
-            print(f"[WHISPER] Audio file size: {file_size} bytes")
+            results = await asyncio.gather(*(run_piece(audio[start:end]) for start, end in bounds))
+        else:
+            # WHISPER_LONG_FILE_WORKERS processes of their own, so a long file is decoded
+            # across cores even with a single inference worker
+            pool = _get_piece_pool(key)
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _transcribe_piece, audio[start:end], key)
+                for start, end in bounds
+            ))
+        
+        return stitch_results(results, offsets)
+    
+    def transcribe_sync(self, audio: Union[str, np.ndarray]) -> dict:
+        """Transcribe an audio file (or 16 kHz float32 samples) to text in the calling thread"""
+        try:
+            if isinstance(audio, str):
+                print(f"[WHISPER] Starting transcription of: {audio}")
+                
+                if not Path(audio).exists():
+                    print(f"[WHISPER] ERROR: Audio file not found: {audio}")
+                    raise FileNotFoundError(f"Audio file not found: {audio}")
+                
+                file_size = Path(audio).stat().st_size
+                print(f"[WHISPER] Audio file size: {file_size} bytes")
+            else:
+                print(f"[WHISPER] Starting transcription of {len(audio) / SAMPLE_RATE:.1f}s of audio")
             
-            # Enhanced transcription parameters for better quality
+            # Enhanced transcription parameters for better quality; every engine
+            # returns the same text/language/segments (with words) shape
             result = self.model.transcribe(
-                audio_file_path,
+                audio,
+                beam_size=settings.WHISPER_BEAM_SIZE,
                 language="en",  # Force English for better accuracy
                 word_timestamps=True,  # Enable word-level timestamps
                 temperature=0.0,  # Use deterministic decoding for consistency
@@ -67,4 +184,13 @@ class WhisperClient:
     
     def is_ready(self) -> bool:
         """Check if Whisper model is loaded and ready"""
-        return self.model is not None
+        if inference_executor.is_running():
+            return inference_executor.is_ready()
+        return model_registry.is_loaded(self.model_key)
+
+# Global instance
+whisper_client = WhisperClient()
+
+def get_whisper_client() -> WhisperClient:
+    """FastAPI dependency returning the shared Whisper client"""
+    return whisper_client
@@ -1,7 +1,8 @@
 import os
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+import numpy as np
 
 def get_audio_duration(file_path: str) -> Optional[float]:
     """Get audio file duration in seconds using ffprobe"""
@@ -17,6 +18,17 @@ def get_audio_duration(file_path: str) -> Optional[float]:
     except Exception:
         return None
 
+def load_audio(file_path: str, sample_rate: int = 16000) -> np.ndarray:
+    """Decode any ffmpeg-readable file to mono float32 samples in [-1, 1]"""
+    result = subprocess.run([
+        'ffmpeg', '-nostdin', '-threads', '0', '-i', file_path,
+        '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(sample_rate), '-'
+    ], capture_output=True)
+    
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to load audio: {result.stderr.decode(errors='ignore')}")
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
 def validate_audio_format(file_path: str) -> bool:
     """Validate if file is a supported audio format"""
     try:
@@ -55,3 +67,65 @@ def cleanup_temp_files(directory: str, max_age_hours: int = 24):
                 print(f"Deleted old file: {file_path}")
             except Exception as e:
                 print(f"Error deleting {file_path}: {e}")
+
+def find_silences(audio: np.ndarray, sample_rate: int = 16000, frame_ms: int = 30,
+                  min_silence_ms: int = 500, threshold_db: Optional[float] = None) -> List[Tuple[int, int]]:
+    """Energy-based voice activity detection.
+
+    Returns (start, end) sample ranges of silence at least min_silence_ms long. The
+    threshold defaults to a quarter of the way from the noise floor (3rd percentile frame
+    energy) to the typical speech level (60th percentile), and at least 6 dB above the floor.
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return []
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    if threshold_db is None:
+        noise_floor, speech_level = np.percentile(energy_db, [3, 60])
+        threshold_db = max(noise_floor + 0.25 * (speech_level - noise_floor), noise_floor + 6)
+
+    silent = energy_db < threshold_db
+    min_frames = max(1, min_silence_ms // frame_ms)
+
+    silences = []
+    run_start = None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_frames:
+                silences.append((run_start * frame_len, i * frame_len))
+            run_start = None
+    return silences
+
+def plan_split_points(audio: np.ndarray, sample_rate: int, target_seconds: float,
+                      search_fraction: float = 0.25) -> List[Tuple[int, int]]:
+    """Cut audio into pieces of roughly target_seconds, preferring the middle of a silence.
+
+    Each cut is placed at the silence midpoint closest to the ideal position within
+    +/- search_fraction of the target length; with no silence nearby it falls back to a
+    hard cut. Returns (start, end) sample ranges covering the whole input.
+    """
+    target = int(target_seconds * sample_rate)
+    if len(audio) <= target * (1 + search_fraction):
+        return [(0, len(audio))]
+
+    midpoints = np.array([(start + end) // 2 for start, end in find_silences(audio, sample_rate)])
+    window = int(target * search_fraction)
+
+    bounds = []
+    start = 0
+    while len(audio) - start > target + window:
+        ideal = start + target
+        cut = ideal
+        if len(midpoints):
+            nearby = midpoints[(midpoints > ideal - window) & (midpoints < ideal + window)]
+            if len(nearby):
+                cut = int(nearby[np.argmin(np.abs(nearby - ideal))])
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, len(audio)))
+    return bounds
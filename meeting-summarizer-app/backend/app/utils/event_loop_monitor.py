@@ -0,0 +1,42 @@
+import asyncio
+from typing import Optional
+from config import settings
+from app.utils.metrics import metrics
+
+# Upper bounds (seconds) for the lag histogram
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+class EventLoopMonitor:
+    """Measures event-loop lag: how much later than scheduled a periodic wakeup runs.
+
+    Anything that blocks the loop (a synchronous query or commit, CPU-bound work in an
+    async handler) delays every other task by the same amount, including real-time
+    websocket sessions, and shows up here as event_loop.lag.seconds.
+    """
+
+    def __init__(self, interval: float = settings.EVENT_LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            metrics.observe("event_loop.lag.seconds", max(0.0, loop.time() - scheduled), buckets=LAG_BUCKETS)
+
+# Global instance
+event_loop_monitor = EventLoopMonitor()
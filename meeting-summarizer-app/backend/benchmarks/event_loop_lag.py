@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark event-loop lag under a mixed request load, with sync and async database access.
+
+Serves the hot read endpoints (meeting list page, single meeting, job status) from
+an in-process FastAPI app in two variants that run the same queries:
+
+- sync: `async def` handlers using the synchronous Session (the previous pattern),
+  so every query and commit runs on the event loop thread
+- async: handlers using the aiosqlite AsyncSession from app.database
+
+--clients concurrent clients call random endpoints through an in-process ASGI
+transport while --writers threads commit meeting and job updates through the sync
+engine (like job workers). A probe task sleeps --probe-ms at a time and records how
+late it wakes up; that lag is what every other task, such as a real-time websocket,
+would see.
+
+Usage:
+    python benchmarks/event_loop_lag.py --meetings 2000 --clients 12 --seconds 10
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, Job, Meeting, create_async_sqlite_engine, create_sqlite_engine
+
+TRANSCRIPT = "speaker one said something about the quarterly roadmap and budget. " * 200
+PAGE = 50
+
+def seed(Session, meetings: int, jobs: int):
+    base = datetime.datetime(2024, 1, 1)
+    with Session() as db:
+        db.add_all(Meeting(
+            id=str(uuid.uuid4()), title=f"Meeting {i}", transcript=TRANSCRIPT, summary="A short summary.",
+            key_points=["point one"], action_items=["follow up"], status="completed",
+            created_at=base + datetime.timedelta(minutes=i)
+        ) for i in range(meetings))
+        db.add_all(Job(
+            id=str(uuid.uuid4()), kind="process_meeting_audio", status="running", progress=0.5,
+            created_at=base + datetime.timedelta(minutes=i)
+        ) for i in range(jobs))
+        db.commit()
+        return [m for m, in db.query(Meeting.id)], [j for j, in db.query(Job.id)]
+
+def build_app(Session, AsyncSessionLocal) -> FastAPI:
+    app = FastAPI()
+
+    def get_db():
+        with Session() as db:
+            yield db
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    def serialize(meeting: Meeting) -> dict:
+        return {"id": meeting.id, "title": meeting.title, "transcript": meeting.transcript, "status": meeting.status}
+
+    @app.get("/sync/meetings")
+    async def sync_list(db: Session = Depends(get_db)):
+        return [serialize(m) for m in db.query(Meeting).order_by(Meeting.created_at.desc()).limit(PAGE)]
+
+    @app.get("/sync/meetings/{meeting_id}")
+    async def sync_get(meeting_id: str, db: Session = Depends(get_db)):
+        return serialize(db.query(Meeting).filter(Meeting.id == meeting_id).first())
+
+    @app.get("/sync/jobs/{job_id}")
+    async def sync_job(job_id: str, db: Session = Depends(get_db)):
+        job = db.query(Job).filter(Job.id == job_id).first()
+        return {"id": job.id, "status": job.status, "progress": job.progress}
+
+    @app.get("/async/meetings")
+    async def async_list(db: AsyncSession = Depends(get_async_db)):
+        meetings = await db.scalars(select(Meeting).order_by(Meeting.created_at.desc()).limit(PAGE))
+        return [serialize(m) for m in meetings]
+
+    @app.get("/async/meetings/{meeting_id}")
+    async def async_get(meeting_id: str, db: AsyncSession = Depends(get_async_db)):
+        return serialize(await db.get(Meeting, meeting_id))
+
+    @app.get("/async/jobs/{job_id}")
+    async def async_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+        job = await db.get(Job, job_id)
+        return {"id": job.id, "status": job.status, "progress": job.progress}
+
+    return app
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def writer(Session, meeting_ids, job_ids, stop: threading.Event, seed_value: int):
+    rng = random.Random(seed_value)
+    while not stop.is_set():
+        with Session() as db:
+            db.get(Job, rng.choice(job_ids)).progress = rng.random()
+            db.get(Meeting, rng.choice(meeting_ids)).status = rng.choice(("processing", "completed"))
+            db.commit()
+        time.sleep(0.005)
+
+async def run(mode: str, app: FastAPI, meeting_ids, job_ids, clients: int, seconds: float, probe_interval: float):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    lags, latencies = [], []
+
+    async def probe():
+        while loop.time() < deadline:
+            scheduled = loop.time() + probe_interval
+            await asyncio.sleep(probe_interval)
+            lags.append(max(0.0, loop.time() - scheduled))
+
+    async def client(number: int):
+        rng = random.Random(number)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            while loop.time() < deadline:
+                path = rng.choice((
+                    f"/{mode}/meetings",
+                    f"/{mode}/meetings/{rng.choice(meeting_ids)}",
+                    f"/{mode}/jobs/{rng.choice(job_ids)}"
+                ))
+                start = time.perf_counter()
+                response = await http.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(probe(), *(client(i) for i in range(clients)))
+    print(
+        f"{mode:>6} | {len(latencies) / seconds:7.1f} req/s"
+        f" p50 {percentile(latencies, 50) * 1000:6.1f}ms p95 {percentile(latencies, 95) * 1000:6.1f}ms"
+        f" | loop lag p50 {percentile(lags, 50) * 1000:6.1f}ms p95 {percentile(lags, 95) * 1000:6.1f}ms"
+        f" max {max(lags, default=0) * 1000:6.1f}ms"
+    )
+
+async def main_async(args, Session, async_engine, meeting_ids, job_ids):
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    app = build_app(Session, AsyncSessionLocal)
+    try:
+        for mode in ("sync", "async"):
+            await run(mode, app, meeting_ids, job_ids, args.clients, args.seconds, args.probe_ms / 1000)
+    finally:
+        await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=200)
+    # Keep below DB_POOL_SIZE + DB_MAX_OVERFLOW: beyond that, sync handlers block the loop waiting
+    # for a connection that is only returned once the loop runs again (until DB_POOL_TIMEOUT)
+    parser.add_argument("--clients", type=int, default=12, help="Concurrent request loops")
+    parser.add_argument("--writers", type=int, default=2, help="Threads committing updates meanwhile")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration per variant")
+    parser.add_argument("--probe-ms", type=float, default=10, help="Lag probe interval")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "meetings.db")
+        engine = create_sqlite_engine(f"sqlite:///{path}")
+        async_engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        meeting_ids, job_ids = seed(Session, args.meetings, args.jobs)
+
+        print(f"{args.clients} clients, {args.writers} writer threads, {args.seconds:g}s per variant")
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=writer, args=(Session, meeting_ids, job_ids, stop, i), daemon=True)
+            for i in range(args.writers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            asyncio.run(main_async(args, Session, async_engine, meeting_ids, job_ids))
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark long-file transcription: single-pass Whisper vs. the parallel chunked mode.
+
+Builds a synthetic meeting recording by synthesizing sentences with espeak-ng (or
+macOS `say`) and joining them with random pauses, then reports wall-clock time and
+word error rate (WER) for both paths.
+
+Usage:
+    python benchmarks/long_file_transcription.py --minutes 20 --chunk-minutes 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.whisper_backends import SAMPLE_RATE
+from app.services.whisper_client import WhisperClient
+from app.utils.audio_processor import load_audio
+
+SENTENCES = [
+    "Let's start with a quick update on the quarterly roadmap.",
+    "The mobile release is blocked on the payment integration.",
+    "Sarah will follow up with the vendor about the contract renewal.",
+    "We agreed to move the launch date to the second week of March.",
+    "Can someone take an action item to update the onboarding documentation?",
+    "The customer survey showed that search is the most requested feature.",
+    "Our infrastructure costs went down by twelve percent last month.",
+    "I think we should schedule a design review before the sprint ends.",
+    "The data pipeline failed twice this week because of a schema change.",
+    "Marketing needs the final screenshots by Friday afternoon.",
+    "Let's park that discussion and come back to it next meeting.",
+    "The hiring plan includes two backend engineers and one designer.",
+    "Please send the meeting notes to the whole team after the call.",
+    "We still need a decision on the pricing for the enterprise tier.",
+    "The security audit found three issues that we need to fix.",
+]
+
+def synthesize(text: str, path: str):
+    if shutil.which("espeak-ng"):
+        subprocess.run(["espeak-ng", "-w", path, text], check=True, capture_output=True)
+    elif shutil.which("say"):
+        aiff_path = path + ".aiff"
+        subprocess.run(["say", "-o", aiff_path, text], check=True, capture_output=True)
+        subprocess.run(["ffmpeg", "-y", "-i", aiff_path, path], check=True, capture_output=True)
+        os.remove(aiff_path)
+    else:
+        raise RuntimeError("Install espeak-ng (or run on macOS) to synthesize the corpus")
+
+def build_corpus(minutes: float, workdir: str, seed: int = 0):
+    """Return (wav path, reference transcript) for a synthetic recording of about `minutes`"""
+    rng = random.Random(seed)
+    sample_rate = SAMPLE_RATE
+
+    # Synthesize each sentence once and reuse the samples
+    clips = []
+    for i, sentence in enumerate(SENTENCES):
+        clip_path = os.path.join(workdir, f"sentence_{i}.wav")
+        synthesize(sentence, clip_path)
+        clips.append(load_audio(clip_path, sample_rate))
+
+    pieces, words = [], []
+    total = 0
+    while total < minutes * 60 * sample_rate:
+        i = rng.randrange(len(SENTENCES))
+        pause = np.zeros(int(sample_rate * rng.uniform(0.3, 1.5)), dtype=np.float32)
+        pieces.extend([clips[i], pause])
+        words.append(SENTENCES[i])
+        total += len(clips[i]) + len(pause)
+
+    audio = np.concatenate(pieces)
+    path = os.path.join(workdir, "corpus.wav")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return path, " ".join(words)
+
+def normalize(text: str):
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=20, help="length of the synthetic recording")
+    parser.add_argument("--chunk-minutes", type=float, default=5, help="target piece length for the chunked mode")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    client = WhisperClient()
+    client.load_model()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"Building {args.minutes:.0f}-minute synthetic corpus...")
+        path, reference = build_corpus(args.minutes, workdir, args.seed)
+
+        rows = []
+
+        start = time.perf_counter()
+        result = client.transcribe_sync(path)
+        rows.append(("single pass", time.perf_counter() - start, word_error_rate(reference, result["text"])))
+
+        # First chunked run includes starting the worker processes and loading their models
+        for label in ("chunked (cold)", "chunked (warm)"):
+            start = time.perf_counter()
+            result = asyncio.run(client.transcribe_long(path, args.chunk_minutes))
+            rows.append((label, time.perf_counter() - start, word_error_rate(reference, result["text"])))
+
+    print()
+    print(f"{'mode':<16}{'wall clock (s)':>16}{'speed-up':>10}{'WER':>8}")
+    baseline = rows[0][1]
+    for label, seconds, wer in rows:
+        print(f"{label:<16}{seconds:>16.1f}{baseline / seconds:>9.2f}x{wer:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent SQLite access with N writer and M reader threads.
+
+Writers insert meetings and update their status and transcript, committing each
+change (like job workers and live sessions do); readers list recent meetings and
+load single ones (like the API). Each configuration runs for --seconds against a
+fresh database seeded with --meetings rows:
+
+- default: the previous engine (rollback journal, default pragmas and pool)
+- tuned: create_sqlite_engine from app.database (WAL, synchronous=NORMAL,
+  busy_timeout, cache and mmap sizes, bounded pool with pre-ping)
+
+Reports operations per second, p50/p95 latency and "database is locked" errors.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py --writers 4 --readers 16 --seconds 10
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, Meeting, create_sqlite_engine
+
+TRANSCRIPT = "speaker one said something about the quarterly roadmap and budget. " * 200
+
+def new_meeting(number: int) -> Meeting:
+    return Meeting(
+        id=str(uuid.uuid4()),
+        title=f"Meeting {number}",
+        transcript=TRANSCRIPT,
+        summary="A short summary of the meeting.",
+        key_points=["point one", "point two"],
+        action_items=["follow up"],
+        created_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=number),
+        status="completed"
+    )
+
+def seed(Session, count: int):
+    with Session() as db:
+        db.add_all(new_meeting(i) for i in range(count))
+        db.commit()
+        return [meeting_id for meeting_id, in db.query(Meeting.id)]
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def run(name: str, engine, writers: int, readers: int, seconds: float, meetings: int):
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ids = seed(Session, meetings)
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"write": [], "read": [], "locked": 0, "errors": 0}
+
+    def record(kind: str, latency: float):
+        with lock:
+            results[kind].append(latency)
+
+    def writer(worker: int):
+        rng = random.Random(worker)
+        number = meetings + worker * 1_000_000
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session() as db:
+                    if rng.random() < 0.5:
+                        number += 1
+                        db.add(new_meeting(number))
+                    else:
+                        meeting = db.get(Meeting, rng.choice(ids))
+                        meeting.status = rng.choice(("processing", "completed"))
+                        meeting.transcript = TRANSCRIPT + str(number)
+                    db.commit()
+                record("write", time.perf_counter() - start)
+            except OperationalError as e:
+                with lock:
+                    results["locked" if "locked" in str(e) else "errors"] += 1
+
+    def reader(worker: int):
+        rng = random.Random(1000 + worker)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session() as db:
+                    if rng.random() < 0.5:
+                        db.query(Meeting.id, Meeting.title, Meeting.status).order_by(Meeting.created_at.desc()).limit(50).all()
+                    else:
+                        db.get(Meeting, rng.choice(ids)).transcript
+                record("read", time.perf_counter() - start)
+            except OperationalError as e:
+                with lock:
+                    results["locked" if "locked" in str(e) else "errors"] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(f"{name:>8}", end="")
+    for kind in ("write", "read"):
+        latencies = results[kind]
+        print(
+            f" | {kind}s {len(latencies) / seconds:8.1f}/s"
+            f" p50 {percentile(latencies, 50) * 1000:7.1f}ms p95 {percentile(latencies, 95) * 1000:7.1f}ms",
+            end=""
+        )
+    print(f" | locked {results['locked']} other errors {results['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--meetings", type=int, default=500, help="Rows seeded before the run")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per configuration")
+    with tempfile.TemporaryDirectory() as workdir:
+        default = create_engine(
+            f"sqlite:///{os.path.join(workdir, 'default.db')}", connect_args={"check_same_thread": False}
+        )
+        run("default", default, args.writers, args.readers, args.seconds, args.meetings)
+        tuned = create_sqlite_engine(f"sqlite:///{os.path.join(workdir, 'tuned.db')}")
+        run("tuned", tuned, args.writers, args.readers, args.seconds, args.meetings)
+
+if __name__ == "__main__":
+    main()
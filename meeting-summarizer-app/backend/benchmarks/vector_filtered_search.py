@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark filtered against unfiltered vector search.
+
+Builds a synthetic corpus (clustered unit vectors with vector_chunks and meetings rows
+in a temporary SQLite database) and times single-query searches through
+vector_filters.search_chunks, the path VectorStore.search_similar takes, for:
+
+- no filter
+- broad filters (transcript chunks, the last half year, completed meetings)
+- narrow filters (action items, a few meetings)
+
+Each filter runs through search_chunks (broad filters are applied after the search)
+and the previous way, resolving every filter to its full candidate id set before the
+search. Recall is measured against an exact search over the matching chunks.
+
+With --check, exits with status 1 if a broad filter takes more than --max-ratio times
+as long as the unfiltered search (checking the filter on the over-fetched hits adds a
+small fixed cost; resolving the filter to ids first made it tens of times slower).
+
+Usage:
+    python benchmarks/vector_filtered_search.py --chunks 200000 --queries 200 --k 5
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from app.database import Base, Meeting, VectorChunk, create_sqlite_engine
+from app.services.vector_filters import apply_filters, search_chunks
+from app.services.vector_index import VectorIndex
+
+DIMENSION = 384  # all-MiniLM-L6-v2
+CHUNKS_PER_MEETING = 40
+KIND_SHARES = (("transcript", 0.85), ("summary", 0.05), ("key_point", 0.07), ("action_item", 0.03))
+NOW = datetime.datetime(2025, 1, 1)
+
+def make_vectors(rng: np.random.Generator, centers: np.ndarray, count: int, spread: float) -> np.ndarray:
+    assignment = rng.integers(0, len(centers), count)
+    vectors = centers[assignment] + spread * rng.standard_normal((count, DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+def seed(engine, rng: np.random.Generator, chunks: int) -> int:
+    meetings = -(-chunks // CHUNKS_PER_MEETING)
+    created = [NOW - datetime.timedelta(days=float(days)) for days in rng.uniform(0, 365, meetings)]
+    kinds = rng.choice([kind for kind, _ in KIND_SHARES], chunks, p=[share for _, share in KIND_SHARES])
+    with engine.begin() as connection:
+        connection.execute(insert(Meeting), [{
+            "id": f"meeting-{i}", "title": f"Meeting {i}", "created_at": created[i],
+            "status": "completed" if i % 10 else "processing"
+        } for i in range(meetings)])
+        connection.execute(insert(VectorChunk), [{
+            "id": i + 1, "meeting_id": f"meeting-{i // CHUNKS_PER_MEETING}",
+            "meeting_title": f"Meeting {i // CHUNKS_PER_MEETING}", "created_at": created[i // CHUNKS_PER_MEETING],
+            "chunk_index": i % CHUNKS_PER_MEETING, "kind": str(kinds[i]), "text": f"chunk {i}"
+        } for i in range(chunks)])
+    return meetings
+
+def search_all_ids(db, search_index, total: int, k: int, filters: dict):
+    """The previous filtered search: read every matching id, then score only those"""
+    if filters:
+        ids = np.array([chunk_id for chunk_id, in apply_filters(db.query(VectorChunk.id), **filters)], dtype=np.int64)
+        if len(ids) == 0:
+            return []
+        scores, found = search_index(min(k, len(ids)), ids)
+    else:
+        scores, found = search_index(min(k, total), None)
+    hits = [(int(chunk_id), float(score)) for score, chunk_id in zip(scores[0], found[0]) if chunk_id >= 0 and score > 0.3]
+    rows = {row.id: row for row in db.query(VectorChunk).filter(VectorChunk.id.in_([chunk_id for chunk_id, _ in hits]))}
+    return [(rows[chunk_id], score) for chunk_id, score in hits if chunk_id in rows]
+
+def measure(Session, index: VectorIndex, queries: np.ndarray, k: int, filters: dict, search=search_chunks):
+    latencies, results = [], []
+    with Session() as db:
+        for query in queries:
+            def search_index(n, ids):
+                return index.search(query[None, :], n, ids=ids)
+            start = time.perf_counter()
+            hits = search(db, search_index, index.count(), k, filters)
+            latencies.append(time.perf_counter() - start)
+            results.append([row.id for row, _ in hits])
+    latencies_ms = np.array(latencies) * 1000
+    return results, float(latencies_ms.mean()), float(np.percentile(latencies_ms, 95))
+
+def recall(results, truth) -> float:
+    expected = sum(len(ids) for ids in truth)
+    return sum(len(set(got) & set(ids)) for got, ids in zip(results, truth)) / expected if expected else 1.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200_000, help="corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=0.05, help="cluster noise per dimension")
+    parser.add_argument("--type", default=settings.VECTOR_INDEX_TYPE, choices=["flat", "hnsw", "ivfpq"])
+    parser.add_argument("--check", action="store_true", help="fail if a broad filter is much slower than no filter")
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="allowed broad/unfiltered mean latency")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.standard_normal((args.clusters, DIMENSION)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = make_vectors(rng, centers, args.chunks, args.spread)
+    queries = make_vectors(rng, centers, args.queries, args.spread)
+    ids = np.arange(1, args.chunks + 1, dtype=np.int64)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(workdir, 'meetings.db')}")
+        Base.metadata.create_all(bind=engine)
+        meetings = seed(engine, rng, args.chunks)
+        Session = sessionmaker(bind=engine)
+
+        exact = VectorIndex("flat", DIMENSION)
+        exact.add(vectors, ids)
+        index = exact
+        if args.type != "flat":
+            index = VectorIndex(args.type, DIMENSION, size=len(ids))
+            index.train(vectors)
+            index.add(vectors, ids)
+
+        cases = [
+            ("none", "", {}),
+            ("kind=transcript", "broad", {"kinds": ["transcript"]}),
+            ("last 6 months", "broad", {"created_after": NOW - datetime.timedelta(days=182)}),
+            ("status=completed", "broad", {"statuses": ["completed"]}),
+            ("kind=action_item", "narrow", {"kinds": ["action_item"]}),
+            ("5 meetings", "narrow", {"meeting_ids": [f"meeting-{i}" for i in range(0, meetings, max(1, meetings // 5))][:5]}),
+        ]
+        rows = []
+        for label, breadth, filters in cases:
+            truth, _, _ = measure(Session, exact, queries, args.k, filters, search_all_ids)
+            for policy, search in (("current", search_chunks), ("all ids", search_all_ids)):
+                if not filters and policy != "current":
+                    continue
+                results, mean_ms, p95_ms = measure(Session, index, queries, args.k, filters, search)
+                rows.append((label, breadth, policy, recall(results, truth), mean_ms, p95_ms))
+        engine.dispose()
+
+    print(f"\n{args.chunks} chunks ({args.type}), {args.queries} queries, k={args.k}")
+    print(f"{'filter':<18}{'policy':<10}{'recall@k':>10}{'mean ms':>10}{'p95 ms':>10}")
+    for label, _, policy, hit_rate, mean_ms, p95_ms in rows:
+        print(f"{label:<18}{policy:<10}{hit_rate:>10.3f}{mean_ms:>10.3f}{p95_ms:>10.3f}")
+
+    if args.check:
+        unfiltered = rows[0][4]
+        slow = [(label, mean_ms) for label, breadth, policy, _, mean_ms, _ in rows
+                if breadth == "broad" and policy == "current" and mean_ms > args.max_ratio * unfiltered]
+        for label, mean_ms in slow:
+            print(f"FAIL: {label} takes {mean_ms:.3f} ms, unfiltered {unfiltered:.3f} ms")
+        sys.exit(1 if slow else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark recall@k against latency for the vector index types.
+
+Builds each index type used by VectorStore (flat, hnsw, ivfpq) over the same
+synthetic corpus and reports, for a range of efSearch (HNSW) and nprobe (IVF-PQ)
+values, recall@k against exact search and the per-query latency of single-query
+searches (the way search_similar is called).
+
+The corpus is a mixture of gaussian clusters of unit vectors, which resembles
+sentence embeddings of meeting chunks more than uniform random vectors do.
+
+Usage:
+    python benchmarks/vector_search_recall.py --chunks 200000 --queries 500 --k 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.vector_index import VectorIndex
+
+DIMENSION = 384  # all-MiniLM-L6-v2
+
+def make_vectors(rng: np.random.Generator, centers: np.ndarray, count: int, spread: float) -> np.ndarray:
+    assignment = rng.integers(0, len(centers), count)
+    vectors = centers[assignment] + spread * rng.standard_normal((count, DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+def build(kind: str, vectors: np.ndarray, ids: np.ndarray) -> VectorIndex:
+    start = time.perf_counter()
+    index = VectorIndex(kind, DIMENSION, size=len(ids))
+    index.train(vectors)
+    index.add(vectors, ids)
+    print(f"built {kind} index in {time.perf_counter() - start:.1f}s")
+    return index
+
+def measure(index: VectorIndex, queries: np.ndarray, truth: np.ndarray, k: int):
+    latencies, hits = [], 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        hits += len(np.intersect1d(ids[0], truth[i]))
+    latencies_ms = np.array(latencies) * 1000
+    return hits / truth.size, float(latencies_ms.mean()), float(np.percentile(latencies_ms, 95))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200_000, help="corpus size")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=0.05, help="cluster noise per dimension")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--types", nargs="+", default=["flat", "hnsw", "ivfpq"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.standard_normal((args.clusters, DIMENSION)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = make_vectors(rng, centers, args.chunks, args.spread)
+    queries = make_vectors(rng, centers, args.queries, args.spread)
+    ids = np.arange(1, args.chunks + 1, dtype=np.int64)
+
+    exact = build("flat", vectors, ids)
+    _, truth = exact.search(queries, args.k)
+
+    rows = []
+    for kind in args.types:
+        index = exact if kind == "flat" else build(kind, vectors, ids)
+        if kind == "hnsw":
+            for ef_search in args.ef_search:
+                index.ef_search = ef_search
+                rows.append((kind, f"efSearch={ef_search}", *measure(index, queries, truth, args.k)))
+        elif kind == "ivfpq":
+            for nprobe in args.nprobe:
+                index.nprobe = nprobe
+                rows.append((kind, f"nprobe={nprobe}", *measure(index, queries, truth, args.k)))
+        else:
+            rows.append((kind, "exact", *measure(index, queries, truth, args.k)))
+
+    print(f"\n{args.chunks} chunks, {args.queries} queries, k={args.k}")
+    print(f"{'index':<8}{'setting':<16}{'recall@k':>10}{'mean ms':>10}{'p95 ms':>10}")
+    for kind, setting, recall, mean_ms, p95_ms in rows:
+        print(f"{kind:<8}{setting:<16}{recall:>10.3f}{mean_ms:>10.3f}{p95_ms:>10.3f}")
+
+if __name__ == "__main__":
+    main()
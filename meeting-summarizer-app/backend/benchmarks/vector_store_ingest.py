@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark vector store ingest as the corpus grows.
+
+Ingests synthetic meetings (random unit vectors plus chunk metadata) and reports the
+average time per meeting at each corpus size for:
+
+- segments: the append-only segment storage used by VectorStore, with chunk
+  metadata inserted into a vector_chunks table
+- full rewrite: the previous approach, rewriting the FAISS file and re-pickling
+  every chunk after each meeting (quadratic, so it stops at --legacy-max-chunks)
+
+Embedding is excluded so only storage cost is measured.
+
+Usage:
+    python benchmarks/vector_store_ingest.py --chunks 100000 --chunks-per-meeting 40
+"""
+import argparse
+import datetime
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+from sqlalchemy import create_engine, insert
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import VectorChunk
+from app.services.vector_segments import SegmentStore
+
+DIMENSION = 384  # all-MiniLM-L6-v2
+
+def make_meeting(rng: np.random.Generator, meeting_number: int, chunks: int):
+    vectors = rng.standard_normal((chunks, DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    metadata = [{
+        'text': f"chunk {i} of meeting {meeting_number} " + "lorem ipsum " * 80,
+        'meeting_id': f"meeting-{meeting_number}",
+        'meeting_title': f"Meeting {meeting_number}",
+        'created_at': datetime.datetime(2024, 1, 1),
+        'chunk_index': i
+    } for i in range(chunks)]
+    return vectors, metadata
+
+def ingest_segments(workdir: str):
+    store = SegmentStore(os.path.join(workdir, "segments"), DIMENSION)
+    index = faiss.IndexIDMap(faiss.IndexFlatIP(DIMENSION))
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'chunks.db')}")
+    VectorChunk.__table__.create(bind=engine)
+
+    def ingest(vectors, metadata):
+        ids = store.append(vectors)
+        with engine.begin() as connection:
+            connection.execute(insert(VectorChunk), [{**row, 'id': int(i)} for i, row in zip(ids, metadata)])
+        index.add_with_ids(vectors, ids)
+
+    return ingest, store.wait_for_compaction
+
+def ingest_full_rewrite(workdir: str):
+    index = faiss.IndexFlatIP(DIMENSION)
+    chunks = []
+    index_file = os.path.join(workdir, "meeting_index.faiss")
+    chunks_file = os.path.join(workdir, "meeting_chunks.pkl")
+
+    def ingest(vectors, metadata):
+        index.add(vectors)
+        chunks.extend(metadata)
+        faiss.write_index(index, index_file)
+        with open(chunks_file, 'wb') as f:
+            pickle.dump(chunks, f)
+
+    return ingest, lambda: None
+
+def run(label: str, factory, total_chunks: int, chunks_per_meeting: int, report_every: int, seed: int):
+    rng = np.random.default_rng(seed)
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        ingest, finish = factory(workdir)
+        ingested, meeting_number = 0, 0
+        window_seconds, window_meetings = 0.0, 0
+        next_report = report_every
+
+        while ingested < total_chunks:
+            vectors, metadata = make_meeting(rng, meeting_number, chunks_per_meeting)
+            start = time.perf_counter()
+            ingest(vectors, metadata)
+            window_seconds += time.perf_counter() - start
+            window_meetings += 1
+            ingested += chunks_per_meeting
+            meeting_number += 1
+
+            if ingested >= next_report:
+                rows.append((ingested, window_seconds / window_meetings * 1000))
+                window_seconds, window_meetings = 0.0, 0
+                next_report += report_every
+        finish()
+
+    print(f"\n{label}")
+    print(f"{'corpus (chunks)':>16}{'ms / meeting':>14}")
+    for corpus, ms in rows:
+        print(f"{corpus:>16}{ms:>14.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100_000, help="final corpus size")
+    parser.add_argument("--chunks-per-meeting", type=int, default=40)
+    parser.add_argument("--report-every", type=int, default=10_000, help="corpus size between report rows")
+    parser.add_argument("--legacy-max-chunks", type=int, default=20_000, help="stop the full-rewrite run here (0 = skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run("segments (append-only)", ingest_segments, args.chunks, args.chunks_per_meeting, args.report_every, args.seed)
+    if args.legacy_max_chunks:
+        legacy_chunks = min(args.chunks, args.legacy_max_chunks)
+        run("full rewrite (previous)", ingest_full_rewrite, legacy_chunks, args.chunks_per_meeting,
+            max(1, min(args.report_every, legacy_chunks // 5)), args.seed)
+
+if __name__ == "__main__":
+    main()
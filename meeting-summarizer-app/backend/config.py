@@ -7,13 +7,81 @@ class Settings:
     # API Settings
     API_HOST = os.getenv("API_HOST", "127.0.0.1")
     API_PORT = int(os.getenv("API_PORT", 8000))
+    EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", 0.1))  # Seconds between event-loop lag probes (0 = off)
     
     # Whisper Settings
+    WHISPER_ENGINE = os.getenv("WHISPER_ENGINE", "openai-whisper")  # openai-whisper or faster-whisper (CTranslate2)
     WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small.en")  # Use English-specific small model for better accuracy
+    WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+    WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "float32")  # float32, float16; faster-whisper also int8, int8_float16
+    WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", 0))  # faster-whisper intra-op threads (0 = library default)
+    WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", 1))  # 1 = greedy decoding
+    WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "true").lower() == "true"  # Run a short dummy decode after loading
+    # Whisper worker processes for API requests (0 = in-process). Long files are split across these
+    # workers only when there are at least WHISPER_LONG_FILE_WORKERS of them, else across a pool of that size
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+    INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", 8))  # Requests allowed to wait for a worker before 503
+    WHISPER_LONG_FILE_MIN_SECONDS = float(os.getenv("WHISPER_LONG_FILE_MIN_SECONDS", 900))  # Parallel chunked mode above this duration (0 = off)
+    WHISPER_CHUNK_MINUTES = float(os.getenv("WHISPER_CHUNK_MINUTES", 5))  # Target piece length in long-file mode
+    WHISPER_LONG_FILE_WORKERS = int(os.getenv("WHISPER_LONG_FILE_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
     
     # Ollama Settings
     OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama2:latest")
+    OLLAMA_ANALYSIS_MODE = os.getenv("OLLAMA_ANALYSIS_MODE", "fused")  # fused (one JSON prompt) or concurrent
+    OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", 2))  # Parallel generate calls per process
+    OLLAMA_CONTEXT_TOKENS = int(os.getenv("OLLAMA_CONTEXT_TOKENS", 4096))  # Context window of OLLAMA_MODEL
+    SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", 1500))  # Chunk size for map-reduce summarization
+    
+    # Real-time Settings
+    REALTIME_DECODE_WAIT = float(os.getenv("REALTIME_DECODE_WAIT", 0.3))  # Max seconds to wait for decoded PCM per chunk
+    REALTIME_DECODE_QUIET = float(os.getenv("REALTIME_DECODE_QUIET", 0.03))  # Stop reading once ffmpeg is quiet this long
+    SUGGESTION_INTERVAL = float(os.getenv("SUGGESTION_INTERVAL", 5.0))  # Min seconds between LLM suggestion calls per session
+    SUGGESTION_DEBOUNCE = float(os.getenv("SUGGESTION_DEBOUNCE", 1.0))  # Pause after the last utterance before suggesting
+    
+    # Vector Store Settings
+    VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "vector_store")  # Segment files and manifest
+    VECTOR_MERGE_FACTOR = int(os.getenv("VECTOR_MERGE_FACTOR", 8))  # Compaction merges this many similar-size segments
+    VECTOR_SEGMENT_TARGET = int(os.getenv("VECTOR_SEGMENT_TARGET", 50000))  # Segments this large are not merged further
+    VECTOR_TOMBSTONE_RATIO = float(os.getenv("VECTOR_TOMBSTONE_RATIO", 0.2))  # Purge deleted vectors once they are this share of stored ones
+    VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")  # flat, hnsw or ivfpq
+    VECTOR_ANN_THRESHOLD = int(os.getenv("VECTOR_ANN_THRESHOLD", 50000))  # Use exact flat search below this many chunks
+    VECTOR_HNSW_M = int(os.getenv("VECTOR_HNSW_M", 32))  # Graph neighbours per node
+    VECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", 100))
+    VECTOR_HNSW_EF_SEARCH = int(os.getenv("VECTOR_HNSW_EF_SEARCH", 64))  # Higher = better recall, slower search
+    VECTOR_IVF_NLIST = int(os.getenv("VECTOR_IVF_NLIST", 0))  # IVF cells; 0 = about 4*sqrt(chunks)
+    VECTOR_IVF_NPROBE = int(os.getenv("VECTOR_IVF_NPROBE", 16))  # Cells scanned per query
+    VECTOR_PQ_M = int(os.getenv("VECTOR_PQ_M", 48))  # PQ sub-quantizers (bytes per vector)
+    VECTOR_FILTER_EXACT_FRACTION = float(os.getenv("VECTOR_FILTER_EXACT_FRACTION", 0.02))  # HNSW: filters matching less than this share are scanned exactly
+    VECTOR_FILTER_POSTFILTER_FRACTION = float(os.getenv("VECTOR_FILTER_POSTFILTER_FRACTION", 0.05))  # Filters matching more than this share are never resolved to chunk ids
+    EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")  # float16 embeddings keyed by sha256 of the text
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))  # Texts per encoder forward pass
+    EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", 0))  # Torch threads for encoding (0 = library default)
+    EMBEDDING_REBUILD_MEETINGS = int(os.getenv("EMBEDDING_REBUILD_MEETINGS", 32))  # Meetings embedded together during a rebuild
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 1024))  # Recent query embeddings kept in memory
+    QUERY_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", 5))  # How long to collect concurrent queries into one batch
+    QUERY_BATCH_MAX = int(os.getenv("QUERY_BATCH_MAX", 32))  # Distinct queries per batch
+    QUERY_ENCODER_THREADS = int(os.getenv("QUERY_ENCODER_THREADS", 2))  # Batches encoded concurrently
+    
+    # Chat Settings
+    CHAT_LEXICAL_TOP_K = int(os.getenv("CHAT_LEXICAL_TOP_K", 20))  # Meetings taken from full-text search
+    CHAT_RRF_K = int(os.getenv("CHAT_RRF_K", 60))  # Reciprocal rank fusion constant; higher flattens rank differences
+    
+    # Database Settings
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))  # How long a connection waits for a lock
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))  # Page cache per connection
+    SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", 256))  # Memory-mapped reads (0 = off)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))  # Connections kept open
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 8))  # Extra connections opened under load
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # Seconds to wait for a free connection
+    DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"  # Apply pending migrations on startup
+    MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 1000))  # Rows per backfill transaction
+    MIGRATION_BATCH_PAUSE_MS = int(os.getenv("MIGRATION_BATCH_PAUSE_MS", 20))  # Pause between batches for other writers
+    
+    # Background Job Settings
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))  # Worker processes; each holds its own Whisper model
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))  # Retries for jobs interrupted by a restart or crash
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 2.0))  # Seconds between queue scans
     
     # File Upload Settings
     UPLOAD_DIR = "/Users/bhanu/MyCode/MindSync/MindSync2.0/uploads"
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Apply pending database migrations (see app/migrations/versions.py).
+
+Backfills run in batches that each commit with a checkpoint, so the server can keep
+running meanwhile and an interrupted run resumes where it stopped when started again.
+
+Usage:
+    python migrate.py              # apply all pending migrations
+    python migrate.py --dry-run    # estimate rows touched and time, change nothing
+    python migrate.py --status     # list migrations and when they were applied
+    python migrate.py --target 3   # apply pending migrations up to version 3
+"""
+import argparse
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings
+from app.migrations import migrator
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report pending steps with estimated rows and time")
+    parser.add_argument("--status", action="store_true", help="List migrations and their state")
+    parser.add_argument("--target", type=int, help="Stop after this version")
+    parser.add_argument("--batch-size", type=int, default=settings.MIGRATION_BATCH_SIZE, help="Rows per batch")
+    parser.add_argument("--pause-ms", type=int, default=settings.MIGRATION_BATCH_PAUSE_MS,
+                        help="Pause between batches, so the server's writes get through")
+    args = parser.parse_args()
+
+    migrator.batch_size = args.batch_size
+    migrator.batch_pause = args.pause_ms / 1000
+
+    if args.status:
+        for entry in migrator.status():
+            print(f"{entry['version']:>4}  {entry['migration']:<32} {entry['applied_at'] or 'pending'}")
+        return
+
+    if args.dry_run:
+        report = migrator.dry_run(args.target)
+        if not report:
+            print("No pending migrations")
+            return
+        print(f"{'version':>7}  {'step':<44} {'rows':>10} {'est. time':>10}")
+        for entry in report:
+            resume = f"  (resumes after rowid {entry['resume_after']})" if entry["resume_after"] else ""
+            print(f"{entry['version']:>7}  {entry['step']:<44} {entry['rows']:>10} {entry['seconds']:>9.1f}s{resume}")
+        print(f"Total: {sum(entry['rows'] for entry in report)} rows, "
+              f"about {sum(entry['seconds'] for entry in report):.1f}s")
+        return
+
+    applied = migrator.upgrade(args.target)
+    print(f"Applied {applied} migration(s)" if applied else "Database is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,7 @@ def test_whisper():
         print("🔄 Loading Whisper model (this may take a moment)...")
         from app.services.whisper_client import WhisperClient
         client = WhisperClient()
+        client.load_model()
         print("✅ Whisper client initialized successfully")
         
         if client.is_ready():
@@ -7,11 +7,15 @@ import VoiceManager from './components/VoiceManager'
 import TTSTestPage from './components/TTSTestPage'
 import './App.css'
 
+const MEETINGS_PAGE_SIZE = 50
+const JOB_POLL_INTERVAL_MS = 2000
+
 interface MeetingSummary {
   id: string
   title: string
   description?: string
   transcript?: string
+  transcript_preview?: string | null  // Set instead of transcript in list pages
   summary?: string
   key_points?: string[]
   action_items?: string[]
@@ -38,6 +42,7 @@ function App() {
   const [meetingsHistory, setMeetingsHistory] = useState<MeetingSummary[]>([])
   const [showHistory, setShowHistory] = useState(false)
   const [isLoadingHistory, setIsLoadingHistory] = useState(false)
+  const [nextMeetingsCursor, setNextMeetingsCursor] = useState<string | null>(null)
   
   // Edit meeting state
   const [isEditingTitle, setIsEditingTitle] = useState(false)
@@ -231,6 +236,12 @@ function App() {
         if (data.type === 'session_started') {
           setSessionId(data.session_id)
           console.log('✅ Session started:', data.session_id, 'Engine:', data.engine)
+        } else if (data.type === 'suggestions_update') {
+          // Generated in the background, independently of transcription messages
+          setSuggestions(prev => [...prev, ...data.suggestions])
+        } else if (data.type === 'partial') {
+          // Live caption: committed transcript plus the utterance still being recognized
+          setRealTimeTranscript(`${data.full_transcript} ${data.text}`.trim())
         } else if (data.session_id && data.hasOwnProperty('transcription')) {
           // Handle transcription updates (even if transcription is empty)
           console.log('📝 Processing transcription:', data.transcription)
@@ -1000,11 +1011,15 @@ function App() {
     }
   }
 
-  const fetchMeetingsHistory = async () => {
-    setIsLoadingHistory(true)
+  const fetchMeetingsHistory = async (cursor?: string) => {
+    setIsLoadingHistory(!cursor)
     try {
-      const response = await axios.get('http://127.0.0.1:8000/api/meetings/')
-      setMeetingsHistory(response.data)
+      // Pages of meetings without transcripts; the full meeting is loaded when viewed
+      const response = await axios.get('http://127.0.0.1:8000/api/meetings/list', {
+        params: { limit: MEETINGS_PAGE_SIZE, cursor }
+      })
+      setMeetingsHistory(prev => (cursor ? [...prev, ...response.data] : response.data))
+      setNextMeetingsCursor(response.headers['x-next-cursor'] || null)
     } catch (err) {
       console.error('Error fetching meetings history:', err)
       setError('Failed to load meetings history')
@@ -1064,9 +1079,18 @@ function App() {
     setEditingMeetingId(null)
   }
 
-  const viewMeeting = (meeting: MeetingSummary) => {
+  const viewMeeting = async (meeting: MeetingSummary) => {
     setSelectedMeetingForView(meeting)
     setActiveTab('meeting-show')
+    if (meeting.transcript === undefined) {
+      try {
+        const response = await axios.get(`http://127.0.0.1:8000/api/meetings/${meeting.id}`)
+        setSelectedMeetingForView(current => (current?.id === meeting.id ? response.data : current))
+      } catch (err) {
+        console.error('Error loading meeting:', err)
+        setError('Failed to load meeting')
+      }
+    }
   }
 
   // Create empty meeting
@@ -1253,12 +1277,56 @@ function App() {
         setMeetingSummary(updatedMeeting)
       }
       
+      // The recording is transcribed and summarized in the background
+      const jobId = response.headers['x-job-id']
+      if (jobId) {
+        followMeetingJob(jobId, meetingId)
+      }
+      
     } catch (err: any) {
       console.error('Error stopping recording:', err)
       setError(err.response?.data?.detail || 'Failed to stop recording')
     }
   }
 
+  // Poll a processing job until it finishes, then show the processed meeting
+  const followMeetingJob = (jobId: string, meetingId: string) => {
+    const poll = async () => {
+      try {
+        const jobResponse = await axios.get(`http://127.0.0.1:8000/api/jobs/${jobId}`)
+        const job = jobResponse.data
+        if (job.status !== 'completed' && job.status !== 'failed') {
+          setTimeout(poll, JOB_POLL_INTERVAL_MS)
+          return
+        }
+        if (job.status === 'failed') {
+          setError(job.error || 'Failed to process the recording')
+        }
+        
+        // A failed job puts the meeting back into draft, so refetch either way
+        const meetingResponse = await axios.get(`http://127.0.0.1:8000/api/meetings/${meetingId}`)
+        const processedMeeting = meetingResponse.data
+        setMeetingsHistory(prev => 
+          prev.map(meeting => 
+            meeting.id === meetingId ? processedMeeting : meeting
+          )
+        )
+        setMeetingSummary(current => (current?.id === meetingId ? processedMeeting : current))
+        setSelectedMeetingForView(current => (current?.id === meetingId ? processedMeeting : current))
+      } catch (err: any) {
+        if (err.response?.status === 404) {
+          console.error('Processing job or meeting not found:', err)
+          setError('Could not load the processed meeting, reload to see the result')
+          return
+        }
+        // Server restarting or unreachable: queued jobs survive restarts, keep waiting
+        console.error('Error checking processing job:', err)
+        setTimeout(poll, JOB_POLL_INTERVAL_MS)
+      }
+    }
+    poll()
+  }
+
   const validateAudioFile = (file: File): boolean => {
     // Check if it's an audio file by type or extension
     const audioTypes = ['audio/', 'video/']
@@ -1621,10 +1689,10 @@ function App() {
                     </div>
                   </div>
                   
-                  {meeting.transcript && (
+                  {(meeting.transcript_preview || meeting.transcript) && (
                     <div className="meeting-transcript">
                       <h4>Transcript</h4>
-                      <p>{meeting.transcript.substring(0, 200)}...</p>
+                      <p>{(meeting.transcript_preview || meeting.transcript || '').substring(0, 200)}...</p>
                     </div>
                   )}
                   
@@ -1678,6 +1746,11 @@ function App() {
               ))}
             </div>
           )}
+          {!isLoadingHistory && nextMeetingsCursor && (
+            <button className="new-meeting-btn" onClick={() => fetchMeetingsHistory(nextMeetingsCursor)}>
+              Load more
+            </button>
+          )}
         </div>
       )
     }
@@ -2477,7 +2550,7 @@ function App() {
                   >
                     <option value="">Select a meeting...</option>
                     {meetingsHistory
-                      .filter(m => m.status === 'draft' && !m.transcript)
+                      .filter(m => m.status === 'draft' && !(m.transcript_preview || m.transcript))
                       .map(meeting => (
                         <option key={meeting.id} value={meeting.id}>
                           {meeting.title}
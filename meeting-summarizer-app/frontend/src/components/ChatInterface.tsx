@@ -26,7 +26,9 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ isOpen, onClose }) => {
   const [currentQuery, setCurrentQuery] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [suggestions, setSuggestions] = useState<any[]>([]);
+  const [pendingId, setPendingId] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const abortRef = useRef<AbortController | null>(null);
 
   useEffect(() => {
     if (isOpen) {
@@ -38,6 +40,16 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ isOpen, onClose }) => {
     scrollToBottom();
   }, [messages]);
 
+  // Stop an answer in progress when the chat is closed
+  useEffect(() => {
+    if (!isOpen) {
+      abortRef.current?.abort();
+      abortRef.current = null;
+      setIsLoading(false);
+    }
+    return () => abortRef.current?.abort();
+  }, [isOpen]);
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
@@ -51,29 +63,62 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ isOpen, onClose }) => {
     }
   };
 
+  const updateMessage = (id: string, update: (message: ChatMessage) => ChatMessage) => {
+    setMessages(prev => prev.map(message => (message.id === id ? update(message) : message)));
+  };
+
   const sendQuery = async (query?: string) => {
     const queryText = query || currentQuery;
     if (!queryText.trim() || isLoading) return;
 
+    const id = Date.now().toString();
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setPendingId(id);
     setIsLoading(true);
     setCurrentQuery('');
 
     try {
-      const response = await axios.post('http://localhost:8000/api/chat/query', {
-        query: queryText
+      // The answer is streamed as Server-Sent Events; closing the connection stops generation
+      const response = await fetch('http://localhost:8000/api/chat/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ query: queryText }),
+        signal: controller.signal
       });
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat request failed with status ${response.status}`);
+      }
 
-      const newMessage: ChatMessage = {
-        id: Date.now().toString(),
-        ...response.data,
-        timestamp: new Date().toISOString()
-      };
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
 
-      setMessages(prev => [...prev, newMessage]);
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const event = block.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || '{}');
+
+          if (event === 'meetings') {
+            setMessages(prev => [...prev, { id, ...data, response: '', timestamp: new Date().toISOString() }]);
+          } else if (event === 'token') {
+            updateMessage(id, message => ({ ...message, response: message.response + data.text }));
+          } else if (event === 'error') {
+            throw new Error(data.message);
+          }
+        }
+      }
     } catch (error) {
+      if (controller.signal.aborted) return;
       console.error('Error sending query:', error);
       const errorMessage: ChatMessage = {
-        id: Date.now().toString(),
+        id,
         query: queryText,
         response: 'Sorry, I encountered an error processing your request. Please try again.',
         timestamp: new Date().toISOString(),
@@ -81,9 +126,12 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ isOpen, onClose }) => {
         meetings_found: 0,
         relevant_meetings: []
       };
-      setMessages(prev => [...prev, errorMessage]);
+      setMessages(prev => [...prev.filter(message => message.id !== id), errorMessage]);
     } finally {
-      setIsLoading(false);
+      if (abortRef.current === controller) {
+        abortRef.current = null;
+        setIsLoading(false);
+      }
     }
   };
 
@@ -184,7 +232,7 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ isOpen, onClose }) => {
                   </div>
                 </div>
               ))}
-              {isLoading && (
+              {isLoading && !messages.some(message => message.id === pendingId) && (
                 <div className="chat-message">
                   <div className="chat-response">
                     <div className="chat-bubble assistant-bubble loading">